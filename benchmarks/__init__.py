@@ -0,0 +1,6 @@
+"""
+Standalone performance scripts. Not collected by pytest; run them from the
+repo root, e.g.
+
+    python -m benchmarks.reparent --nodes 10000
+"""
@@ -0,0 +1,43 @@
+# benchmarks/_support.py
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import event
+
+from tipple import create_app
+from tipple.config_classes import TestingConfig
+from tipple.models import db
+
+
+def make_app(database_uri: str = "sqlite:///:memory:", **overrides):
+    """A TestingConfig app with its schema created, ready for bulk seeding."""
+    class BenchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        WTF_CSRF_ENABLED = False
+
+    app = create_app(BenchConfig)
+    app.config.update(overrides)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@contextmanager
+def timed(label: str) -> Iterator[dict]:
+    """Time a block and count the SQL statements it sent."""
+    stats = {"statements": 0}
+
+    def _count(*_args) -> None:
+        stats["statements"] += 1
+
+    event.listen(db.engine, "before_cursor_execute", _count)
+    start = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats["seconds"] = time.perf_counter() - start
+        event.remove(db.engine, "before_cursor_execute", _count)
+        print(f"{label:<40} {stats['seconds'] * 1000:10.1f} ms  {stats['statements']:6d} statements")
@@ -0,0 +1,104 @@
+# benchmarks/feed.py
+"""
+Home-feed latency for users following 10, 100 and 5000 channels: first page
+and a page deep into the feed. Users at or under FEED_FANOUT_MAX_FOLLOWS are
+merged on read; the rest read their inbox. The "ids only" line compares the
+two strategies on picking a page (before the posts are loaded).
+
+    python -m benchmarks.feed --channels 6000 --posts-per-channel 30
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, UTC
+
+import sqlalchemy as sa
+
+from tipple.feed import home_feed, rebuild_inboxes, _fanout_rows, _inbox_rows
+from tipple.models import db, Channel, Post, User, user_channel_follows
+from ._support import make_app, timed
+
+
+def seed(channels: int, per_channel: int, follow_sets: list[int]) -> list[int]:
+    rnd = random.Random(1)
+    start = datetime.now(UTC) - timedelta(days=30)
+    db.session.execute(sa.insert(User.__table__), [
+        {"id": i + 1, "email": f"u{n}@example.com", "username": f"u{n}", "username_key": f"u{n}",
+         "password_hash": "x", "created_at": start, "following_count": n}
+        for i, n in enumerate(follow_sets)
+    ])
+    db.session.execute(sa.insert(Channel.__table__), [
+        {"id": c, "name": f"c{c}", "name_key": f"c{c}", "lineage": "", "created_at": start,
+         "post_count": per_channel}
+        for c in range(1, channels + 1)
+    ])
+    posts = [
+        {"user_id": 1, "channel_id": c, "body": f"post {c}/{k}",
+         "created_at": start + timedelta(seconds=rnd.randrange(30 * 86400))}
+        for c in range(1, channels + 1) for k in range(per_channel)
+    ]
+    for i in range(0, len(posts), 20_000):
+        db.session.execute(sa.insert(Post.__table__), posts[i:i + 20_000])
+    db.session.execute(sa.insert(user_channel_follows), [
+        {"user_id": i + 1, "channel_id": c}
+        for i, n in enumerate(follow_sets)
+        for c in rnd.sample(range(1, channels + 1), n)
+    ])
+    db.session.commit()
+    return [i + 1 for i in range(len(follow_sets))]
+
+
+def _latency(fn, repeat: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[-1]
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--channels", type=int, default=6000)
+    ap.add_argument("--posts-per-channel", type=int, default=30)
+    ap.add_argument("--follows", default="10,100,5000", help="comma-separated follow-set sizes")
+    ap.add_argument("--depth", type=int, default=10, help="page number for the deep-page timing")
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--db", default="sqlite:///:memory:", help="database URI")
+    args = ap.parse_args(argv)
+
+    follow_sets = [int(n) for n in args.follows.split(",")]
+    app = make_app(args.db)
+    with app.app_context():
+        with timed(f"seed {args.channels * args.posts_per_channel} posts"):
+            user_ids = seed(args.channels, args.posts_per_channel, follow_sets)
+        with timed("build inboxes"):
+            rebuild_inboxes()
+
+        per_page = app.config["POSTS_PER_PAGE"]
+        for uid, n in zip(user_ids, follow_sets):
+            strategy = "inbox" if n > app.config["FEED_FANOUT_MAX_FOLLOWS"] else "fan-out"
+            p50, worst = _latency(lambda: home_feed(uid, per_page=per_page), args.repeat)
+            print(f"{n:>5} follows ({strategy:<7}) page 1     p50 {p50:8.2f} ms   max {worst:8.2f} ms")
+
+            cursor = None
+            for _ in range(args.depth - 1):
+                cursor = home_feed(uid, cursor=cursor, per_page=per_page).next_cursor
+            p50, worst = _latency(lambda: home_feed(uid, cursor=cursor, per_page=per_page), args.repeat)
+            print(f"{n:>5} follows ({strategy:<7}) page {args.depth:<5} p50 {p50:8.2f} ms   max {worst:8.2f} ms")
+
+            # Picking the page's ids with each strategy, whichever is in use
+            p50, _ = _latency(lambda: _fanout_rows(uid, None, per_page + 1), args.repeat)
+            line = f"{n:>5} follows ids only: fan-out p50 {p50:8.2f} ms"
+            if strategy == "inbox":
+                p50, _ = _latency(lambda: _inbox_rows(uid, None, per_page + 1), args.repeat)
+                line += f"   inbox p50 {p50:8.2f} ms"
+            print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/ingest.py
+"""
+Posts/second for the bulk importer at several batch sizes, against the old
+path (one ORM Post + commit per post), on a file-backed SQLite database.
+
+    python -m benchmarks.ingest --posts 100000 --batch-sizes 100,1000,5000
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from tipple.ingest import PostImporter, iter_ndjson
+from tipple.models import db, Channel, Post, User
+from ._support import make_app
+
+
+def _ndjson(n: int, channels: int) -> str:
+    rnd = random.Random(1)
+    return "".join(
+        json.dumps({"channel": f"c{rnd.randrange(channels)}", "body": f"archived post {i}",
+                    "tags": rnd.choice([None, "archive", "archive, old"])}) + "\n"
+        for i in range(n)
+    )
+
+
+def _fresh_app(channels: int):
+    path = Path(tempfile.mkdtemp()) / "ingest.sqlite"
+    app = make_app(f"sqlite:///{path}")
+    with app.app_context():
+        u = User(email="a@example.com", username="archivist")
+        u.password_hash = "x"
+        db.session.add(u)
+        db.session.add_all(Channel(name=f"c{i}") for i in range(channels))
+        db.session.commit()
+        return app, u.id
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--posts", type=int, default=100_000)
+    ap.add_argument("--channels", type=int, default=50)
+    ap.add_argument("--batch-sizes", default="100,1000,5000")
+    ap.add_argument("--orm-posts", type=int, default=2000, help="posts for the one-commit-per-post baseline")
+    args = ap.parse_args(argv)
+
+    text = _ndjson(args.posts, args.channels)
+
+    app, user_id = _fresh_app(args.channels)
+    with app.app_context():
+        records = [json.loads(line) for line in text.splitlines()[:args.orm_posts]]
+        channel_ids = {c.name: c.id for c in Channel.query}
+        start = time.perf_counter()
+        for rec in records:
+            p = Post(body=rec["body"], tags=rec["tags"])
+            p.user_id = user_id
+            p.channel_id = channel_ids[rec["channel"]]
+            db.session.add(p)
+            db.session.commit()
+        rate = len(records) / (time.perf_counter() - start)
+        print(f"{'ORM, commit per post':<28} {len(records):>8} posts {rate:>12,.0f} posts/s")
+
+    for size in (int(s) for s in args.batch_sizes.split(",")):
+        app, user_id = _fresh_app(args.channels)
+        with app.app_context():
+            importer = PostImporter(default_user_id=user_id, batch_size=size)
+            result = importer.run(iter_ndjson(io.StringIO(text)))
+            assert result.inserted == args.posts, result.as_dict()
+            print(f"{f'import, batch {size}':<28} {result.inserted:>8} posts "
+                  f"{result.posts_per_second:>12,.0f} posts/s")
+
+
+if __name__ == "__main__":
+    main()
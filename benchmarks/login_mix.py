@@ -0,0 +1,104 @@
+# benchmarks/login_mix.py
+"""
+Mixed load: some threads log in over and over (real scrypt cost), the rest
+fetch a cheap page. Reports login throughput, shed logins (503) and page-view
+latency, once with hashing inline on the request thread (--workers 0) and
+once through the bounded hashing pool.
+
+    python -m benchmarks.login_mix --threads 8 --login-threads 6 --seconds 5
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from tipple.config_classes import BaseConfig
+from tipple.models import db, User, Channel
+from ._support import make_app
+
+
+def _seed(app, logins: int) -> int:
+    with app.app_context():
+        for i in range(logins):
+            u = User(email=f"u{i}@example.com", username=f"u{i}")
+            u.set_password("secret")
+            db.session.add(u)
+        ch = Channel(name="bench")
+        db.session.add(ch)
+        db.session.commit()
+        return ch.id
+
+
+def _run(workers: int, args) -> None:
+    path = Path(tempfile.mkdtemp()) / "login_mix.sqlite"
+    app = make_app(
+        f"sqlite:///{path}",
+        PASSWORD_HASH_METHOD=BaseConfig.PASSWORD_HASH_METHOD,
+        PASSWORD_HASH_WORKERS=workers,
+        PASSWORD_HASH_MAX_PENDING=args.max_pending,
+    )
+    channel_id = _seed(app, args.login_threads)
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    logins = shed = 0
+    page_ms: list[float] = []
+
+    def login_loop(i: int) -> None:
+        nonlocal logins, shed
+        client = app.test_client()
+        while not stop.is_set():
+            r = client.post("/auth/api/login", json={"username": f"u{i}", "password": "secret"})
+            client.post("/auth/api/logout")
+            with lock:
+                if r.status_code == 200:
+                    logins += 1
+                elif r.status_code == 503:
+                    shed += 1
+
+    def page_loop() -> None:
+        client = app.test_client()
+        samples = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            client.get(f"/channels/api/{channel_id}")
+            samples.append((time.perf_counter() - start) * 1000)
+        with lock:
+            page_ms.extend(samples)
+
+    threads = [threading.Thread(target=login_loop, args=(i,)) for i in range(args.login_threads)]
+    threads += [threading.Thread(target=page_loop) for _ in range(args.threads - args.login_threads)]
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    page_ms.sort()
+    p99 = page_ms[min(len(page_ms) - 1, int(len(page_ms) * 0.99))] if page_ms else 0.0
+    label = "inline" if workers == 0 else f"pool({workers}+{args.max_pending})"
+    print(f"{label:<16} logins/s {logins / args.seconds:8.1f}   shed {shed:6d}   "
+          f"pages/s {len(page_ms) / args.seconds:8.1f}   "
+          f"p50 {statistics.median(page_ms) if page_ms else 0:7.2f} ms   p99 {p99:7.2f} ms")
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--threads", type=int, default=8, help="request threads in total")
+    ap.add_argument("--login-threads", type=int, default=6, help="how many of them log in")
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--workers", type=int, default=2, help="hashing pool size to compare with inline")
+    ap.add_argument("--max-pending", type=int, default=2)
+    args = ap.parse_args(argv)
+
+    for workers in (0, args.workers):
+        _run(workers, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/reparent.py
+"""
+Move a large channel subtree to a new parent and report wall time and the
+number of SQL statements. With the set-based rewrite this should be a
+handful of statements regardless of --nodes.
+
+    python -m benchmarks.reparent --nodes 10000 --fanout 10
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, UTC
+
+import sqlalchemy as sa
+
+from tipple.models import db, Channel, _lineage_segment
+from ._support import make_app, timed
+
+
+def seed_subtree(nodes: int, fanout: int) -> tuple[int, int, int]:
+    """
+    Bulk-insert two roots (A, B) and a `nodes`-sized tree under A.
+    Returns (a_id, b_id, subtree_root_id).
+    """
+    table = Channel.__table__
+    now = datetime.now(UTC)
+    db.session.execute(sa.insert(table), [
+        {"id": 1, "name": "A", "name_key": "a", "parent_id": None, "lineage": "", "created_at": now},
+        {"id": 2, "name": "B", "name_key": "b", "parent_id": None, "lineage": "", "created_at": now},
+    ])
+
+    # Breadth-first: node k's parent is (k - 1) // fanout, offset past A and B
+    rows: list[dict] = []
+    lineage_of: dict[int, str] = {1: ""}
+    for k in range(nodes):
+        cid = k + 3
+        parent = 1 if k == 0 else (k - 1) // fanout + 3
+        lineage = lineage_of[parent] + _lineage_segment(parent)
+        lineage_of[cid] = lineage
+        rows.append({"id": cid, "name": f"n{k}", "name_key": f"n{k}", "parent_id": parent, "lineage": lineage,
+                     "created_at": now})
+    db.session.execute(sa.insert(table), rows)
+    db.session.commit()
+    return 1, 2, 3
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--nodes", type=int, default=10_000, help="size of the moved subtree")
+    ap.add_argument("--fanout", type=int, default=10, help="children per node")
+    ap.add_argument("--db", default="sqlite:///:memory:", help="database URI")
+    args = ap.parse_args(argv)
+
+    app = make_app(args.db)
+    with app.app_context():
+        a_id, b_id, root_id = seed_subtree(args.nodes, args.fanout)
+
+        root = db.session.get(Channel, root_id)
+        with timed(f"move {args.nodes}-node subtree A -> B") as stats:
+            root.parent = db.session.get(Channel, b_id)
+            db.session.commit()
+
+        moved = len(db.session.get(Channel, b_id).descendants())
+        assert moved == args.nodes, f"expected {args.nodes} descendants under B, found {moved}"
+        assert db.session.get(Channel, a_id).descendants() == []
+        print(f"{'descendants under B':<40} {moved:10d}")
+        print(f"{'statements per moved node':<40} {stats['statements'] / args.nodes:10.4f}")
+
+
+if __name__ == "__main__":
+    main()
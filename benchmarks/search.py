@@ -0,0 +1,99 @@
+# benchmarks/search.py
+"""
+Seed N posts (Zipf-distributed vocabulary, so some words are everywhere and
+most are rare), then time full-text searches against the FTS5 index and,
+for comparison, the LIKE '%word%' scan it replaces.
+
+    python -m benchmarks.search --posts 1000000 --db sqlite:////tmp/search.sqlite
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, UTC
+
+import sqlalchemy as sa
+
+from tipple.models import db, Channel, Post, User
+from tipple.search import fts_query, search_posts
+from ._support import make_app, timed
+
+VOCAB = 20_000
+
+
+def _word(rank: int) -> str:
+    return f"w{rank}"
+
+
+def seed(posts: int, channels: int, batch: int = 20_000) -> None:
+    rnd = random.Random(1)
+    now = datetime.now(UTC)
+    db.session.execute(sa.insert(User.__table__), [
+        {"id": 1, "email": "bench@example.com", "username": "bench", "username_key": "bench",
+         "password_hash": "x", "created_at": now},
+    ])
+    db.session.execute(sa.insert(Channel.__table__), [
+        {"id": c, "name": f"c{c}", "name_key": f"c{c}", "lineage": "", "created_at": now}
+        for c in range(1, channels + 1)
+    ])
+    # P(rank k) ~ 1/k
+    weights = [1 / k for k in range(1, VOCAB + 1)]
+    table = Post.__table__
+    for start in range(0, posts, batch):
+        n = min(batch, posts - start)
+        words = rnd.choices(range(1, VOCAB + 1), weights=weights, k=n * 12)
+        db.session.execute(sa.insert(table), [
+            {"user_id": 1, "channel_id": rnd.randint(1, channels), "created_at": now,
+             "body": " ".join(_word(w) for w in words[i * 12:(i + 1) * 12])}
+            for i in range(n)
+        ])
+        db.session.commit()
+
+
+def _latency(fn, repeat: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--posts", type=int, default=1_000_000)
+    ap.add_argument("--channels", type=int, default=100)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--db", default="sqlite:///:memory:", help="database URI")
+    args = ap.parse_args(argv)
+
+    app = make_app(args.db)
+    with app.app_context():
+        if not db.session.scalar(sa.select(sa.func.count()).select_from(Post)):
+            with timed(f"seed {args.posts} posts (FTS via triggers)"):
+                seed(args.posts, args.channels)
+        channel = db.session.get(Channel, 1)
+
+        cases = [
+            ("rare word", _word(15_000), None),
+            ("mid-frequency word", _word(200), None),
+            ("common word", _word(3), None),
+            ("two words", f"{_word(3)} {_word(200)}", None),
+            ("prefix", "w1234*", None),
+            ("rare word, one channel", _word(15_000), channel),
+        ]
+        for label, q, ch in cases:
+            match = fts_query(q)
+            p50, p99 = _latency(lambda: search_posts(match, channel=ch), args.repeat)
+            print(f"{'fts ' + label:<40} p50 {p50:9.2f} ms   p99 {p99:9.2f} ms")
+
+        like = sa.select(Post.id).where(Post.body.like(f"%{_word(15_000)} %")).limit(20)
+        p50, p99 = _latency(lambda: db.session.execute(like).all(), max(1, args.repeat // 10))
+        print(f"{'LIKE rare word (full scan)':<40} p50 {p50:9.2f} ms   p99 {p99:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# benchmarks/sqlite_contention.py
+"""
+Write/read contention on one SQLite file from several processes (standing in
+for gunicorn workers), with SQLite's defaults and with ProductionConfig's
+engine profile. Writers insert posts through the ORM (a commit per post, like
+the post form); readers GET channel pages through the full app.
+
+    python -m benchmarks.sqlite_contention --writers 4 --readers 4 --seconds 5
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from tipple.config_classes import ProductionConfig
+
+PROFILES = {"default": {}, "production": ProductionConfig.SQLITE_PRAGMAS}
+
+
+def _app(uri: str, pragmas: dict):
+    from ._support import make_app
+    return make_app(uri, SQLITE_PRAGMAS=pragmas, FRAGMENT_CACHE_BACKEND="null")
+
+
+def _seed(uri: str, pragmas: dict, channels: int) -> None:
+    from tipple.models import db, Channel, User
+    app = _app(uri, pragmas)
+    with app.app_context():
+        u = User(email="w@example.com", username="writer")
+        u.password_hash = "x"
+        db.session.add(u)
+        db.session.add_all(Channel(name=f"c{i}") for i in range(channels))
+        db.session.commit()
+        db.engine.dispose()
+
+
+def _worker(role: str, uri: str, pragmas: dict, channels: int, seconds: float, out) -> None:
+    from sqlalchemy.exc import OperationalError
+    from tipple.models import db, Post
+
+    app = _app(uri, pragmas)
+    rnd = random.Random()
+    latencies, errors = [], 0
+    client = app.test_client()
+    with app.app_context():
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            cid = rnd.randint(1, channels)
+            start = time.perf_counter()
+            try:
+                if role == "writer":
+                    p = Post(body="contended post")
+                    p.user_id, p.channel_id = 1, cid
+                    db.session.add(p)
+                    db.session.commit()
+                else:
+                    if client.get(f"/channels/{cid}").status_code != 200:
+                        errors += 1
+                        continue
+            except OperationalError:        # "database is locked"
+                db.session.rollback()
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+        db.engine.dispose()
+    out.put((role, latencies, errors))
+
+
+def _p99(samples: list[float]) -> float:
+    return statistics.quantiles(samples, n=100)[98] if len(samples) >= 2 else 0.0
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--writers", type=int, default=4)
+    ap.add_argument("--readers", type=int, default=4)
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--channels", type=int, default=20)
+    args = ap.parse_args(argv)
+
+    ctx = mp.get_context("spawn")
+    for name, pragmas in PROFILES.items():
+        uri = f"sqlite:///{Path(tempfile.mkdtemp()) / 'contention.sqlite'}"
+        _seed(uri, pragmas, args.channels)
+        out = ctx.Queue()
+        procs = [
+            ctx.Process(target=_worker, args=(role, uri, pragmas, args.channels, args.seconds, out))
+            for role in ["writer"] * args.writers + ["reader"] * args.readers
+        ]
+        for proc in procs:
+            proc.start()
+        results = [out.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+
+        for role in ("writer", "reader"):
+            samples = [ms for r, lat, _ in results if r == role for ms in lat]
+            errors = sum(err for r, _, err in results if r == role)
+            print(f"{name:<10} {role + 's':<8} {len(samples) / args.seconds:>8,.0f} ops/s   "
+                  f"p50 {statistics.median(samples) if samples else 0:7.2f} ms   "
+                  f"p99 {_p99(samples):8.2f} ms   errors {errors}")
+
+
+if __name__ == "__main__":
+    main()
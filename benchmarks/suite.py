@@ -0,0 +1,217 @@
+# benchmarks/suite.py
+"""
+End-to-end request benchmarks against a seeded database (tipple.seed):
+channel page, channel API, home feed, login, follow/unfollow and posting,
+each through the real app (routing, sessions, templates, hooks). Records
+p50/p99 latency, SQL statements per request (from Server-Timing) and the
+peak Python memory allocated while serving one request, and can save the
+numbers as a JSON baseline or compare against one:
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --baseline baseline.json     # exit 1 on regression
+
+Baselines are only comparable on the same machine with the same seed
+options. Login uses the production password hash, so it is slow on purpose.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+import sqlalchemy as sa
+
+from tipple.config_classes import BaseConfig, ProductionConfig
+from tipple.models import db, Channel, User
+from tipple.seed import seed
+from ._support import make_app
+
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class Scenario:
+    def __init__(self, name: str, requests: int, run: Callable[[Any, int], Any], login: bool = False) -> None:
+        self.name, self.requests, self.run, self.login = name, requests, run, login
+
+
+def _scenarios(app, args) -> tuple[list[Scenario], dict[str, str]]:
+    with app.app_context():
+        # The busiest channel and the user following the most channels
+        channel_id = db.session.scalar(sa.select(Channel.id).order_by(Channel.post_count.desc()).limit(1))
+        quiet_id = db.session.scalar(sa.select(Channel.id).order_by(Channel.follower_count).limit(1))
+        username = db.session.scalar(sa.select(User.username).order_by(User.following_count.desc()).limit(1))
+    n = args.requests
+    creds = {"identifier": username, "password": args.password}
+
+    def follow(client, i):
+        return client.post(f"/channels/{quiet_id}/{'unfollow' if i % 2 else 'follow'}")
+
+    def login(client, i):
+        r = client.post("/auth/login", data=creds)
+        client.post("/auth/logout")
+        return r
+
+    return [
+        Scenario("channel_page", n, lambda client, i: client.get(f"/channels/{channel_id}")),
+        Scenario("channel_page_user", n, lambda client, i: client.get(f"/channels/{channel_id}"), login=True),
+        Scenario("channel_api", n, lambda client, i: client.get(f"/channels/api/{channel_id}")),
+        Scenario("home_feed", n, lambda client, i: client.get("/"), login=True),
+        Scenario("login", args.login_requests, login),
+        Scenario("follow_unfollow", n, follow, login=True),
+        # Last: it adds rows the other scenarios would then read
+        Scenario("post", n, lambda client, i: client.post(f"/channels/{channel_id}", data={"body": f"bench {i}"}),
+                 login=True),
+    ], creds
+
+
+def _measure(app, scenario: Scenario, creds: dict, args) -> dict[str, Any]:
+    client = app.test_client()
+    if scenario.login:
+        client.post("/auth/login", data=creds)
+
+    def request(i: int):
+        r = scenario.run(client, i)
+        if r.status_code >= 400:
+            raise SystemExit(f"{scenario.name}: HTTP {r.status_code}")
+        with client.session_transaction() as sess:
+            sess.pop("_flashes", None)           # don't let flashes pile up in the cookie
+        return r
+
+    for i in range(args.warmup):
+        request(i)
+
+    ms: list[float] = []
+    queries: list[int] = []
+    for i in range(scenario.requests):
+        start = time.perf_counter()
+        r = request(i)
+        ms.append((time.perf_counter() - start) * 1000)
+        m = _QUERIES.search(r.headers.get("Server-Timing", ""))
+        queries.append(int(m.group(1)) if m else 0)
+
+    # Memory in a separate, shorter pass: tracemalloc slows everything down
+    peak = 0
+    tracemalloc.start()
+    try:
+        for i in range(min(scenario.requests, args.memory_requests)):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            request(i)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "requests": len(ms),
+        "p50_ms": round(statistics.median(ms), 3),
+        "p99_ms": round(_percentile(ms, 0.99), 3),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "queries_per_request": statistics.median(queries),
+        "max_queries": max(queries),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def compare(baseline: dict, current: dict, tolerance: float, min_delta_ms: float) -> list[str]:
+    """Regressions of `current` against `baseline`, as readable lines."""
+    problems = []
+    for name, base in baseline["scenarios"].items():
+        now = current["scenarios"].get(name)
+        if now is None:
+            continue
+        for key in ("p50_ms", "p99_ms"):
+            if now[key] > base[key] * (1 + tolerance) and now[key] - base[key] > min_delta_ms:
+                problems.append(f"{name}: {key} {base[key]} -> {now[key]}")
+        # Statement counts are deterministic: any increase is a regression
+        if now["queries_per_request"] > base["queries_per_request"]:
+            problems.append(f"{name}: queries/request {base['queries_per_request']} -> {now['queries_per_request']}")
+        if now["peak_kib"] > base["peak_kib"] * (1 + tolerance):
+            problems.append(f"{name}: peak_kib {base['peak_kib']} -> {now['peak_kib']}")
+    return problems
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--users", type=int, default=1000)
+    ap.add_argument("--channels", type=int, default=200)
+    ap.add_argument("--posts", type=int, default=20_000)
+    ap.add_argument("--follows-mean", type=float, default=10.0)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--password", default="password")
+    ap.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+    ap.add_argument("--login-requests", type=int, default=20)
+    ap.add_argument("--warmup", type=int, default=5)
+    ap.add_argument("--memory-requests", type=int, default=10)
+    ap.add_argument("--only", action="append", help="run just this scenario (repeatable)")
+    ap.add_argument("--output", type=Path, help="write results here (e.g. a new baseline)")
+    ap.add_argument("--baseline", type=Path, help="compare against this and exit 1 on regression")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown/growth")
+    ap.add_argument("--min-delta-ms", type=float, default=0.5, help="ignore latency changes smaller than this")
+    args = ap.parse_args(argv)
+
+    path = Path(tempfile.mkdtemp()) / "suite.sqlite"
+    app = make_app(
+        f"sqlite:///{path}",
+        PASSWORD_HASH_METHOD=BaseConfig.PASSWORD_HASH_METHOD,
+        SQLITE_PRAGMAS=ProductionConfig.SQLITE_PRAGMAS,
+        SERVER_TIMING=True,
+        PROFILER_ENABLED=False,
+    )
+    seed_options = {
+        "users": args.users, "channels": args.channels, "posts": args.posts,
+        "follows_mean": args.follows_mean, "random_seed": args.seed,
+    }
+    with app.app_context():
+        seeded = seed(password=args.password, **seed_options)
+    print(f"seeded {seeded.users} users, {seeded.channels} channels, {seeded.follows} follows, "
+          f"{seeded.posts} posts in {seeded.seconds:.1f}s")
+
+    scenarios, creds = _scenarios(app, args)
+    results: dict[str, Any] = {
+        "meta": {
+            "seed": seed_options,
+            "python": platform.python_version(),
+            "sqlalchemy": sa.__version__,
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "scenarios": {},
+    }
+    print(f"{'scenario':<20} {'p50 ms':>9} {'p99 ms':>9} {'queries':>8} {'peak KiB':>9}")
+    for scenario in scenarios:
+        if args.only and scenario.name not in args.only:
+            continue
+        r = results["scenarios"][scenario.name] = _measure(app, scenario, creds, args)
+        print(f"{scenario.name:<20} {r['p50_ms']:9.2f} {r['p99_ms']:9.2f} "
+              f"{r['queries_per_request']:8g} {r['peak_kib']:9.1f}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"wrote {args.output}")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("meta", {}).get("seed") != seed_options:
+            print("warning: baseline was seeded with different options", file=sys.stderr)
+        problems = compare(baseline, results, args.tolerance, args.min_delta_ms)
+        for line in problems:
+            print(f"REGRESSION {line}")
+        if problems:
+            raise SystemExit(1)
+        print(f"no regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# benchmarks/timeline_render.py
+"""
+Channel timeline requests/second with the post fragment cache on ("lru") and
+off ("null"), for a page of POSTS_PER_PAGE tagged posts.
+
+    python -m benchmarks.timeline_render --requests 500 --per-page 50
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timedelta, UTC
+
+import sqlalchemy as sa
+
+from tipple.models import db, Channel, Post, User
+from ._support import make_app
+
+
+def seed(posts: int) -> int:
+    start = datetime.now(UTC) - timedelta(days=1)
+    u = User(email="a@example.com", username="alice")
+    u.password_hash = "x"
+    ch = Channel(name="beer")
+    db.session.add_all([u, ch])
+    db.session.commit()
+    db.session.execute(sa.insert(Post.__table__), [
+        {"user_id": u.id, "channel_id": ch.id, "body": f"post number {i} about beer",
+         "tags": "ipa, stout, lager", "created_at": start + timedelta(seconds=i)}
+        for i in range(posts)
+    ])
+    db.session.commit()
+    return ch.id
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--requests", type=int, default=500)
+    ap.add_argument("--per-page", type=int, default=50)
+    args = ap.parse_args(argv)
+
+    for backend in ("null", "lru"):
+        app = make_app(FRAGMENT_CACHE_BACKEND=backend, POSTS_PER_PAGE=args.per_page)
+        with app.app_context():
+            channel_id = seed(args.per_page * 2)
+        client = app.test_client()
+        client.get(f"/channels/{channel_id}")   # warm up (and fill the cache)
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            assert client.get(f"/channels/{channel_id}").status_code == 200
+        elapsed = time.perf_counter() - start
+        with app.app_context():
+            from tipple.fragments import fragment_cache
+            ratio = fragment_cache().stats()["hit_ratio"]
+        print(f"{backend:<5} {args.requests / elapsed:>8,.0f} req/s   "
+              f"{elapsed / args.requests * 1000:6.2f} ms/req   hit ratio {ratio:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -94,6 +94,13 @@ def run_migrations_online():
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
 
+    # posts_fts (and its FTS5 shadow tables) are managed by hand-written
+    # migrations; keep autogenerate from proposing to drop them
+    def include_name(name, type_, parent_names):
+        return not (type_ == "table" and name.startswith("posts_fts"))
+
+    conf_args.setdefault("include_name", include_name)
+
     connectable = get_engine()
 
     with connectable.connect() as connection:
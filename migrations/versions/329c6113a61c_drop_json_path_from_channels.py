@@ -0,0 +1,44 @@
+"""Drop JSON path from channels (derived from lineage now)
+
+Revision ID: 329c6113a61c
+Revises: b709e22b8147
+Create Date: 2026-10-17 12:40:52.118734
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '329c6113a61c'
+down_revision = 'b709e22b8147'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('channels', schema=None) as batch_op:
+        batch_op.drop_column('path')
+
+
+def downgrade():
+    with op.batch_alter_table('channels', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('path', sa.Text(), nullable=False, server_default="[]"))
+
+    conn = op.get_bind()
+    channels = sa.table('channels', sa.column('id', sa.Integer), sa.column('path', sa.Text),
+                        sa.column('lineage', sa.Text))
+    rows = conn.execute(sa.select(channels.c.id, channels.c.lineage)).all()
+    updates = [
+        {"cid": cid, "path": json.dumps([int(seg) for seg in lineage.split("/") if seg])}
+        for cid, lineage in rows
+    ]
+    if updates:
+        conn.execute(
+            channels.update()
+            .where(channels.c.id == sa.bindparam('cid'))
+            .values(path=sa.bindparam('path')),
+            updates,
+        )
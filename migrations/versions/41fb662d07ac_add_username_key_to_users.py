@@ -0,0 +1,61 @@
+"""Add case-insensitive username_key to users
+
+Revision ID: 41fb662d07ac
+Revises: c1fed93acf29
+Create Date: 2026-10-17 16:05:12.440918
+
+"""
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '41fb662d07ac'
+down_revision = 'c1fed93acf29'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    users = sa.table('users', sa.column('id', sa.Integer), sa.column('username', sa.String),
+                     sa.column('username_key', sa.String))
+
+    rows = conn.execute(sa.select(users.c.id, users.c.username)).all()
+    by_key = defaultdict(list)
+    for uid, username in rows:
+        by_key[username.lower()].append((uid, username))
+    dupes = {k: v for k, v in by_key.items() if len(v) > 1}
+    if dupes:
+        report = "\n".join(
+            f"  {key!r}: " + ", ".join(f"#{uid} {name!r}" for uid, name in group)
+            for key, group in sorted(dupes.items())
+        )
+        raise RuntimeError(
+            "Usernames collide once lower-cased; rename these accounts before "
+            "upgrading:\n" + report
+        )
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('username_key', sa.String(length=80), nullable=True))
+
+    # Backfill in Python: SQLite's lower() only folds ASCII
+    if rows:
+        conn.execute(
+            users.update()
+            .where(users.c.id == sa.bindparam('uid'))
+            .values(username_key=sa.bindparam('key')),
+            [{"uid": uid, "key": username.lower()} for uid, username in rows],
+        )
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('username_key', existing_type=sa.String(length=80), nullable=False)
+        batch_op.create_index(batch_op.f('ix_users_username_key'), ['username_key'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_username_key'))
+        batch_op.drop_column('username_key')
@@ -0,0 +1,55 @@
+"""Home feed: users.following_count and the feed_items inbox
+
+Inboxes start empty; run `flask tipple rebuild-feeds` after upgrading.
+
+Revision ID: 5e2429b747b7
+Revises: 7665e2d9f29f
+Create Date: 2026-10-17 18:35:09.214467
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e2429b747b7'
+down_revision = '7665e2d9f29f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('following_count', sa.Integer(), nullable=False, server_default='0'))
+
+    op.execute(
+        "UPDATE users SET "
+        "following_count = (SELECT count(*) FROM user_channel_follows f WHERE f.user_id = users.id)"
+    )
+
+    op.create_table('feed_items',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('channel_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'post_id')
+    )
+    with op.batch_alter_table('feed_items', schema=None) as batch_op:
+        batch_op.create_index('ix_feed_items_post_id', ['post_id'], unique=False)
+        batch_op.create_index(
+            'ix_feed_items_user_created_post',
+            ['user_id', sa.text('created_at DESC'), sa.text('post_id DESC')],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('feed_items', schema=None) as batch_op:
+        batch_op.drop_index('ix_feed_items_user_created_post')
+        batch_op.drop_index('ix_feed_items_post_id')
+
+    op.drop_table('feed_items')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('following_count')
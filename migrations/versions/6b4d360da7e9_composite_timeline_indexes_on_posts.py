@@ -0,0 +1,41 @@
+"""Composite timeline indexes on posts
+
+Revision ID: 6b4d360da7e9
+Revises: bbd769b4f129
+Create Date: 2026-10-17 09:12:41.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b4d360da7e9'
+down_revision = 'bbd769b4f129'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_posts_channel_created_id',
+            ['channel_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+        )
+        batch_op.create_index(
+            'ix_posts_user_id_id',
+            ['user_id', sa.text('id DESC')],
+            unique=False,
+        )
+        # Both are left-prefixes of the composites above
+        batch_op.drop_index(batch_op.f('ix_posts_channel_id'))
+        batch_op.drop_index(batch_op.f('ix_posts_user_id'))
+
+
+def downgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_posts_user_id'), ['user_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_posts_channel_id'), ['channel_id'], unique=False)
+        batch_op.drop_index('ix_posts_user_id_id')
+        batch_op.drop_index('ix_posts_channel_created_id')
@@ -0,0 +1,46 @@
+"""Full-text index on post bodies (SQLite FTS5)
+
+Revision ID: 7665e2d9f29f
+Revises: 7a030b74fda3
+Create Date: 2026-10-17 17:48:20.671305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7665e2d9f29f'
+down_revision = '7a030b74fda3'
+branch_labels = None
+depends_on = None
+
+# keep in step with tipple.models.POSTS_FTS_DDL
+POSTS_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5("
+    "body, content='posts', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN "
+    "INSERT INTO posts_fts(rowid, body) VALUES (new.id, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, body) VALUES ('delete', old.id, old.body); END",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE OF body ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+    "INSERT INTO posts_fts(rowid, body) VALUES (new.id, new.body); END",
+)
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for ddl in POSTS_FTS_DDL:
+        op.execute(ddl)
+    # Build the whole index from posts in one pass
+    op.execute("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for trigger in ('posts_fts_au', 'posts_fts_ad', 'posts_fts_ai'):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS posts_fts")
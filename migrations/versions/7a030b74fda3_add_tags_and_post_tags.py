@@ -0,0 +1,62 @@
+"""Add tags and post_tags (inverted tag index)
+
+Existing posts aren't indexed here; run `flask tipple backfill-tags` after
+upgrading.
+
+Revision ID: 7a030b74fda3
+Revises: 41fb662d07ac
+Create Date: 2026-10-17 17:02:37.905114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a030b74fda3'
+down_revision = '41fb662d07ac'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tags',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('tags', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_tags_name'), ['name'], unique=True)
+
+    op.create_table('post_tags',
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.Column('channel_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('post_id', 'tag_id')
+    )
+    with op.batch_alter_table('post_tags', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_post_tags_tag_created_post',
+            ['tag_id', sa.text('created_at DESC'), sa.text('post_id DESC')],
+            unique=False,
+        )
+        batch_op.create_index(
+            'ix_post_tags_tag_channel_created_post',
+            ['tag_id', 'channel_id', sa.text('created_at DESC'), sa.text('post_id DESC')],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('post_tags', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_tags_tag_channel_created_post')
+        batch_op.drop_index('ix_post_tags_tag_created_post')
+
+    op.drop_table('post_tags')
+    with op.batch_alter_table('tags', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tags_name'))
+
+    op.drop_table('tags')
@@ -0,0 +1,51 @@
+"""Add indexed lineage string to channels
+
+Revision ID: b709e22b8147
+Revises: f7ef2f38d874
+Create Date: 2026-10-17 11:21:08.337410
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b709e22b8147'
+down_revision = 'f7ef2f38d874'
+branch_labels = None
+depends_on = None
+
+LINEAGE_WIDTH = 10  # keep in step with tipple.models.LINEAGE_WIDTH
+
+
+def upgrade():
+    with op.batch_alter_table('channels', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('lineage', sa.Text(), nullable=False, server_default=''))
+
+    # Backfill from the JSON ancestor list
+    conn = op.get_bind()
+    channels = sa.table('channels', sa.column('id', sa.Integer), sa.column('path', sa.Text),
+                        sa.column('lineage', sa.Text))
+    rows = conn.execute(sa.select(channels.c.id, channels.c.path)).all()
+    updates = [
+        {"cid": cid, "lineage": "".join(f"{i:0{LINEAGE_WIDTH}d}/" for i in json.loads(path or "[]"))}
+        for cid, path in rows
+    ]
+    if updates:
+        conn.execute(
+            channels.update()
+            .where(channels.c.id == sa.bindparam('cid'))
+            .values(lineage=sa.bindparam('lineage')),
+            updates,
+        )
+
+    with op.batch_alter_table('channels', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_channels_lineage'), ['lineage'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('channels', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_channels_lineage'))
+        batch_op.drop_column('lineage')
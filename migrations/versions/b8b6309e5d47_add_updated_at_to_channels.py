@@ -0,0 +1,31 @@
+"""Add channels.updated_at for HTTP validators
+
+Revision ID: b8b6309e5d47
+Revises: 5e2429b747b7
+Create Date: 2026-10-17 19:42:51.608113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8b6309e5d47'
+down_revision = '5e2429b747b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('channels', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    op.execute("UPDATE channels SET updated_at = created_at")
+
+    with op.batch_alter_table('channels', schema=None) as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('channels', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,68 @@
+"""Unique, case-insensitive channel names via name_key
+
+Revision ID: c1fed93acf29
+Revises: 49df63ea86b5
+Create Date: 2026-10-17 14:47:30.771905
+
+"""
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c1fed93acf29'
+down_revision = '49df63ea86b5'
+branch_labels = None
+depends_on = None
+
+
+def _normalize(name):
+    # keep in step with tipple.models.normalize_channel_name
+    return (name or "").strip().lower()
+
+
+def upgrade():
+    conn = op.get_bind()
+    channels = sa.table('channels', sa.column('id', sa.Integer), sa.column('name', sa.String),
+                        sa.column('name_key', sa.String))
+
+    rows = conn.execute(sa.select(channels.c.id, channels.c.name)).all()
+    by_key = defaultdict(list)
+    for cid, name in rows:
+        by_key[_normalize(name)].append((cid, name))
+    dupes = {k: v for k, v in by_key.items() if len(v) > 1}
+    if dupes:
+        report = "\n".join(
+            f"  {key!r}: " + ", ".join(f"#{cid} {name!r}" for cid, name in group)
+            for key, group in sorted(dupes.items())
+        )
+        raise RuntimeError(
+            "Channel names collide once trimmed and lower-cased; rename or merge "
+            "these before upgrading:\n" + report
+        )
+
+    with op.batch_alter_table('channels', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('name_key', sa.String(length=255), nullable=True))
+
+    if rows:
+        conn.execute(
+            channels.update()
+            .where(channels.c.id == sa.bindparam('cid'))
+            .values(name_key=sa.bindparam('key')),
+            [{"cid": cid, "key": _normalize(name)} for cid, name in rows],
+        )
+
+    with op.batch_alter_table('channels', schema=None) as batch_op:
+        batch_op.alter_column('name_key', existing_type=sa.String(length=255), nullable=False)
+        batch_op.create_index(batch_op.f('ix_channels_name_key'), ['name_key'], unique=True)
+        # name_key serves prefix search now
+        batch_op.drop_index(batch_op.f('ix_channels_name'))
+
+
+def downgrade():
+    with op.batch_alter_table('channels', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_channels_name'), ['name'], unique=False)
+        batch_op.drop_index(batch_op.f('ix_channels_name_key'))
+        batch_op.drop_column('name_key')
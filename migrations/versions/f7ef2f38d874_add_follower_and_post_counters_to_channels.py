@@ -0,0 +1,35 @@
+"""Add follower and post counters to channels
+
+Revision ID: f7ef2f38d874
+Revises: 6b4d360da7e9
+Create Date: 2026-10-17 10:03:27.904115
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7ef2f38d874'
+down_revision = '6b4d360da7e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('channels', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('follower_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('post_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill from the source tables
+    op.execute(
+        "UPDATE channels SET "
+        "follower_count = (SELECT count(*) FROM user_channel_follows f WHERE f.channel_id = channels.id), "
+        "post_count = (SELECT count(*) FROM posts p WHERE p.channel_id = channels.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('channels', schema=None) as batch_op:
+        batch_op.drop_column('post_count')
+        batch_op.drop_column('follower_count')
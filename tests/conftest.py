@@ -59,4 +59,73 @@ def make_channel(db):
         db.session.add(ch)
         db.session.commit()
         return ch
-    return _make
\ No newline at end of file
+    return _make
+
+
+@pytest.fixture()
+def make_post(db):
+    """Quick helper to create a Post."""
+    from tipple.models import Post
+    def _make(body: str = "hi", *, user, channel, tags: str | None = None) -> Post:
+        p = Post(body=body, tags=tags)
+        p.author, p.channel = user, channel
+        db.session.add(p)
+        db.session.commit()
+        return p
+    return _make
+
+@pytest.fixture()
+def capture_sql(db):
+    """
+    Context manager recording every (statement, parameters) pair the engine
+    sends to the DB-API cursor while the block runs.
+    """
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def _capture():
+        stmts: list[tuple[str, object]] = []
+
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            stmts.append((statement, parameters))
+
+        event.listen(db.engine, "before_cursor_execute", _before)
+        try:
+            yield stmts
+        finally:
+            event.remove(db.engine, "before_cursor_execute", _before)
+    return _capture
+
+
+@pytest.fixture()
+def explain(db):
+    """Return SQLite's EXPLAIN QUERY PLAN detail lines for a captured statement."""
+    def _explain(statement: str, parameters=()) -> list[str]:
+        rows = db.session.connection().exec_driver_sql(
+            "EXPLAIN QUERY PLAN " + statement, parameters
+        ).all()
+        return [r[-1] for r in rows]
+    return _explain
+
+
+@pytest.fixture()
+def assert_max_queries(capture_sql):
+    """
+    Fail if the block issues more than `n` SQL statements. Use it around
+    anything that renders a list so N+1 regressions show up in CI:
+
+        with assert_max_queries(4):
+            client.get(...)
+    """
+    from contextlib import contextmanager
+
+    @contextmanager
+    def _assert(n: int):
+        with capture_sql() as stmts:
+            yield stmts
+        assert len(stmts) <= n, (
+            f"expected at most {n} queries, got {len(stmts)}:\n"
+            + "\n".join(s for s, _ in stmts)
+        )
+    return _assert
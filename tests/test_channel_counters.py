@@ -0,0 +1,59 @@
+# tests/test_channel_counters.py
+from __future__ import annotations
+
+
+def test_counters_track_follow_and_unfollow(db, make_user, make_channel):
+    from tipple.models import Channel
+    a = make_user()
+    b = make_user(email="b@example.com", username="bob")
+    ch = make_channel("news")
+
+    a.follow(ch.id); b.follow(ch.id); a.follow(ch.id)
+    db.session.commit()
+    assert db.session.get(Channel, ch.id).follower_count == 2
+
+    a.unfollow(ch.id); a.unfollow(ch.id)
+    db.session.commit()
+    assert db.session.get(Channel, ch.id).follower_count == 1
+
+
+def test_counters_track_posts(db, make_user, make_channel, make_post):
+    u = make_user()
+    ch = make_channel("busy")
+    p = make_post(user=u, channel=ch)
+    make_post(user=u, channel=ch)
+    assert ch.post_count == 2
+
+    db.session.delete(p)
+    db.session.commit()
+    assert ch.post_count == 1
+
+
+def test_channel_api_returns_counters(client, make_user, make_channel, make_post, login):
+    u = make_user()
+    ch = make_channel("general")
+    make_post(user=u, channel=ch)
+    login()
+    client.post(f"/channels/api/{ch.id}")
+
+    data = client.get(f"/channels/api/{ch.id}").get_json()
+    assert data["follower_count"] == 1
+    assert data["post_count"] == 1
+
+
+def test_recount_command_repairs_drift(app, db, make_user, make_channel, make_post):
+    from tipple.models import Channel
+    u = make_user()
+    ch = make_channel("drifty")
+    make_post(user=u, channel=ch)
+    u.following.append(ch)          # bypasses the maintained follow() path
+    ch.post_count = 99
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["tipple", "recount"])
+    assert result.exit_code == 0, result.output
+    assert "Recounted 1 channel(s)." in result.output
+
+    db.session.expire_all()
+    ch = db.session.get(Channel, ch.id)
+    assert (ch.follower_count, ch.post_count) == (1, 1)
@@ -0,0 +1,95 @@
+# tests/test_channel_picker.py
+from __future__ import annotations
+
+
+def test_new_channel_page_lists_parents(client, make_channel):
+    make_channel("beta")
+    make_channel("alpha")
+    html = client.get("/channels/new").get_data(as_text=True)
+    assert html.index("#alpha") < html.index("#beta")
+
+
+def test_parent_choices_cached_until_channel_changes(client, db, make_channel, capture_sql):
+    from tipple.models import Channel
+    ch = make_channel("alpha")
+    client.get("/channels/new")
+
+    with capture_sql() as stmts:
+        client.get("/channels/new")
+    assert not any("FROM channels" in s for s, _ in stmts)
+
+    # Create, rename and delete each drop the cached list
+    other = make_channel("gamma")
+    assert b"#gamma" in client.get("/channels/new").data
+
+    ch.name = "renamed"
+    db.session.commit()
+    assert b"#renamed" in client.get("/channels/new").data
+
+    db.session.delete(db.session.get(Channel, other.id))
+    db.session.commit()
+    assert b"#gamma" not in client.get("/channels/new").data
+
+
+def test_create_with_parent_not_in_cached_choices(client, db, make_user, login, make_channel):
+    from tipple.models import Channel
+    make_user()
+    login()
+    client.get("/channels/new")  # warm the cache
+
+    # Simulate a parent created by another worker (cache not invalidated here)
+    db.session.execute(Channel.__table__.insert().values(
+        id=500, name="elsewhere", name_key="elsewhere", lineage="", created_at=db.func.current_timestamp()))
+    db.session.commit()
+
+    r = client.post("/channels/new", data={"name": "kid", "parent_id": 500})
+    assert r.status_code == 302
+    kid = Channel.query.filter_by(name="kid").one()
+    assert kid.parent_id == 500
+
+
+def test_new_channel_invalid_form_rerenders(client, make_user, login):
+    make_user()
+    login()
+    r = client.post("/channels/new", data={"name": ""})
+    assert r.status_code == 400
+    assert b"Create a channel" in r.data
+
+
+def test_channel_typeahead_prefix_and_limit(client, make_channel):
+    for name in ("dev", "devops", "design", "docs", "random"):
+        make_channel(name)
+
+    r = client.get("/channels/api/search?q=de")
+    assert [c["name"] for c in r.get_json()["results"]] == ["design", "dev", "devops"]
+
+    r = client.get("/channels/api/search?q=de&limit=1")
+    assert [c["name"] for c in r.get_json()["results"]] == ["design"]
+
+    assert client.get("/channels/api/search").get_json()["results"] == []
+
+
+def test_typeahead_prefix_at_code_point_edges(client, make_channel):
+    make_channel("a\U0010ffff")
+    make_channel("b\ud7ffx")
+    r = client.get("/channels/api/search", query_string={"q": "a\U0010ffff"})
+    assert [c["name"] for c in r.get_json()["results"]] == ["a\U0010ffff"]
+    r = client.get("/channels/api/search", query_string={"q": "\U0010ffff"})
+    assert r.status_code == 200 and r.get_json()["results"] == []
+    r = client.get("/channels/api/search", query_string={"q": "b\ud7ff"})
+    assert [c["name"] for c in r.get_json()["results"]] == ["b\ud7ffx"]
+
+
+def test_channel_typeahead_uses_name_index(db, make_channel, capture_sql, explain, client):
+    make_channel("dev")
+    with capture_sql() as stmts:
+        client.get("/channels/api/search?q=de")
+    (statement, params), = [(s, p) for s, p in stmts if "FROM channels" in s]
+    plan = " | ".join(explain(statement, params))
+    assert "ix_channels_name_key" in plan, plan
+
+
+def test_typeahead_is_case_insensitive(client, make_channel):
+    make_channel("DevOps")
+    r = client.get("/channels/api/search?q=dEV")
+    assert [c["name"] for c in r.get_json()["results"]] == ["DevOps"]
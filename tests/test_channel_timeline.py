@@ -0,0 +1,112 @@
+# tests/test_channel_timeline.py
+from __future__ import annotations
+
+import re
+
+from tipple.pagination import encode_cursor, decode_cursor
+
+
+def _make_posts(db, user, channel, n: int):
+    from tipple.models import Post
+    posts = []
+    for i in range(n):
+        p = Post(body=f"post-{i}", tags=None)
+        p.author = user
+        p.channel = channel
+        db.session.add(p)
+        posts.append(p)
+    db.session.commit()
+    return posts
+
+
+def _next_url(html: bytes) -> str | None:
+    m = re.search(rb'href="([^"]*cursor=[^"]*)"', html)
+    return m.group(1).decode().replace("&amp;", "&") if m else None
+
+
+def test_cursor_roundtrip():
+    from datetime import datetime
+    ts = datetime(2025, 9, 1, 12, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(ts, 42)) == (ts, 42)
+
+
+def test_channel_timeline_walks_all_pages_newest_first(app, client, db, make_user, make_channel):
+    app.config["POSTS_PER_PAGE"] = 2
+    u = make_user()
+    ch = make_channel("busy")
+    _make_posts(db, u, ch, 5)
+
+    seen: list[str] = []
+    url: str | None = f"/channels/{ch.id}"
+    pages = 0
+    while url:
+        r = client.get(url)
+        assert r.status_code == 200
+        seen += re.findall(r"post-\d", r.get_data(as_text=True))
+        url = _next_url(r.data)
+        pages += 1
+
+    assert pages == 3
+    assert seen == [f"post-{i}" for i in reversed(range(5))]
+
+
+def test_channel_timeline_single_page_has_no_next_link(app, client, db, make_user, make_channel):
+    app.config["POSTS_PER_PAGE"] = 10
+    u = make_user()
+    ch = make_channel("quiet")
+    _make_posts(db, u, ch, 3)
+
+    r = client.get(f"/channels/{ch.id}")
+    assert r.status_code == 200
+    assert b"Load more" not in r.data
+
+
+def test_channel_timeline_bad_cursor_is_400(client, make_channel):
+    ch = make_channel("general")
+    r = client.get(f"/channels/{ch.id}?cursor=not-a-cursor")
+    assert r.status_code == 400
+
+
+def _page_queries(db, client, url, assert_max_queries, limit=10):
+    db.session.expunge_all()   # start cold, like a fresh request
+    with assert_max_queries(limit) as stmts:
+        r = client.get(url)
+    assert r.status_code == 200
+    return len(stmts)
+
+
+def test_channel_timeline_query_count_independent_of_authors(
+    app, client, db, make_user, make_channel, assert_max_queries
+):
+    from tipple.models import Post
+    app.config["POSTS_PER_PAGE"] = 20
+    one = make_channel("one-author")
+    many = make_channel("many-authors")
+    authors = [make_user(email=f"a{i}@example.com", username=f"author{i}") for i in range(8)]
+    for i in range(16):
+        for ch, u in ((one, authors[0]), (many, authors[i % 8])):
+            p = Post(body=f"hello {i}", tags=None)
+            p.author = u
+            p.channel = ch
+            db.session.add(p)
+    db.session.commit()
+    one_id, many_id = one.id, many.id
+
+    single = _page_queries(db, client, f"/channels/{one_id}", assert_max_queries)
+    multi = _page_queries(db, client, f"/channels/{many_id}", assert_max_queries)
+    assert multi == single
+
+
+def test_me_page_query_count(client, db, make_user, make_channel, login, assert_max_queries):
+    from tipple.models import Post
+    u = make_user()
+    ch = make_channel()
+    for i in range(10):
+        p = Post(body=f"mine {i}", tags=None)
+        p.author = u
+        p.channel = ch
+        db.session.add(p)
+    db.session.commit()
+    login()
+
+    _page_queries(db, client, "/auth/me", assert_max_queries, limit=3)
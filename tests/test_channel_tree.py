@@ -0,0 +1,131 @@
+# tests/test_channel_tree.py
+from __future__ import annotations
+
+import re
+
+import pytest
+
+
+def _tree(db):
+    """a -> b -> c, plus an unrelated root d (all created in one flush)."""
+    from tipple.models import Channel
+    a = Channel(name="a")
+    b = Channel(name="b"); b.parent = a
+    c = Channel(name="c"); c.parent = b
+    d = Channel(name="d")
+    db.session.add_all([a, b, c, d])
+    db.session.commit()
+    return a, b, c, d
+
+
+def test_lineage_set_for_channels_created_in_one_flush(db):
+    a, b, c, d = _tree(db)
+    assert a.path == [] and a.lineage == ""
+    assert c.path == [a.id, b.id]
+    assert c.lineage == f"{a.id:010d}/{b.id:010d}/"
+
+
+def test_descendants_and_ancestors(db):
+    a, b, c, d = _tree(db)
+    assert [x.name for x in a.descendants()] == ["b", "c"]
+    assert b.descendants() == [c]
+    assert d.descendants() == []
+    assert [x.name for x in c.ancestors()] == ["a", "b"]
+    assert a.ancestors() == []
+
+
+def test_child_of_existing_parent(db, make_channel):
+    a, b, c, d = _tree(db)
+    e = make_channel("e", parent=c)
+    assert e.path == [a.id, b.id, c.id]
+    assert [x.name for x in a.descendants()] == ["b", "c", "e"]
+
+
+def test_reparent_updates_whole_subtree(db):
+    a, b, c, d = _tree(db)
+    b.parent = d
+    db.session.commit()
+
+    assert a.descendants() == []
+    assert [x.name for x in d.descendants()] == ["b", "c"]
+    assert c.path == [d.id, b.id]
+    assert [x.name for x in c.ancestors()] == ["d", "b"]
+
+
+def test_descendants_is_index_range_scan(db, capture_sql, explain):
+    a, b, c, d = _tree(db)
+    prefix = a.subtree_prefix
+    from tipple.models import Channel
+    with capture_sql() as stmts:
+        Channel.query.filter(Channel.under(prefix)).all()
+    (statement, params), = stmts
+    plan = " | ".join(explain(statement, params))
+    assert "ix_channels_lineage" in plan, plan
+
+
+def test_subtree_timeline_route(app, client, db, make_user):
+    from tipple.models import Post
+    app.config["POSTS_PER_PAGE"] = 2
+    a, b, c, d = _tree(db)
+    u = make_user()
+    for ch in (a, b, c, d):
+        p = Post(body=f"in-{ch.name}", tags=None)
+        p.author = u
+        p.channel = ch
+        db.session.add(p)
+    db.session.commit()
+
+    seen: list[str] = []
+    url = f"/channels/{a.id}/all"
+    while url:
+        r = client.get(url)
+        assert r.status_code == 200
+        seen += re.findall(r"in-[a-d]", r.get_data(as_text=True))
+        m = re.search(r'href="([^"]*cursor=[^"]*)"', r.get_data(as_text=True))
+        url = m.group(1) if m else None
+    assert seen == ["in-c", "in-b", "in-a"]
+
+    only = client.get(f"/channels/{a.id}").get_data(as_text=True)
+    assert re.findall(r"in-[a-d]", only) == ["in-a"]
+
+
+def test_reparent_is_set_based(db, capture_sql):
+    """Moving a subtree costs a fixed number of statements, not one per node."""
+    from tipple.models import Channel
+    a, b, c, d = _tree(db)
+    for i in range(20):
+        x = Channel(name=f"leaf{i}"); x.parent = c
+        db.session.add(x)
+    db.session.commit()
+    db.session.expire_all()
+
+    b = db.session.get(Channel, b.id)
+    d_id = d.id
+    with capture_sql() as stmts:
+        b.parent_id = d_id
+        db.session.commit()
+    assert len(stmts) <= 6, "\n".join(s for s, _ in stmts)
+    assert len(db.session.get(Channel, d_id).descendants()) == 22
+
+
+def test_move_under_own_descendant_is_rejected(db, capture_sql):
+    from tipple.models import Channel, ChannelMoveError
+    a, b, c, d = _tree(db)
+    with capture_sql() as stmts:
+        with pytest.raises(ChannelMoveError, match="own descendant"):
+            b.parent = c
+        with pytest.raises(ChannelMoveError, match="under itself"):
+            a.parent = a
+    assert not [st for st, _ in stmts if not st.startswith("SELECT")]      # nothing flushed
+    assert b.parent is a and a.parent is None
+
+    # Pending channels are followed up in memory
+    e = Channel(name="e"); e.parent = c
+    db.session.add(e)
+    with pytest.raises(ChannelMoveError):
+        a.parent = e
+
+    # The session is untouched, so a valid move still goes through
+    d.parent = c
+    db.session.commit()
+    assert d.path == [a.id, b.id, c.id]
@@ -102,3 +102,35 @@ def test_follow_channel_success_and_idempotent(client, db, make_user, login, mak
     msg = r2.get_json().get("message", "")
     # Route typically says "already following" on the second call
     assert "following" in msg.lower()
+
+
+def test_create_channel_duplicate_is_case_insensitive(client, make_user, login, make_channel):
+    make_channel("Dev")
+    u = make_user(email="dupe@example.com", username="dupe", password="pw")
+    login(identifier=u.email, password="pw")
+
+    r = client.post("/channels/api/new", json={"name": " dev "})
+    assert r.status_code == 409
+    assert r.get_json()["error"] == "channel name already exists"
+
+
+def test_create_channel_is_a_single_insert(client, make_user, login, capture_sql):
+    u = make_user(email="one@example.com", username="one", password="pw")
+    login(identifier=u.email, password="pw")
+
+    with capture_sql() as stmts:
+        r = client.post("/channels/api/new", json={"name": "fresh"})
+    assert r.status_code == 201
+    channel_stmts = [s.split()[0] for s, _ in stmts if "channels" in s and "FROM users" not in s]
+    # no SELECT-before-INSERT duplicate probe (the re-read after commit is fine)
+    assert channel_stmts[0] == "INSERT"
+    assert channel_stmts.count("INSERT") == 1
+
+
+def test_create_channel_html_duplicate_is_409(client, make_user, login, make_channel):
+    make_channel("General")
+    make_user()
+    login()
+    r = client.post("/channels/new", data={"name": "general", "parent_id": 0})
+    assert r.status_code == 409
+    assert b"A channel with that name already exists." in r.data
@@ -0,0 +1,79 @@
+# tests/test_conditional_get.py
+from __future__ import annotations
+
+from flask import g
+
+
+def test_channel_api_revalidates_without_rebuilding(client, db, make_user, make_channel, make_post, capture_sql):
+    u = make_user()
+    ch = make_channel("beer")
+    url = f"/channels/api/{ch.id}"
+
+    r = client.get(url)
+    etag, last_modified = r.headers["ETag"], r.headers["Last-Modified"]
+    assert not etag.startswith("W/") and "public" in r.headers["Cache-Control"]
+
+    with capture_sql() as stmts:
+        r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 304 and r.headers["ETag"] == etag and not r.data
+    assert len(stmts) <= 1                                   # the channel row, at most
+    assert client.get(url, headers={"If-Modified-Since": last_modified}).status_code == 304
+
+    # Posts and follows change the validator
+    make_post("hello", user=u, channel=ch)
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 200 and r.get_json()["post_count"] == 1
+    etag = r.headers["ETag"]
+
+    u.follow(ch.id)
+    db.session.commit()
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 200 and r.get_json()["follower_count"] == 1
+
+
+def test_bulk_import_changes_the_validator(client, db, make_user, make_channel):
+    from tipple.ingest import PostImporter
+    u = make_user()
+    ch = make_channel("beer")
+    url = f"/channels/api/{ch.id}"
+    etag = client.get(url).headers["ETag"]
+
+    PostImporter(default_user_id=u.id).run([{"channel_id": ch.id, "body": "imported"}])
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_channel_page_304_is_per_viewer(client, make_user, make_channel, make_post, login, capture_sql):
+    u = make_user()
+    make_user(email="bob@example.com", username="bob")
+    ch = make_channel("beer")
+    make_post("hello", user=u, channel=ch)
+    url = f"/channels/{ch.id}"
+
+    anon_etag = client.get(url).headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": anon_etag}).status_code == 304
+
+    login()
+    assert "ETag" not in client.get(url).headers             # the login flash is shown
+    r = client.get(url)
+    etag = r.headers["ETag"]
+    assert etag.startswith("W/") and etag != anon_etag
+    assert "private" in r.headers["Cache-Control"] and "Cookie" in r.headers["Vary"]
+
+    with capture_sql() as stmts:
+        r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert not any("FROM posts" in s for s, _ in stmts)      # no timeline query
+
+    # Following changes this viewer's page (and the channel's counters)
+    client.post(f"/channels/{ch.id}/follow")
+    r = client.get(url, headers={"If-None-Match": etag})     # shows the flash
+    assert r.status_code == 200 and b"Now following" in r.data and "ETag" not in r.headers
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 200 and r.headers["ETag"] != etag
+
+    client.post("/auth/logout")
+    login("bob@example.com")
+    g.pop("_login_user", None)      # the test app context outlives requests
+    client.get("/")                 # shows the login flash
+    r = client.get(url, headers={"If-None-Match": r.headers["ETag"]})
+    assert r.status_code == 200 and "ETag" in r.headers
@@ -0,0 +1,146 @@
+# tests/test_feed.py
+from __future__ import annotations
+
+import re
+
+import sqlalchemy as sa
+import pytest
+
+
+def _walk_feed(client) -> list[str]:
+    seen: list[str] = []
+    url: str | None = "/"
+    while url:
+        r = client.get(url)
+        assert r.status_code == 200
+        html = r.get_data(as_text=True)
+        seen += re.findall(r"post-\w+", html)
+        m = re.search(r'href="([^"]*cursor=[^"]*)"', html)
+        url = m.group(1).replace("&amp;", "&") if m else None
+    return seen
+
+
+def _inbox(db, user_id):
+    from tipple.models import feed_items
+    return db.session.scalars(
+        sa.select(feed_items.c.post_id).where(feed_items.c.user_id == user_id).order_by(feed_items.c.post_id)
+    ).all()
+
+
+def test_anonymous_home_is_the_welcome_card(client):
+    r = client.get("/")
+    assert r.status_code == 200 and b"Welcome to tipple" in r.data
+
+
+@pytest.mark.parametrize("fanout_max", [200, 1], ids=["fan-out-on-read", "inbox"])
+def test_feed_merges_followed_channels_newest_first(app, client, db, make_user, make_channel, make_post, login,
+                                                   fanout_max):
+    app.config.update(POSTS_PER_PAGE=2, FEED_FANOUT_MAX_FOLLOWS=fanout_max)
+    u = make_user()
+    a, b, c = make_channel("a"), make_channel("b"), make_channel("c")
+    make_post("post-a0", user=u, channel=a)
+    make_post("post-c0", user=u, channel=c)
+    make_post("post-b0", user=u, channel=b)
+
+    u.follow(a.id); u.follow(b.id)
+    db.session.commit()
+
+    # Posted after following: reaches an inbox through fan-out on write
+    make_post("post-a1", user=u, channel=a)
+    make_post("post-c1", user=u, channel=c)
+
+    login()
+    assert _walk_feed(client) == ["post-a1", "post-b0", "post-a0"]
+
+    u.unfollow(a.id)
+    db.session.commit()
+    assert _walk_feed(client) == ["post-b0"]
+
+
+def test_inbox_lifecycle(app, db, make_user, make_channel, make_post):
+    app.config["FEED_FANOUT_MAX_FOLLOWS"] = 1
+    u = make_user()
+    a, b = make_channel("a"), make_channel("b")
+    pa, pb = make_post("post-a", user=u, channel=a), make_post("post-b", user=u, channel=b)
+
+    u.follow(a.id); db.session.commit()
+    assert u.following_count == 1 and _inbox(db, u.id) == []
+
+    u.follow(b.id); db.session.commit()          # crosses the threshold: built
+    assert _inbox(db, u.id) == [pa.id, pb.id]
+
+    db.session.delete(pa); db.session.commit()   # deleted posts leave inboxes
+    assert _inbox(db, u.id) == [pb.id]
+
+    u.unfollow(b.id); db.session.commit()        # back under: inbox dropped
+    assert u.following_count == 1 and _inbox(db, u.id) == []
+
+
+def test_inbox_is_bounded_but_the_feed_is_not(app, client, db, make_user, make_channel, make_post, login):
+    from datetime import datetime, timedelta, UTC
+    from tipple.ingest import insert_posts
+    app.config.update(POSTS_PER_PAGE=2, FEED_FANOUT_MAX_FOLLOWS=1, FEED_INBOX_SIZE=3)
+    u = make_user()
+    a, b, c = make_channel("a"), make_channel("b"), make_channel("c")
+    bodies = [make_post(f"post-{ch.name}{i}", user=u, channel=ch).body for i in range(2) for ch in (a, b, c)]
+    u.follow(a.id); u.follow(b.id); db.session.commit()
+    assert len(_inbox(db, u.id)) == 3
+
+    for i in range(2, 5):
+        bodies.append(make_post(f"post-a{i}", user=u, channel=a).body)
+    assert len(_inbox(db, u.id)) == 3                         # trimmed on fan-out
+
+    # Backdated import, below the inbox: still shows up, in order
+    insert_posts(db.session.connection(), [{
+        "user_id": u.id, "channel_id": b.id, "body": "post-old",
+        "tags": None, "created_at": datetime.now(UTC) - timedelta(days=1),
+    }])
+    db.session.commit()
+    assert len(_inbox(db, u.id)) == 3
+
+    login()
+    followed = [x for x in reversed(bodies) if not x.startswith("post-c")]
+    assert _walk_feed(client) == followed + ["post-old"]
+
+    u.follow(c.id); db.session.commit()
+    assert len(_inbox(db, u.id)) == 3
+    assert _walk_feed(client) == list(reversed(bodies)) + ["post-old"]
+
+
+def test_rebuild_feeds_and_recount(app, db, make_user, make_channel, make_post):
+    from tipple.models import User
+    u = make_user()
+    a, b = make_channel("a"), make_channel("b")
+    p = make_post("post-a", user=u, channel=a)
+    u.follow(a.id); u.follow(b.id); db.session.commit()
+    assert _inbox(db, u.id) == []
+
+    app.config["FEED_FANOUT_MAX_FOLLOWS"] = 1
+    runner = app.test_cli_runner()
+    assert "Rebuilt 1 inbox(es)." in runner.invoke(args=["tipple", "rebuild-feeds"]).output
+    assert _inbox(db, u.id) == [p.id]
+
+    db.session.execute(sa.update(User).values(following_count=0))
+    db.session.commit()
+    runner.invoke(args=["tipple", "recount"])
+    db.session.expire_all()
+    assert db.session.get(User, u.id).following_count == 2
+
+
+def test_fanout_read_probes_each_channel_index(db, make_user, make_channel, make_post, capture_sql, explain):
+    from tipple.feed import home_feed
+    u = make_user()
+    for name in ("a", "b", "c"):
+        ch = make_channel(name)
+        make_post(f"post-{name}", user=u, channel=ch)
+        u.follow(ch.id)
+    db.session.commit()
+
+    with capture_sql() as stmts:
+        page = home_feed(u.id, per_page=2)
+    assert [p.body for p in page.items] == ["post-c", "post-b"] and page.next_cursor
+    statement, params = next((s, p) for s, p in stmts if "JOIN user_channel_follows" in s)
+    plan = " | ".join(explain(statement, params))
+    assert "SEARCH user_channel_follows" in plan, plan
+    assert "SEARCH posts USING COVERING INDEX ix_posts_channel_created_id" in plan, plan
+    assert "SCAN" not in plan, plan
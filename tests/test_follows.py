@@ -0,0 +1,62 @@
+# tests/test_follows.py
+from __future__ import annotations
+
+from sqlalchemy import inspect
+
+
+def test_follow_primitives_are_idempotent(db, make_user, make_channel):
+    u = make_user()
+    ch = make_channel("news")
+
+    assert u.is_following(ch.id) is False
+    assert u.follow(ch.id) is True
+    assert u.follow(ch.id) is False
+    db.session.commit()
+    assert u.is_following(ch.id) is True
+    assert [c.id for c in u.following] == [ch.id]
+
+    assert u.unfollow(ch.id) is True
+    assert u.unfollow(ch.id) is False
+    db.session.commit()
+    assert u.is_following(ch.id) is False
+    assert u.following == []
+
+
+def test_follow_checks_do_not_load_collection(db, make_user, make_channel):
+    u = make_user()
+    chans = [make_channel(f"c{i}") for i in range(5)]
+    for ch in chans:
+        u.follow(ch.id)
+    db.session.commit()
+
+    assert u.is_following(chans[2].id)
+    u.unfollow(chans[0].id)
+    u.follow(chans[0].id)
+    assert "following" in inspect(u).unloaded
+
+
+def test_follow_unfollow_html_routes(client, db, make_user, make_channel, login):
+    from tipple.models import User
+    u = make_user()
+    ch = make_channel("random")
+    login()
+
+    r = client.post(f"/channels/{ch.id}/follow", follow_redirects=True)
+    assert b"Now following #random." in r.data
+    assert b"Unfollow" in r.data
+    r = client.post(f"/channels/{ch.id}/follow", follow_redirects=True)
+    assert b"Already following #random." in r.data
+    assert db.session.get(User, u.id).is_following(ch.id)
+
+    r = client.post(f"/channels/{ch.id}/unfollow", follow_redirects=True)
+    assert b"Unfollowed #random." in r.data
+    r = client.post(f"/channels/{ch.id}/unfollow", follow_redirects=True)
+    assert b"You are not following #random." in r.data
+    assert not db.session.get(User, u.id).is_following(ch.id)
+
+
+def test_follow_missing_channel_is_404(client, make_user, login):
+    make_user()
+    login()
+    assert client.post("/channels/424242/follow").status_code == 404
+    assert client.post("/channels/424242/unfollow").status_code == 404
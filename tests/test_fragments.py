@@ -0,0 +1,74 @@
+# tests/test_fragments.py
+from __future__ import annotations
+
+
+def test_lru_backend_is_bounded_by_size():
+    from tipple.fragments import LRUFragmentBackend
+    cache = LRUFragmentBackend(max_bytes=10)
+    cache.set((1, "v", None), 1, "aaaa")
+    cache.set((2, "v", None), 2, "bbbb")
+    assert cache.get_many([(1, "v", None)]) == {(1, "v", None): "aaaa"}   # 1 is now newest
+    cache.set((3, "v", None), 3, "cccc")                                   # evicts 2
+    assert set(cache.get_many([(1, "v", None), (2, "v", None), (3, "v", None)])) == {(1, "v", None), (3, "v", None)}
+    cache.set((4, "v", None), 4, "x" * 11)                                 # too big to keep
+    assert cache.get_many([(4, "v", None)]) == {}
+
+    stats = cache.stats()
+    assert stats["bytes"] == 8 and stats["entries"] == 2
+    assert (stats["hits"], stats["misses"]) == (3, 2)
+
+    cache.discard_post(1)
+    assert cache.stats()["entries"] == 1
+
+
+def test_timeline_renders_only_misses(app, client, make_user, make_channel, make_post, monkeypatch):
+    app.config["CACHE_STATS_ENABLED"] = True
+    u = make_user()
+    ch = make_channel("beer")
+    make_post("first <b>", user=u, channel=ch, tags="ipa")
+    make_post("second", user=u, channel=ch)
+
+    r1 = client.get(f"/channels/{ch.id}")
+    assert b"first &lt;b&gt;" in r1.data and b"/tags/ipa" in r1.data
+
+    # A new post is the only fragment rendered on the next view
+    make_post("third", user=u, channel=ch)
+    template = app.jinja_env.get_template("channels/_post_item.html")
+    rendered = []
+    real_render = type(template).render
+
+    def render(self, *args, **kwargs):
+        if self.name == template.name:
+            rendered.append(kwargs["p"].body)
+        return real_render(self, *args, **kwargs)
+
+    monkeypatch.setattr(type(template), "render", render)
+    r2 = client.get(f"/channels/{ch.id}")
+    assert rendered == ["third"]
+    assert r1.get_data(as_text=True).split("<ul")[1].split("</ul>")[0] in r2.get_data(as_text=True)
+
+    stats = client.get("/_internal/cache-stats").get_json()["fragments"]
+    assert (stats["hits"], stats["misses"]) == (2, 3)
+    assert stats["hit_ratio"] == 0.4
+
+
+def test_feed_variant_and_invalidation(app, client, db, make_user, make_channel, make_post, login):
+    u = make_user()
+    ch = make_channel("beer")
+    p = make_post("hello", user=u, channel=ch)
+    u.follow(ch.id)
+    db.session.commit()
+
+    client.get(f"/channels/{ch.id}")
+    login()
+    assert b"#beer" in client.get("/").data          # feed shows the channel; own entry
+
+    p.tags = "stout"                                 # edits drop the post's fragments
+    db.session.commit()
+    assert b"/tags/stout" in client.get(f"/channels/{ch.id}").data
+    assert b"/tags/stout" in client.get("/").data
+
+
+def test_cache_stats_endpoint_is_off_by_default(app, client):
+    app.config["CACHE_STATS_ENABLED"] = False
+    assert client.get("/_internal/cache-stats").status_code == 404
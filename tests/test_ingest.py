@@ -0,0 +1,148 @@
+# tests/test_ingest.py
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+import sqlalchemy as sa
+
+from tipple.ingest import RecordError, iter_json_array, iter_ndjson
+
+
+def _records(n, channel="beer", **extra):
+    return [{"channel": channel, "body": f"imported {i}", **extra} for i in range(n)]
+
+
+def _ndjson(records):
+    return "\n".join(json.dumps(r) for r in records) + "\n"
+
+
+def test_json_array_reader_streams_across_chunk_boundaries():
+    records = [{"body": "a, [b] \"c\" \u00e9\U0001f37a", "n": 12345}, 67890, "x", {"nested": [1, {"y": "]"}]},
+               [True, False, None, -1.5e-3]]
+    text = json.dumps(records, indent=1)
+    for chunk_size in (1, 3, 7, 64):
+        assert list(iter_json_array(io.StringIO(text), chunk_size=chunk_size)) == records
+    assert list(iter_json_array(io.StringIO("[]"))) == []
+
+
+def test_json_array_reader_fails_at_a_broken_element():
+    class Body(io.StringIO):
+        reads = 0
+
+        def read(self, size=-1):
+            self.reads += 1
+            return super().read(size)
+
+    body = Body("[" + json.dumps(_records(2))[1:-1] + ", {nope}, " + json.dumps(_records(2000))[1:])
+    records = iter_json_array(body, chunk_size=64)
+    assert len([next(records), next(records)]) == 2
+    with pytest.raises(RecordError, match="malformed"):
+        next(records)
+    assert body.reads < 5                                   # didn't read on to the end
+
+
+def test_ndjson_reader_keeps_positions_for_bad_lines():
+    from tipple.ingest import _Unparseable
+    out = list(iter_ndjson(['{"a": 1}\n', "\n", "{nope\n", b'{"b": 2}\n']))
+    assert out[0] == {"a": 1} and isinstance(out[1], _Unparseable) and out[2] == {"b": 2}
+
+
+def test_cli_import_maintains_derived_data(app, db, make_user, make_channel, tmp_path, capture_sql):
+    from tipple.models import Channel, Post, post_tags
+    make_user(username="alice")
+    make_user(email="bob@example.com", username="Bob")
+    ch = make_channel("Beer")
+
+    src = tmp_path / "archive.ndjson"
+    src.write_text(_ndjson(
+        _records(4, tags="Stout, #dark")
+        + [{"channel_id": ch.id, "body": "by bob", "author": "bob", "created_at": "2020-01-02T03:04:05Z"},
+           {"channel": "nope", "body": "lost"},
+           {"channel": "beer", "body": ""}]
+    ))
+    with capture_sql() as stmts:
+        result = app.test_cli_runner().invoke(args=[
+            "tipple", "import-posts", str(src), "--user", "alice", "--batch-size", "2",
+        ])
+    assert result.exit_code == 0, result.output
+    assert "Imported 5 post(s), rejected 2" in result.output
+    assert "record 6: channel 'nope' not found" in result.output
+
+    inserts = [s for s, _ in stmts if s.startswith("INSERT INTO posts")]
+    assert len(inserts) == 3
+
+    db.session.expire_all()
+    assert db.session.get(Channel, ch.id).post_count == 5
+    bob_post = Post.query.filter_by(body="by bob").one()
+    assert bob_post.author.username == "Bob" and bob_post.created_at.year == 2020
+    assert db.session.scalar(sa.select(sa.func.count()).select_from(post_tags)) == 8
+    client = app.test_client()
+    assert len(client.get("/search/api?q=imported").get_json()["results"]) == 4
+
+
+def test_cli_checkpoint_resumes_after_last_batch(app, db, make_user, make_channel, tmp_path):
+    from tipple.models import Post
+    make_user()
+    make_channel("beer")
+    records = _records(5)
+    records[3] = {"channel": "beer"}            # no body
+    src = tmp_path / "archive.ndjson"
+    src.write_text(_ndjson(records))
+    ckpt = tmp_path / "archive.ckpt"
+    args = ["tipple", "import-posts", str(src), "--user", "alice", "--batch-size", "2",
+            "--checkpoint", str(ckpt)]
+
+    result = app.test_cli_runner().invoke(args=args + ["--strict"])
+    assert result.exit_code != 0 and "stopped after record 2" in result.output
+    assert json.loads(ckpt.read_text())["read"] == 2
+
+    result = app.test_cli_runner().invoke(args=args)
+    assert "Resuming after record 2." in result.output
+    assert sorted(p.body for p in Post.query) == ["imported 0", "imported 1", "imported 2", "imported 4"]
+
+
+def test_bulk_api(client, db, make_user, make_channel, login):
+    from tipple.models import Post
+    make_user()
+    make_channel("beer")
+    body = _ndjson(_records(3, author="someone-else"))
+
+    r = client.post("/posts/api/bulk", data=body, content_type="application/x-ndjson")
+    assert r.status_code in (302, 401)
+
+    login()
+    r = client.post("/posts/api/bulk", data=body, content_type="application/x-ndjson")
+    assert r.status_code == 200, r.get_json()
+    assert r.get_json()["inserted"] == 3 and r.get_json()["complete"]
+    assert {p.author.username for p in Post.query} == {"alice"}
+
+    r = client.post("/posts/api/bulk?skip=1", data=json.dumps(_records(2, channel="beer")),
+                    content_type="application/json")
+    assert r.get_json()["inserted"] == 1 and r.get_json()["read"] == 2
+
+    r = client.post("/posts/api/bulk?strict=1", data='[{"channel": "beer"}]', content_type="application/json")
+    assert r.status_code == 422 and r.get_json()["errors"][0]["record"] == 1
+
+    r = client.post("/posts/api/bulk", data='[{"channel": "beer", "body": "x"}', content_type="application/json")
+    assert r.status_code == 422 and r.get_json()["inserted"] == 1
+
+
+def test_bulk_api_rejects_invalid_utf8(client, db, make_user, make_channel, login):
+    make_user()
+    make_channel("beer")
+    login()
+    good = json.dumps({"channel": "beer", "body": "ok"}).encode()
+    bad = b'{"channel": "beer", "body": "\xff\xfe"}'
+
+    r = client.post("/posts/api/bulk", data=good + b"\n" + bad + b"\n" + good + b"\n",
+                    content_type="application/x-ndjson")
+    assert r.status_code == 200
+    body = r.get_json()
+    assert (body["read"], body["inserted"], body["rejected"]) == (3, 2, 1)
+    assert body["errors"] == [{"record": 2, "error": "invalid UTF-8: invalid start byte"}]
+
+    r = client.post("/posts/api/bulk", data=b"[" + good + b", " + bad + b"]", content_type="application/json")
+    assert r.status_code == 422
+    assert r.get_json()["read"] == 0 and "invalid UTF-8" in r.get_json()["errors"][0]["error"]
@@ -0,0 +1,65 @@
+# tests/test_instrumentation.py
+from __future__ import annotations
+
+import json
+import re
+
+
+def test_fingerprint_groups_query_shapes():
+    from tipple.instrumentation import fingerprint
+    a, fa = fingerprint("SELECT * FROM posts WHERE id IN (?, ?, ?) AND body = 'x'  LIMIT 20")
+    b, fb = fingerprint("SELECT *\n FROM posts WHERE id IN (?) AND body = 'it''s' LIMIT 5")
+    assert a == b == "SELECT * FROM posts WHERE id IN (...) AND body = ? LIMIT ?"
+    assert fa == fb
+    assert fingerprint("INSERT INTO t (a, b) VALUES (?, ?), (?, ?)")[0] == "INSERT INTO t (a, b) VALUES (...)"
+    assert fingerprint("SELECT users_1.id FROM users AS users_1")[0] == "SELECT users_1.id FROM users AS users_1"
+
+
+def test_server_timing_header(app, client, make_channel):
+    ch = make_channel("beer")
+    assert "Server-Timing" not in client.get(f"/channels/{ch.id}").headers
+
+    app.config["SERVER_TIMING"] = True
+    timing = client.get(f"/channels/{ch.id}").headers["Server-Timing"]
+    m = re.fullmatch(r'db;dur=[\d.]+;desc="(\d+) queries", render;dur=([\d.]+), total;dur=[\d.]+', timing)
+    assert m, timing
+    assert int(m.group(1)) >= 1 and float(m.group(2)) > 0
+
+
+def test_failed_statements_leave_nothing_on_the_connection(app, client, db, make_user, make_channel, login):
+    make_channel("dev")
+    make_user()
+    login()
+    app.config["SERVER_TIMING"] = True
+    for _ in range(3):
+        r = client.post("/channels/api/new", json={"name": "dev"})       # IntegrityError inside
+        assert r.status_code == 409 and "Server-Timing" in r.headers
+    with db.engine.connect() as conn:
+        assert not any(key.startswith("tipple.") for key in conn.info)
+
+
+def test_slow_queries_are_logged_with_plans(app, client, db, make_user, make_channel, tmp_path):
+    from tipple.models import Post
+    u = make_user()
+    ch = make_channel("beer")
+    p = Post(body="hello")
+    p.author, p.channel = u, ch
+    db.session.add(p)
+    db.session.commit()
+
+    log_path = tmp_path / "slow.log"
+    app.config.update(SLOW_QUERY_MS=0, SLOW_QUERY_LOG=str(log_path))
+    r = client.get(f"/channels/{ch.id}")
+    assert r.status_code == 200 and b"hello" in r.data          # EXPLAIN didn't disturb the rows
+
+    entries = [json.loads(line) for line in log_path.read_text().splitlines()]
+    timeline = [e for e in entries if "FROM posts" in e["statement"] and "ORDER BY" in e["statement"]]
+    assert timeline, entries
+    entry = timeline[0]
+    assert entry["endpoint"] == "channels.get_channel" and len(entry["fingerprint"]) == 12
+    assert any("ix_posts_channel_created_id" in step for step in entry["plan"]), entry["plan"]
+
+    app.config["SLOW_QUERY_SAMPLE_RATE"] = 0.0
+    log_path.unlink()
+    client.get(f"/channels/{ch.id}")
+    assert not log_path.exists()
@@ -0,0 +1,165 @@
+# tests/test_live.py
+from __future__ import annotations
+
+import re
+import time
+
+import pytest
+
+
+@pytest.fixture()
+def live(app):
+    app.config.update(LIVE_ENABLED=True, LIVE_HEARTBEAT_SECONDS=0.05, LIVE_MAX_STREAM_SECONDS=5)
+
+
+def _stream(response):
+    return (chunk.decode() for chunk in response.response)
+
+
+def _events(stream, n):
+    """Next n SSE events (keepalives skipped) as (event, id, data) tuples."""
+    out = []
+    while len(out) < n:
+        chunk = next(stream)
+        if chunk.startswith((":", "retry:")):
+            continue
+        fields = dict(re.findall(r"^(id|event): (.*)$", chunk, re.M))
+        data = "\n".join(re.findall(r"^data: (.*)$", chunk, re.M))
+        out.append((fields["event"], int(fields["id"]) if "id" in fields else None, data))
+    return out
+
+
+def test_channel_stream_gets_new_posts_only(app, client, make_user, make_channel, make_post, live):
+    u = make_user()
+    beer, wine = make_channel("beer"), make_channel("wine")
+    make_post("before", user=u, channel=beer)
+
+    r = client.get(f"/channels/{beer.id}/live", buffered=False)
+    assert r.status_code == 200 and r.mimetype == "text/event-stream"
+    stream = _stream(r)
+    assert next(stream).startswith("retry:")
+
+    make_post("elsewhere", user=u, channel=wine)
+    pid = make_post("cheers", user=u, channel=beer).id
+    [(event, eid, data)] = _events(stream, 1)
+    assert (event, eid) == ("post", pid)
+    assert "cheers" in data and "<li" in data and "#wine" not in data
+    r.close()
+    assert app.extensions["tipple.live"].stats()["subscribers"] == 0
+
+
+def test_channel_page_links_its_stream(app, client, make_user, make_channel, make_post, live):
+    u = make_user()
+    ch = make_channel("beer")
+    pid = make_post("hello", user=u, channel=ch).id
+    html = client.get(f"/channels/{ch.id}").get_data(as_text=True)
+    assert f'data-live-url="/channels/{ch.id}/live?after={pid}"' in html
+    assert "data-live-url" not in client.get(f"/channels/{ch.id}/all").get_data(as_text=True)
+
+    # Opt-in: without it the pages don't link a stream and there is none
+    app.config["LIVE_ENABLED"] = False
+    assert "data-live-url" not in client.get(f"/channels/{ch.id}").get_data(as_text=True)
+    assert client.get(f"/channels/{ch.id}/live").status_code == 404
+
+
+def test_last_event_id_resumes_from_the_db(app, client, make_user, make_channel, make_post, live):
+    u = make_user()
+    ch = make_channel("beer")
+    ids = [make_post(f"post {i}", user=u, channel=ch).id for i in range(4)]
+
+    r = client.get(f"/channels/{ch.id}/live", headers={"Last-Event-ID": str(ids[1])}, buffered=False)
+    assert [eid for _, eid, _ in _events(_stream(r), 2)] == ids[2:]
+    r.close()
+
+    # Missed more than LIVE_REPLAY_LIMIT: tell the client to reload
+    app.config["LIVE_REPLAY_LIMIT"] = 2
+    r = client.get(f"/channels/{ch.id}/live?after=0", buffered=False)
+    assert _events(_stream(r), 1) == [("reset", None, "")]
+    r.close()
+
+
+def test_slow_subscriber_catches_up_without_blocking_publishers(app, client, make_user, make_channel, make_post, live):
+    app.config["LIVE_QUEUE_SIZE"] = 2
+    u = make_user()
+    ch = make_channel("beer")
+    r = client.get(f"/channels/{ch.id}/live", buffered=False)
+    stream = _stream(r)
+    next(stream)
+
+    ids = [make_post(f"post {i}", user=u, channel=ch).id for i in range(5)]  # queue overflows
+    assert app.extensions["tipple.live"].stats()["overflows"] >= 1
+    assert [eid for _, eid, _ in _events(stream, 5)] == ids
+    r.close()
+
+
+def test_core_inserts_reach_streams(app, client, db, make_user, make_channel, make_post, live):
+    import sqlalchemy as sa
+    from datetime import datetime, UTC
+    from tipple.ingest import insert_posts
+    from tipple.models import Post
+    u = make_user()
+    ch = make_channel("beer")
+    r = client.get(f"/channels/{ch.id}/live", buffered=False)
+    stream = _stream(r)
+    next(stream)
+
+    row = {"user_id": u.id, "channel_id": ch.id, "tags": None, "created_at": datetime.now(UTC)}
+    ids = insert_posts(db.session.connection(), [{**row, "body": f"import {i}"} for i in range(3)])
+    db.session.commit()
+    assert [eid for _, eid, _ in _events(stream, 3)] == ids
+
+    # No event at all for this one: the next post's event brings it along
+    quiet = db.session.scalar(sa.insert(Post).values(**row, body="quiet").returning(Post.id))
+    db.session.commit()
+    pid = make_post("loud", user=u, channel=ch).id
+    assert [eid for _, eid, _ in _events(stream, 2)] == [quiet, pid]
+    r.close()
+
+
+def test_heartbeat_and_subscriber_cap(app, client, make_channel, live):
+    app.config["LIVE_MAX_SUBSCRIBERS"] = 1
+    ch = make_channel("beer")
+    r = client.get(f"/channels/{ch.id}/live", buffered=False)
+    stream = _stream(r)
+    next(stream)
+    assert next(stream) == ": keepalive\n\n"
+
+    busy = client.get(f"/channels/{ch.id}/live", buffered=False)
+    assert busy.status_code == 503 and busy.headers["Retry-After"]
+    r.close()
+    assert client.get(f"/channels/{ch.id}/live", buffered=False).status_code == 200
+
+
+def test_following_stream(app, client, db, make_user, make_channel, make_post, login, live):
+    assert client.get("/channels/following/live").status_code == 302     # to the login page
+    u = make_user()
+    beer, wine = make_channel("beer"), make_channel("wine")
+    u.follow(beer.id)
+    db.session.commit()
+    login()
+
+    r = client.get("/channels/following/live", buffered=False)
+    stream = _stream(r)
+    next(stream)
+    make_post("not followed", user=u, channel=wine)
+    pid = make_post("followed", user=u, channel=beer).id
+    [(_, eid, data)] = _events(stream, 1)
+    assert eid == pid and "#beer" in data                              # feed variant names the channel
+    r.close()
+
+
+def test_sqlite_broker_reaches_other_workers(tmp_path):
+    from tipple.live import LiveEvent, SQLiteBroker
+    worker_a = SQLiteBroker(tmp_path / "live.sqlite", poll_interval=0.01)
+    worker_b = SQLiteBroker(tmp_path / "live.sqlite", poll_interval=0.01)
+    try:
+        sub = worker_b.subscribe([1])
+        worker_a.publish([LiveEvent(10, 2), LiveEvent(11, 1)])
+        events: list[LiveEvent] = []
+        deadline = time.monotonic() + 2
+        while not events and time.monotonic() < deadline:
+            events, _ = sub.get(timeout=0.05)
+        assert events == [LiveEvent(11, 1)]
+    finally:
+        worker_a.stop()
+        worker_b.stop()
@@ -0,0 +1,55 @@
+# tests/test_login_lookup.py
+from __future__ import annotations
+
+
+def test_login_with_mixed_case_username(client, make_user):
+    make_user(email="mixed@example.com", username="MixedCase", password="pw")
+    r = client.post("/auth/login", data={"identifier": "MixedCase", "password": "pw"})
+    assert r.status_code == 302
+
+    client.post("/auth/logout")
+    r = client.post("/auth/api/login", json={"username": "mixedcase", "password": "pw"})
+    assert r.status_code == 200
+
+
+def test_login_with_email_any_case(client, make_user):
+    make_user(email="bob@example.com", username="bob", password="pw")
+    r = client.post("/auth/api/login", json={"email": "Bob@Example.com", "password": "pw"})
+    assert r.status_code == 200
+
+
+def test_find_by_login_is_one_indexed_query(db, make_user, capture_sql, explain):
+    from tipple.models import User
+    make_user(email="carol@example.com", username="Carol")
+
+    for ident, index in (("CAROL", "ix_users_username_key"), ("carol@example.com", "ix_users_email")):
+        db.session.expire_all()
+        with capture_sql() as stmts:
+            user = User.find_by_login(ident)
+        assert user is not None and user.username == "Carol"
+        (statement, params), = stmts
+        plan = " | ".join(explain(statement, params))
+        assert index in plan, plan
+        assert "SCAN users" not in plan, plan
+
+
+def test_usernames_are_case_insensitively_unique(client, make_user):
+    make_user(email="one@example.com", username="Taken", password="pw")
+    r = client.post("/auth/register", data={
+        "email": "two@example.com", "username": "taken",
+        "password": "secret123", "confirm": "secret123",
+    })
+    assert b"That username is taken." in r.data
+
+    r = client.post("/auth/api/register", json={
+        "email": "three@example.com", "username": "TAKEN", "password": "pw",
+    })
+    assert r.status_code == 409
+
+
+def test_email_match_beats_a_username_that_looks_like_it(db, make_user):
+    from tipple.models import User
+    make_user(email="squatter@example.com", username="alice@example.com")   # registered first
+    make_user(email="alice@example.com", username="alice")
+    assert User.find_by_login("Alice@Example.com").username == "alice"
+    assert User.find_by_login("squatter@example.com").username == "alice@example.com"
@@ -0,0 +1,77 @@
+# tests/test_metrics.py
+from __future__ import annotations
+
+import re
+
+
+def _sample(text: str, name: str, **labels: str) -> float:
+    """Value of the sample `name` whose labels include `labels`."""
+    for line in text.splitlines():
+        m = re.fullmatch(rf"{re.escape(name)}(?:\{{(.*)\}})? (\S+)", line)
+        if m and all(f'{k}="{v}"' in (m.group(1) or "") for k, v in labels.items()):
+            return float(m.group(2))
+    raise AssertionError(f"no {name} {labels} in:\n{text}")
+
+
+def test_metrics_are_off_by_default(client):
+    assert client.get("/metrics").status_code == 404
+
+
+def test_requests_db_hashes_and_caches_are_measured(app, client, db, make_user, make_channel, login):
+    from tipple.models import Post
+    app.config["METRICS_ENABLED"] = True
+    u = make_user()
+    ch = make_channel("beer")
+    p = Post(body="hello")
+    p.author, p.channel = u, ch
+    db.session.add(p)
+    db.session.commit()
+    login()
+    for _ in range(3):
+        client.get(f"/channels/{ch.id}")
+    client.get("/nope")
+
+    r = client.get("/metrics")
+    assert r.status_code == 200 and r.mimetype == "text/plain"
+    text = r.get_data(as_text=True)
+    where = {"blueprint": "channels", "endpoint": "channels.get_channel"}
+    assert _sample(text, "tipple_http_requests_total", method="GET", status="200", **where) == 3
+    assert _sample(text, "tipple_http_requests_total", endpoint="<unmatched>", status="404") == 1
+    assert _sample(text, "tipple_http_request_duration_seconds_count", **where) == 3
+    assert _sample(text, "tipple_http_request_duration_seconds_bucket", le="+Inf", **where) == 3
+    assert _sample(text, "tipple_db_queries_per_request_sum", **where) >= 3
+    assert _sample(text, "tipple_password_hash_seconds_count", op="verify") == 1
+    assert _sample(text, "tipple_cache_hit_ratio", cache="fragments") == 2 / 3
+    assert _sample(text, "tipple_cache_misses_total", cache="session_users") >= 0
+    assert "/metrics" not in text and 'endpoint="metrics"' not in text
+
+
+def test_metrics_token(app, client):
+    app.config.update(METRICS_ENABLED=True, METRICS_TOKEN="s3cret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+    assert client.get("/metrics", headers={"Authorization": "Bearer s3cr\u00e9t"}).status_code == 401
+
+
+def test_workers_are_summed_through_the_shared_directory(tmp_path):
+    from tipple.metrics import Registry, SharedDirectory, LATENCY_BUCKETS
+
+    def worker(ident: str, latencies: list[float]) -> Registry:
+        reg = Registry()
+        reg.counter("tipple_http_requests_total", "Requests.")
+        reg.histogram("tipple_http_request_duration_seconds", "Latency.", LATENCY_BUCKETS)
+        for seconds in latencies:
+            reg.inc("tipple_http_requests_total", (("endpoint", "index"),))
+            reg.observe("tipple_http_request_duration_seconds", (("endpoint", "index"),), seconds)
+        SharedDirectory(tmp_path, ident=ident).flush(reg)
+        return reg
+
+    worker("101", [0.004, 0.2])
+    reg = worker("102", [0.01])
+
+    text = reg.render(SharedDirectory(tmp_path, ident="102").snapshots())
+    assert _sample(text, "tipple_http_requests_total", endpoint="index") == 3
+    assert _sample(text, "tipple_http_request_duration_seconds_bucket", endpoint="index", le="0.005") == 1
+    assert _sample(text, "tipple_http_request_duration_seconds_bucket", endpoint="index", le="0.01") == 2
+    assert _sample(text, "tipple_http_request_duration_seconds_bucket", endpoint="index", le="+Inf") == 3
+    assert abs(_sample(text, "tipple_http_request_duration_seconds_sum", endpoint="index") - 0.214) < 1e-9
@@ -0,0 +1,112 @@
+# tests/test_passwords.py
+from __future__ import annotations
+import threading
+
+import pytest
+
+from tipple.auth.passwords import HasherBusy, PasswordHasher, password_hasher
+
+
+def _stored_hash(db, username):
+    from tipple.models import User
+    db.session.expire_all()
+    return User.query.filter_by(username_key=username).one().password_hash
+
+
+def test_hashes_use_configured_method(app, make_user, db):
+    make_user()
+    assert _stored_hash(db, "alice").startswith(app.config["PASSWORD_HASH_METHOD"] + "$")
+
+
+def test_login_rehashes_when_method_changes(app, client, make_user, db):
+    make_user(password="secret")
+    old = _stored_hash(db, "alice")
+
+    # Bump the cost, as a deploy with new settings would
+    app.config["PASSWORD_HASH_METHOD"] = "pbkdf2:sha256:2000"
+    app.extensions.pop("tipple.password_hasher", None)
+    r = client.post("/auth/api/login", json={"username": "alice", "password": "secret"})
+    assert r.status_code == 200
+
+    new = _stored_hash(db, "alice")
+    assert new != old and new.startswith("pbkdf2:sha256:2000$")
+
+    # Already current: a second login leaves the hash alone
+    client.post("/auth/api/logout")
+    client.post("/auth/api/login", json={"username": "alice", "password": "secret"})
+    assert _stored_hash(db, "alice") == new
+
+
+def test_failed_login_does_not_rehash(app, client, make_user, db):
+    make_user(password="secret")
+    old = _stored_hash(db, "alice")
+    app.config["PASSWORD_HASH_METHOD"] = "pbkdf2:sha256:2000"
+    app.extensions.pop("tipple.password_hasher", None)
+
+    r = client.post("/auth/api/login", json={"username": "alice", "password": "wrong"})
+    assert r.status_code == 401
+    assert _stored_hash(db, "alice") == old
+
+
+def test_full_queue_fails_fast():
+    release = threading.Event()
+    hasher = PasswordHasher("pbkdf2:sha256:1000", workers=1, max_pending=1, timeout=5)
+    hasher._executor().submit(lambda: None).result()  # warm the pool
+
+    blockers = [threading.Thread(target=hasher._run, args=(release.wait,)) for _ in range(2)]
+    for t in blockers:
+        t.start()
+    try:
+        # Both slots are held (one running, one queued)
+        for _ in range(100):
+            if hasher._slots._value == 0:  # pyright: ignore[reportOptionalMemberAccess]
+                break
+            threading.Event().wait(0.01)
+        with pytest.raises(HasherBusy):
+            hasher.hash("pw")
+    finally:
+        release.set()
+        for t in blockers:
+            t.join()
+    assert hasher.verify(hasher.hash("pw"), "pw")
+
+
+def test_busy_hasher_returns_503(app, client, make_user, monkeypatch):
+    make_user(password="secret")
+
+    def busy(*args, **kw):
+        raise HasherBusy("full")
+    monkeypatch.setattr(password_hasher(), "_run", busy)
+
+    r = client.post("/auth/api/login", json={"username": "alice", "password": "secret"})
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"
+    assert r.get_json()["error"]
+
+    r = client.post("/auth/login", data={"identifier": "alice", "password": "secret"})
+    assert r.status_code == 503
+
+
+def test_short_method_names_are_not_rehashed_every_login():
+    hasher = PasswordHasher("pbkdf2:sha256", workers=0, max_pending=0, timeout=1)
+    pwhash = hasher.hash("pw")
+    assert pwhash.split("$", 1)[0] != "pbkdf2:sha256"          # werkzeug filled in the rounds
+    assert not hasher.needs_rehash(pwhash)
+    assert hasher.needs_rehash(PasswordHasher("pbkdf2:sha256:1000", 0, 0, 1).hash("pw"))
+
+
+def test_slow_hash_times_out_as_busy():
+    release = threading.Event()
+    hasher = PasswordHasher("pbkdf2:sha256:1000", workers=1, max_pending=0, timeout=0.05)
+    try:
+        with pytest.raises(HasherBusy):
+            hasher._run(release.wait)
+    finally:
+        release.set()
+
+
+def test_zero_workers_hashes_inline():
+    hasher = PasswordHasher("pbkdf2:sha256:1000", workers=0, max_pending=0, timeout=1)
+    pwhash = hasher.hash("pw")
+    assert hasher.verify(pwhash, "pw") and not hasher.verify(pwhash, "nope")
+    assert hasher._pool is None
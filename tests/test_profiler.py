@@ -0,0 +1,75 @@
+# tests/test_profiler.py
+from __future__ import annotations
+
+import json
+import re
+
+import pytest
+
+
+@pytest.fixture()
+def profiled(app, tmp_path):
+    app.config.update(PROFILER_ENABLED=True, PROFILER_DIR=str(tmp_path), PROFILER_INTERVAL=0.0005)
+    return tmp_path
+
+
+def test_token_profiles_one_request(app, client, make_user, make_channel, make_post, profiled):
+    u = make_user()
+    ch = make_channel("beer")
+    make_post("hello", user=u, channel=ch)
+
+    token = app.test_cli_runner().invoke(
+        args=["tipple", "profile-token", "--path", "/channels"]
+    ).stdout.strip()
+    r = client.get(f"/channels/{ch.id}", headers={"X-Tipple-Profile": token})
+    assert r.status_code == 200 and b"hello" in r.data
+    name = r.headers["X-Tipple-Profile-Id"]
+    assert name.endswith("channels.get_channel")
+
+    trace = json.loads((profiled / f"{name}.sql.json").read_text())
+    assert trace["path"] == f"/channels/{ch.id}" and trace["status"] == 200
+    assert any("FROM posts" in q["statement"] for q in trace["queries"])
+
+    collapsed = (profiled / f"{name}.collapsed").read_text().splitlines()
+    assert all(re.fullmatch(r"\S+ \d+", line) for line in collapsed)
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in collapsed) == trace["samples"]
+
+    # Unprofiled requests write nothing
+    assert "X-Tipple-Profile-Id" not in client.get(f"/channels/{ch.id}").headers
+    assert len(list(profiled.iterdir())) == 2
+
+
+def test_query_flag_and_token_checks(app, client, make_channel, profiled):
+    from tipple.profiler import make_profile_token
+    ch = make_channel("beer")
+    token = make_profile_token(app, "/channels")
+
+    # Header only unless the query flag is switched on
+    assert "X-Tipple-Profile-Id" not in client.get(f"/channels/{ch.id}?_profile={token}").headers
+    app.config["PROFILER_QUERY_ARG"] = True
+    r = client.get(f"/channels/{ch.id}?_profile={token}")
+    trace = json.loads((profiled / f"{r.headers['X-Tipple-Profile-Id']}.sql.json").read_text())
+    assert trace["path"] == f"/channels/{ch.id}"           # token not written out
+
+    assert "X-Tipple-Profile-Id" not in client.get("/", headers={"X-Tipple-Profile": token}).headers
+    assert "X-Tipple-Profile-Id" not in client.get(f"/channels/{ch.id}?_profile=forged").headers
+
+    app.config["PROFILER_TOKEN_MAX_AGE"] = -1               # expired
+    assert "X-Tipple-Profile-Id" not in client.get(f"/channels/{ch.id}?_profile={token}").headers
+
+    app.config.update(PROFILER_TOKEN_MAX_AGE=3600, PROFILER_ENABLED=False)
+    assert "X-Tipple-Profile-Id" not in client.get(f"/channels/{ch.id}?_profile={token}").headers
+
+
+def test_profiles_are_capped(app, client, make_channel, profiled):
+    from tipple.profiler import make_profile_token
+    ch = make_channel("beer")
+    app.config.update(PROFILER_MAX_PER_TOKEN=2, PROFILER_MAX_PER_MINUTE=3)
+    first, second = make_profile_token(app, "/"), make_profile_token(app, "/channels")
+
+    def profiled_with(token):
+        return "X-Tipple-Profile-Id" in client.get(f"/channels/{ch.id}", headers={"X-Tipple-Profile": token}).headers
+
+    assert [profiled_with(first) for _ in range(3)] == [True, True, False]       # per token
+    assert [profiled_with(second) for _ in range(2)] == [True, False]            # per minute
+    assert len(list(profiled.iterdir())) == 2 * 3
@@ -0,0 +1,72 @@
+# tests/test_query_plans.py
+from __future__ import annotations
+
+from tipple.pagination import encode_cursor, paginate_posts
+
+
+def _seed(db, make_user, make_channel):
+    from tipple.models import Post
+    u = make_user()
+    chans = [make_channel(f"c{i}") for i in range(3)]
+    for i in range(30):
+        p = Post(body=f"b{i}", tags=None)
+        p.author = u
+        p.channel = chans[i % 3]
+        db.session.add(p)
+    db.session.commit()
+    return u, chans
+
+
+def _select(stmts):
+    return [(s, p) for s, p in stmts if s.lstrip().upper().startswith("SELECT")]
+
+
+def test_channel_timeline_is_index_range_scan(db, make_user, make_channel, capture_sql, explain):
+    from tipple.models import Post
+    u, chans = _seed(db, make_user, make_channel)
+    newest = Post.query.filter_by(channel_id=chans[0].id).order_by(Post.id.desc()).first()
+    cursor = encode_cursor(newest.created_at, newest.id)
+    cid = chans[0].id
+
+    for cur in (None, cursor):
+        with capture_sql() as stmts:
+            paginate_posts(Post.timeline(channel_id=cid), cursor=cur, per_page=5)
+        (statement, params), = _select(stmts)
+        plan = " | ".join(explain(statement, params))
+        assert "ix_posts_channel_created_id" in plan, plan
+        assert "TEMP B-TREE" not in plan, plan
+
+
+def test_user_posts_use_user_id_index(db, make_user, make_channel, capture_sql, explain):
+    from tipple.models import Post
+    u, _ = _seed(db, make_user, make_channel)
+    uid = u.id
+
+    with capture_sql() as stmts:
+        Post.query.filter_by(user_id=uid).order_by(Post.id.desc()).limit(20).all()
+    (statement, params), = _select(stmts)
+    plan = " | ".join(explain(statement, params))
+    assert "ix_posts_user_id_id" in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def test_fanout_feed_searches_each_followed_channel(db, make_user, make_channel, capture_sql, explain):
+    from tipple.feed import _fanout_rows
+    from tipple.models import Post
+    u, chans = _seed(db, make_user, make_channel)
+    for ch in chans:
+        u.follow(ch.id)
+    db.session.commit()
+    newest = Post.query.order_by(Post.id.desc()).first()
+    cursor = encode_cursor(newest.created_at, newest.id)
+    uid = u.id
+
+    for cur in (None, cursor):
+        with capture_sql() as stmts:
+            _fanout_rows(uid, cur, 5)
+        (statement, params), = _select(stmts)
+        plan = " | ".join(explain(statement, params))
+        # Index range per channel, never a scan of posts; the top-`limit`
+        # sort over what they return is expected
+        assert "SEARCH posts USING COVERING INDEX ix_posts_channel_created_id" in plan, plan
+        assert "SCAN posts" not in plan, plan
@@ -0,0 +1,94 @@
+# tests/test_routing.py
+from __future__ import annotations
+
+import pytest
+from flask import g
+
+
+@pytest.fixture()
+def replicated_app(tmp_path):
+    """An app with a primary and a replica file; replicate() syncs them."""
+    from tipple import create_app
+    from tipple.config_classes import TestingConfig
+    from tipple.models import db
+    from tipple.routing import Replicator
+
+    class ReplicaConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'primary.sqlite'}"
+        SQLALCHEMY_BINDS = {"replica": f"sqlite:///{tmp_path / 'replica.sqlite'}"}
+        WTF_CSRF_ENABLED = False
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        db.create_all()
+        app.replicator = Replicator.for_app(app)
+        app.replicator.replicate()
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+    db.metadatas.pop("replica", None)      # init_app registers one per bind key
+
+
+def _fresh_request(db):
+    # The test app context outlives requests: drop what they'd normally drop
+    db.session.remove()
+    g.pop("_login_user", None)
+
+
+def test_get_reads_replica_and_writes_read_their_own(replicated_app):
+    from tipple.models import db, Channel
+    app = replicated_app
+    client = app.test_client()
+
+    # Anonymous GETs see the replica only
+    db.session.add(Channel(name="beer"))
+    db.session.commit()
+    _fresh_request(db)
+    assert client.get("/channels/api/1").status_code == 404
+    app.replicator.replicate()
+    _fresh_request(db)
+    assert client.get("/channels/api/1").status_code == 200
+
+    # A user who just wrote reads the primary for a while
+    client.post("/auth/register", data={"email": "a@example.com", "username": "alice",
+                                        "password": "secret", "confirm": "secret"})
+    _fresh_request(db)
+    client.post("/auth/login", data={"identifier": "alice", "password": "secret"})
+    _fresh_request(db)
+    r = client.post("/channels/api/new", json={"name": "stout"})
+    assert r.status_code == 201, r.data
+    _fresh_request(db)
+    assert client.get("/channels/api/2").status_code == 200
+
+    app.config["READ_YOUR_WRITES_SECONDS"] = 0
+    client.post("/channels/api/new", json={"name": "porter"})
+    _fresh_request(db)
+    assert client.get("/channels/api/3").status_code == 404      # replica lags again
+
+
+def test_read_only_blocks_and_writes_inside_them(replicated_app):
+    import sqlalchemy as sa
+    from tipple.models import db, Channel
+    from tipple.routing import read_only, use_primary
+
+    db.session.add(Channel(name="beer"))
+    db.session.commit()
+    count = lambda: db.session.scalar(sa.select(sa.func.count()).select_from(Channel))
+
+    with read_only():
+        assert count() == 0                        # replica
+        with use_primary():
+            assert count() == 1
+        db.session.add(Channel(name="stout"))
+        db.session.flush()                         # writes go to the primary...
+        assert count() == 2                        # ...and so do reads after them
+        db.session.commit()
+        assert count() == 0
+    assert count() == 2
+
+
+def test_no_replica_means_no_routing(app, db):
+    from tipple.routing import replica_configured
+    assert not replica_configured(app)
+    assert app.config["SQLALCHEMY_BINDS"] == {}
@@ -0,0 +1,92 @@
+# tests/test_search.py
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from tipple.search import fts_query
+
+
+def _ids(client, url):
+    r = client.get(url)
+    assert r.status_code == 200, r.get_data(as_text=True)
+    data = r.get_json()
+    return [item["id"] for item in data["results"]], data["next_cursor"]
+
+
+def test_fts_query_quotes_terms():
+    assert fts_query('hoppy "IPA" OR x*') == '"hoppy" "IPA" "OR" "x"*'
+    assert fts_query("  ()  ") is None
+
+
+def test_index_follows_inserts_updates_and_deletes(client, db, make_user, make_channel, make_post):
+    u = make_user()
+    ch = make_channel("general")
+    p = make_post("A crisp pilsner", user=u, channel=ch)
+    assert _ids(client, "/search/api?q=pilsner")[0] == [p.id]
+
+    p.body = "A hazy IPA"
+    db.session.commit()
+    assert _ids(client, "/search/api?q=pilsner")[0] == []
+    assert _ids(client, "/search/api?q=hazy")[0] == [p.id]
+
+    db.session.delete(p)
+    db.session.commit()
+    assert _ids(client, "/search/api?q=hazy")[0] == []
+
+
+def test_bm25_ranking_and_cursor_pages(app, client, make_user, make_channel, make_post):
+    app.config["POSTS_PER_PAGE"] = 2
+    u = make_user()
+    ch = make_channel("general")
+    weak = make_post("stout and lots of other words about nothing much at all", user=u, channel=ch)
+    strong = make_post("stout stout stout", user=u, channel=ch)
+    mid = make_post("a stout evening", user=u, channel=ch)
+    make_post("lager only", user=u, channel=ch)
+
+    first, cursor = _ids(client, "/search/api?q=stout")
+    assert first == [strong.id, mid.id] and cursor
+    second, cursor = _ids(client, f"/search/api?q=stout&cursor={cursor}")
+    assert second == [weak.id] and cursor is None
+
+
+def test_channel_and_subtree_filters(client, make_user, make_channel, make_post):
+    u = make_user()
+    parent = make_channel("beer")
+    child = make_channel("ales", parent=parent)
+    other = make_channel("wine")
+    in_parent = make_post("porter night", user=u, channel=parent)
+    in_child = make_post("porter tasting", user=u, channel=child)
+    make_post("porter pairing", user=u, channel=other)
+
+    assert _ids(client, f"/search/api?q=porter&channel={parent.id}")[0] == [in_parent.id]
+    got = _ids(client, f"/search/api?q=porter&channel={parent.id}&subtree=1")[0]
+    assert sorted(got) == sorted([in_parent.id, in_child.id])
+
+
+def test_html_search_and_errors(client, make_user, make_channel, make_post):
+    u = make_user()
+    ch = make_channel("general")
+    make_post("Barrel-aged imperial stout", user=u, channel=ch)
+
+    r = client.get("/search/?q=barrel")
+    assert r.status_code == 200 and b"Barrel-aged imperial stout" in r.data
+    r = client.get("/search/?q=nothinglikethis")
+    assert b"No matching posts." in r.data
+
+    assert client.get("/search/api").status_code == 400
+    assert client.get("/search/api?q=x&cursor=junk").status_code == 400
+    assert client.get("/search/api?q=x&channel=999").status_code == 404
+
+
+def test_search_uses_the_fts_index(make_user, make_channel, make_post, capture_sql, explain):
+    from tipple.search import search_posts
+    u = make_user()
+    ch = make_channel("general")
+    make_post("saison", user=u, channel=ch)
+
+    with capture_sql() as stmts:
+        search_posts('"saison"')
+    statement, params = stmts[0]
+    plan = " | ".join(explain(statement, params))
+    assert "VIRTUAL TABLE INDEX" in plan, plan
+    assert "SCAN posts " not in plan + " ", plan
@@ -0,0 +1,71 @@
+# tests/test_seed.py
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+
+def _snapshot(db):
+    from tipple.models import Channel, User
+    return (
+        db.session.execute(sa.select(Channel.id, Channel.parent_id, Channel.follower_count, Channel.post_count)
+                           .order_by(Channel.id)).all(),
+        db.session.execute(sa.select(User.id, User.following_count).order_by(User.id)).all(),
+    )
+
+
+def test_seed_is_consistent_and_skewed(app, db):
+    from tipple.models import Channel, Post, User, recount_channels
+    from tipple.seed import seed
+
+    result = seed(users=60, channels=40, posts=2000, follows_mean=6, max_depth=3, random_seed=7)
+    assert (result.users, result.channels, result.posts) == (60, 40, 2000)
+    assert db.session.scalar(sa.select(sa.func.count()).select_from(Post)) == 2000
+    assert 0 < result.max_depth <= 3
+
+    # Denormalized counters and lineage agree with the rows they summarize
+    before = _snapshot(db)
+    recount_channels()
+    assert _snapshot(db) == before
+    for ch in db.session.scalars(sa.select(Channel)):
+        assert ch.lineage == (ch.parent.lineage + f"{ch.parent.id:010d}/" if ch.parent else "")
+
+    # Power law: the busiest channel gets far more than its even share
+    counts = sorted((c for *_, c in before[0]), reverse=True)
+    assert counts[0] > 4 * 2000 / 40
+
+    # Seeded users can log in
+    assert db.session.scalar(sa.select(User).limit(1)).check_password("password")
+
+
+def test_seed_builds_inboxes_like_rebuild_feeds(app, db):
+    from tipple.feed import rebuild_inboxes
+    from tipple.models import User, feed_items
+    from tipple.seed import seed
+    app.config.update(FEED_FANOUT_MAX_FOLLOWS=2, FEED_INBOX_SIZE=50)
+
+    result = seed(users=30, channels=20, posts=500, follows_mean=6, random_seed=3)
+    heavy = db.session.scalar(sa.select(sa.func.count()).select_from(User).where(User.following_count > 2))
+    assert result.inboxes == heavy > 0
+
+    def inboxes():
+        return db.session.execute(sa.select(feed_items).order_by(*feed_items.c)).all()
+    seeded = inboxes()
+    assert len({row.user_id for row in seeded}) == heavy and len(seeded) <= 50 * heavy
+    rebuild_inboxes()
+    assert inboxes() == seeded
+
+
+def test_seed_cli_is_repeatable(app, db):
+    from tipple.models import Channel, Post
+    runner = app.test_cli_runner()
+    args = ["tipple", "seed", "--users", "10", "--channels", "5", "--posts", "50", "--seed", "3"]
+    out = runner.invoke(args=args)
+    assert out.exit_code == 0 and "50 post(s)" in out.stdout
+    first = db.session.execute(sa.select(Post.channel_id, Post.body).order_by(Post.id)).all()
+
+    # A second run appends with fresh ids and names but the same shape
+    assert runner.invoke(args=args).exit_code == 0
+    second = db.session.execute(sa.select(Post.channel_id, Post.body).order_by(Post.id)).all()[50:]
+    assert [body for _, body in second] == [body for _, body in first]
+    assert [cid - 5 for cid, _ in second] == [cid for cid, _ in first]
+    assert db.session.scalar(sa.select(sa.func.count()).select_from(Channel)) == 10
@@ -0,0 +1,81 @@
+# tests/test_session_user.py
+from __future__ import annotations
+
+from flask import g
+
+
+def _fresh_request_user():
+    # The test app context outlives requests, so drop Flask-Login's
+    # per-request cache to make the next request go through user_loader
+    g.pop("_login_user", None)
+
+
+def test_loader_returns_slim_principal(app, make_user):
+    from tipple import load_user
+    from tipple.auth.session_user import SessionUser
+    u = make_user()
+
+    principal = load_user(str(u.id))
+    assert isinstance(principal, SessionUser)
+    assert (principal.id, principal.email, principal.username) == (u.id, u.email, u.username)
+    assert not hasattr(principal, "password_hash")
+    assert not hasattr(principal, "bio")
+    assert load_user("nope") is None
+    assert load_user("424242") is None
+
+
+def test_warm_page_view_needs_no_auth_query(client, make_user, login, make_channel, capture_sql):
+    make_user()
+    ch = make_channel()
+    login()
+    _fresh_request_user()
+    client.get(f"/channels/{ch.id}")         # warms the principal cache
+
+    _fresh_request_user()
+    with capture_sql() as stmts:
+        r = client.get(f"/channels/{ch.id}")
+    assert r.status_code == 200
+    assert b"Logout" in r.data
+    assert not any("FROM users" in s for s, _ in stmts)
+
+
+def test_profile_change_invalidates_principal(app, client, db, make_user, login):
+    from tipple import load_user
+    u = make_user()
+    login()
+    first = load_user(str(u.id))
+    assert load_user(str(u.id)) is first
+
+    _fresh_request_user()
+    r = client.post("/auth/profile", data={"bio": "changed"}, follow_redirects=True)
+    assert b"changed" in r.data
+
+    second = load_user(str(u.id))
+    assert second is not first
+    assert second.version > first.version
+
+
+def test_cache_is_bounded_lru(app, make_user):
+    from tipple.auth.session_user import SessionUserCache
+    users = [make_user(email=f"u{i}@example.com", username=f"user{i}") for i in range(3)]
+    cache = SessionUserCache(maxsize=2, ttl=60)
+    for u in users:
+        cache.get(u.id)
+    assert len(cache) == 2
+    cache.get(users[1].id)  # touch
+    cache.get(users[0].id)  # evicts users[2], the least recently used
+    assert len(cache) == 2
+    assert users[2].id not in cache._entries
+
+
+def test_followed_channels_page_with_principal(client, make_user, login, make_channel):
+    make_user()
+    a = make_channel("zeta")
+    b = make_channel("alpha")
+    login()
+    client.post(f"/channels/{a.id}/follow", follow_redirects=True)
+    client.post(f"/channels/{b.id}/follow", follow_redirects=True)
+
+    _fresh_request_user()
+    html = client.get("/channels/").get_data(as_text=True)
+    assert html.index("#alpha") < html.index("#zeta")
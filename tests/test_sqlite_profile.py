@@ -0,0 +1,65 @@
+# tests/test_sqlite_profile.py
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.fixture()
+def file_app(tmp_path):
+    from tipple import create_app
+    from tipple.config_classes import TestingConfig, ProductionConfig
+    from tipple.models import db
+
+    class FileConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'tipple.sqlite'}"
+        SQLITE_PRAGMAS = ProductionConfig.SQLITE_PRAGMAS
+        SQLITE_MAINTENANCE_INTERVAL = 60
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_pragma_statements_reject_anything_but_names_and_words():
+    from tipple.sqlite_profile import pragma_statements
+    assert pragma_statements({"journal_mode": "WAL", "cache_size": -2000}) == [
+        "PRAGMA journal_mode = WAL", "PRAGMA cache_size = -2000",
+    ]
+    for bad in ({"journal_mode; DROP": "x"}, {"journal_mode": "WAL; DROP TABLE users"}, {"foreign_keys": True}):
+        with pytest.raises(ValueError):
+            pragma_statements(bad)
+
+
+def test_connections_get_the_production_profile(file_app):
+    from tipple.models import db
+    conn = db.session.connection()
+    pragma = lambda name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+    assert pragma("journal_mode") == "wal"
+    assert pragma("busy_timeout") == 5000
+    assert pragma("synchronous") == 1          # NORMAL
+    assert pragma("temp_store") == 2           # MEMORY
+    assert pragma("cache_size") == -64 * 1024
+
+
+def test_default_profile_leaves_sqlite_alone(app, db):
+    assert app.config["SQLITE_PRAGMAS"] == {}
+    assert db.session.connection().exec_driver_sql("PRAGMA journal_mode").scalar() == "memory"
+
+
+def test_periodic_maintenance_and_cli(file_app):
+    from tipple.models import db, Channel
+    from tipple.sqlite_profile import sqlite_maintenance
+    db.session.add(Channel(name="beer"))        # something in the WAL
+    db.session.commit()
+    maintenance = sqlite_maintenance(file_app)
+    assert not maintenance.maybe_run(60)        # not due yet
+
+    maintenance._last -= 61
+    file_app.test_client().get("/")             # requests run it when due
+    assert not maintenance.maybe_run(60)
+
+    out = file_app.test_cli_runner().invoke(args=["tipple", "sqlite-maintenance", "--truncate"]).output
+    assert "Checkpointed" in out, out
@@ -0,0 +1,97 @@
+# tests/test_tags.py
+from __future__ import annotations
+
+import re
+
+import sqlalchemy as sa
+
+from tipple.models import parse_tags
+
+
+def _links(db):
+    from tipple.models import Tag, post_tags
+    rows = db.session.execute(
+        sa.select(post_tags.c.post_id, Tag.name).join(Tag, Tag.id == post_tags.c.tag_id)
+        .order_by(post_tags.c.post_id, Tag.name)
+    ).all()
+    return [tuple(r) for r in rows]
+
+
+def test_parse_tags_normalizes_and_dedupes():
+    assert parse_tags(" Flask, #tips,flask ,, ") == ["flask", "tips"]
+    assert parse_tags(None) == []
+
+
+def test_posts_are_indexed_on_write_and_unindexed_on_delete(db, make_user, make_channel, make_post):
+    u = make_user()
+    ch = make_channel("general")
+    p1 = make_post("one", user=u, channel=ch, tags="Flask, tips")
+    p2 = make_post("two", user=u, channel=ch, tags="flask")
+    assert _links(db) == [(p1.id, "flask"), (p1.id, "tips"), (p2.id, "flask")]
+
+    p1.tags = "release"
+    db.session.commit()
+    assert _links(db) == [(p1.id, "release"), (p2.id, "flask")]
+
+    db.session.delete(p2)
+    db.session.commit()
+    assert _links(db) == [(p1.id, "release")]
+
+
+def test_tag_timeline_pages_and_scopes_by_channel(app, client, make_user, make_channel, make_post):
+    app.config["POSTS_PER_PAGE"] = 2
+    u = make_user()
+    a, b = make_channel("a"), make_channel("b")
+    for i in range(4):
+        make_post(f"post-{i}", user=u, channel=a if i % 2 else b, tags="beer")
+    make_post("post-untagged", user=u, channel=a, tags="wine")
+
+    seen: list[str] = []
+    url: str | None = "/tags/Beer"
+    while url:
+        r = client.get(url)
+        assert r.status_code == 200
+        html = r.get_data(as_text=True)
+        seen += re.findall(r"post-\w+", html)
+        m = re.search(r'href="([^"]*cursor=[^"]*)"', html)
+        url = m.group(1).replace("&amp;", "&") if m else None
+    assert seen == ["post-3", "post-2", "post-1", "post-0"]
+
+    r = client.get(f"/tags/beer?channel={a.id}")
+    assert re.findall(r"post-\w+", r.get_data(as_text=True)) == ["post-3", "post-1"]
+
+    assert client.get("/tags/nope").status_code == 404
+    assert client.get("/tags/beer?cursor=junk").status_code == 400
+
+
+def test_tag_timeline_is_an_index_range_scan(make_user, make_channel, make_post, capture_sql, explain, client):
+    u = make_user()
+    ch = make_channel("general")
+    make_post("hello", user=u, channel=ch, tags="beer")
+
+    for url, index in (("/tags/beer", "ix_post_tags_tag_created_post"),
+                       (f"/tags/beer?channel={ch.id}", "ix_post_tags_tag_channel_created_post")):
+        with capture_sql() as stmts:
+            assert client.get(url).status_code == 200
+        statement, params = next((s, p) for s, p in stmts if "FROM post_tags" in s)
+        plan = " | ".join(explain(statement, params))
+        assert f"COVERING INDEX {index}" in plan, plan
+        assert "TEMP B-TREE" not in plan, plan
+
+
+def test_backfill_indexes_existing_posts(app, db, make_user, make_channel, make_post):
+    from tipple.models import post_tags
+    u = make_user()
+    ch = make_channel("general")
+    p = make_post("old", user=u, channel=ch, tags="Legacy, stuff")
+    db.session.execute(sa.delete(post_tags))
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["tipple", "backfill-tags", "--batch-size", "1"])
+    assert result.exit_code == 0, result.output
+    assert "added 2 tag link(s)" in result.output
+    assert _links(db) == [(p.id, "legacy"), (p.id, "stuff")]
+
+    # Re-running adds nothing
+    result = app.test_cli_runner().invoke(args=["tipple", "backfill-tags"])
+    assert "added 0 tag link(s)" in result.output
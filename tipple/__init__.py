@@ -3,8 +3,8 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
-from flask import Flask, render_template
-from flask_login import LoginManager
+from flask import Flask, render_template, request, jsonify, url_for, abort
+from flask_login import LoginManager, current_user
 from flask_migrate import Migrate
 
 from .config_classes import DevelopmentConfig, TestingConfig, ProductionConfig
@@ -41,6 +41,26 @@ def create_app(config_object: type | str | None = None) -> Flask:
     with app.app_context():
       from . import models
     
+    # PRAGMAs on connect + periodic WAL checkpoints for SQLite engines
+    from .sqlite_profile import init_sqlite_profile
+    init_sqlite_profile(app)
+
+    # Replica reads for GET requests, if a replica bind is configured
+    from .routing import init_routing
+    init_routing(app)
+
+    # Query counts/timings per request, Server-Timing, slow-query log
+    from .instrumentation import init_instrumentation
+    init_instrumentation(app)
+
+    # Profile single requests that carry a signed profile token
+    from .profiler import init_profiler
+    init_profiler(app)
+
+    # /metrics (Prometheus text), off unless METRICS_ENABLED
+    from .metrics import init_metrics
+    init_metrics(app)
+
     migrate.init_app(app, db)
     login_manager.init_app(app)
     csrf.init_app(app)
@@ -51,6 +71,17 @@ def create_app(config_object: type | str | None = None) -> Flask:
         from .auth.forms import EmptyForm
         return {"logout_form": EmptyForm()}
 
+    # Timelines join cached post fragments instead of including _post_item
+    from .fragments import render_post_items, fragment_cache
+    app.jinja_env.globals["render_post_items"] = render_post_items
+
+    @app.get("/_internal/cache-stats")
+    def cache_stats():
+        if not app.config["CACHE_STATS_ENABLED"]:
+            abort(404)
+        from .auth.session_user import session_users
+        return jsonify(fragments=fragment_cache().stats(), session_users=session_users().stats())
+
     # Blueprints
     from .auth import bp as auth_bp
     app.register_blueprint(auth_bp)
@@ -63,11 +94,49 @@ def create_app(config_object: type | str | None = None) -> Flask:
 
     from .channels.api import bp as channels_api_bp
     app.register_blueprint(channels_api_bp)
+
+    from .tags import bp as tags_bp
+    app.register_blueprint(tags_bp)
+
+    from .search import bp as search_bp
+    app.register_blueprint(search_bp)
+
+    # Too many logins hashing at once: shed load rather than queue forever
+    from .auth.passwords import HasherBusy
+
+    @app.errorhandler(HasherBusy)
+    def hasher_busy(e):
+        headers = {"Retry-After": "1"}
+        if "/api/" in request.path:
+            return jsonify(error="server busy, try again shortly"), 503, headers
+        return "Server busy, please try again shortly.", 503, headers
+
+    # CLI: `flask tipple ...`
+    from .cli import cli
+    app.cli.add_command(cli)
     
-    # Main page route
+    # Main page: the home feed when signed in, a welcome card otherwise
+    from .feed import home_feed
+    from .pagination import InvalidCursor
+
     @app.get("/")
     def index():
-        return render_template("index.html")
+        if not current_user.is_authenticated:
+            return render_template("index.html")
+        try:
+            page = home_feed(
+                current_user.id,
+                cursor=request.args.get("cursor"),
+                per_page=app.config["POSTS_PER_PAGE"],
+            )
+        except InvalidCursor:
+            abort(400)
+        next_page_url = url_for("index", cursor=page.next_cursor) if page.next_cursor else None
+        live_url = None
+        if not request.args.get("cursor") and app.config["LIVE_ENABLED"]:
+            newest = max((p.id for p in page.items), default=0)
+            live_url = url_for("channels.live_following", after=newest)
+        return render_template("index.html", posts=page.items, next_page_url=next_page_url, live_url=live_url)
 
     return app
 
@@ -85,11 +154,12 @@ def _pick_config_from_env(): # pragma: no cover
 
 
 @login_manager.user_loader
-def load_user(user_id: str): # pragma: no cover
-    from .models import User
+def load_user(user_id: str):
+    from .auth.session_user import session_users
 
-    # Flask-Login needs this to load the session’s user
+    # Flask-Login needs this to load the session’s user. It gets a slim,
+    # cached SessionUser, so a warm page view costs no query for auth.
     try:
-        return db.session.get(User, int(user_id))
+        return session_users().get(int(user_id))
     except (TypeError, ValueError):
         return None
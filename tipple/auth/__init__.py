@@ -6,9 +6,28 @@ from flask_login import login_user, logout_user, login_required, current_user
 from .forms import RegisterForm, LoginForm, ProfileForm
 from ..models import db, User, Post         # import Post
 from ..posts.forms import PostForm           # import PostForm
+from . import session_user  # noqa: F401  (registers the principal-cache invalidation hooks)
 
 bp = Blueprint("auth", __name__, url_prefix="/auth", template_folder="../templates")
 
+def _current_user_row() -> User:
+    """
+    The full User row. current_user is usually the slim cached SessionUser,
+    which has no bio/password_hash and isn't attached to the DB session.
+    """
+    return db.session.get(User, current_user.id)  # pyright: ignore[reportReturnType]
+
+
+def _authenticate(ident: str, password: str) -> User | None:
+    """Look up and verify a login, upgrading an outdated password hash."""
+    user = User.find_by_login(ident)
+    if not user or not user.check_password(password):
+        return None
+    if user.rehash_password_if_needed(password):
+        db.session.commit()
+    return user
+
+
 # ---------- HTML PAGE VIEWS ----------
 
 @bp.route("/register", methods=["GET", "POST"])
@@ -35,7 +54,7 @@ def register_page():
 
             # Try to be specific about what collided
             existing_email = User.query.filter_by(email=form.email.data).first()
-            existing_username = User.query.filter_by(username=form.username.data).first()
+            existing_username = User.query.filter_by(username_key=(form.username.data or "").lower()).first()
             if existing_email:
                 form.email.errors.append("That email is already registered.") # pyright: ignore[reportAttributeAccessIssue]
             if existing_username:
@@ -63,9 +82,8 @@ def login_page():
 
     form = LoginForm()
     if form.validate_on_submit():
-        ident = form.identifier.data.strip().lower() # type: ignore
-        user = User.query.filter_by(email=ident).first() or User.query.filter_by(username=ident).first()
-        if not user or not user.check_password(form.password.data):
+        user = _authenticate(form.identifier.data or "", form.password.data or "")
+        if not user:
             flash("Invalid credentials.", "danger")
             return render_template("auth/login.html", form=form), 401
 
@@ -92,13 +110,13 @@ def logout_page():
 @login_required
 def me_page():
     my_posts = (
-        Post.query.filter_by(user_id=current_user.id)
+        Post.timeline(user_id=current_user.id)
         .order_by(Post.id.desc())
         .limit(20)
         .all()
     )
 
-    return render_template("auth/me.html", user=current_user, posts=my_posts)
+    return render_template("auth/me.html", user=_current_user_row(), posts=my_posts)
 
 
 # ---------- JSON API (unchanged behavior, just moved under /api) ----------
@@ -114,7 +132,7 @@ def register_api():
     if not email or not username or not password:
         return jsonify(error="email, username, and password are required"), 400
 
-    if User.query.filter((User.email == email) | (User.username == username)).first():
+    if User.query.filter((User.email == email) | (User.username_key == username.lower())).first():
         return jsonify(error="email or username already in use"), 409
 
     user = User(email=email, username=username, bio=bio)  
@@ -127,14 +145,14 @@ def register_api():
 @bp.post("/api/login")
 def login_api():
     data = request.get_json(silent=True) or request.form
-    ident = (data.get("email") or data.get("username") or "").strip().lower()
+    ident = (data.get("email") or data.get("username") or "").strip()
     password = data.get("password")
 
     if not ident or not password:
         return jsonify(error="credentials required"), 400
 
-    user = User.query.filter_by(email=ident).first() or User.query.filter_by(username=ident).first()
-    if not user or not user.check_password(password):
+    user = _authenticate(ident, password)
+    if not user:
         return jsonify(error="invalid credentials"), 401
 
     login_user(user)
@@ -151,16 +169,17 @@ def logout_api():
 @bp.get("/api/me")
 @login_required
 def me_api():
-    u = current_user
+    u = _current_user_row()
     return jsonify(id=u.id, email=u.email, username=u.username, bio=u.bio)
 
 
 @bp.route("/profile", methods=["GET", "POST"])
 @login_required
 def profile_page():
-    form = ProfileForm(obj=current_user)  # prefill from user
+    user = _current_user_row()
+    form = ProfileForm(obj=user)  # prefill from user
     if form.validate_on_submit():
-        current_user.bio = (form.bio.data or "").strip() or None
+        user.bio = (form.bio.data or "").strip() or None
         db.session.commit()
         flash("Profile updated.", "success")
         return redirect(url_for("auth.me_page"))
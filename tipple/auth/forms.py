@@ -39,15 +39,10 @@ class RegisterForm(FlaskForm):
         field.data = normalized
 
         from ..models import User
-        # Case-sensitive check (matches a UNIQUE index on username)
-        if User.query.filter_by(username=normalized).first():
+        # Case-insensitive check (matches the UNIQUE index on username_key)
+        if User.query.filter_by(username_key=normalized.lower()).first():
             raise ValidationError("That username is taken.")
 
-        # If you want case-insensitive duplicates, use this instead:
-        # from sqlalchemy import func
-        # if User.query.filter(func.lower(User.username) == normalized.lower()).first():
-        #     raise ValidationError("That username is taken.")
-
 
 class LoginForm(FlaskForm):
     identifier = StringField("Email or Username", validators=[DataRequired(), Length(min=3, max=255)])
@@ -0,0 +1,113 @@
+# tipple/auth/passwords.py
+from __future__ import annotations
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from flask import current_app, has_app_context
+from werkzeug.security import generate_password_hash, check_password_hash
+
+T = TypeVar("T")
+
+_EXT_KEY = "tipple.password_hasher"
+
+
+class HasherBusy(RuntimeError):
+    """Raised when the hashing queue is full; callers should answer 503."""
+
+
+class PasswordHasher:
+    """
+    Runs werkzeug's (deliberately slow) hash/verify on a small bounded pool.
+
+    At most `workers` hashes run at once and at most `max_pending` more may
+    wait; anything beyond that fails fast with HasherBusy instead of tying
+    up another request thread. hashlib's scrypt/pbkdf2 release the GIL, so
+    page views keep running alongside. workers=0 hashes inline.
+    """
+
+    def __init__(self, method: str, workers: int, max_pending: int, timeout: float) -> None:
+        self.method = method
+        # werkzeug expands short methods ("scrypt" -> "scrypt:32768:8:1"), so
+        # compare stored hashes against the prefix of a real one
+        self._prefix = generate_password_hash("", method=method).split("$", 1)[0]
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + max_pending) if workers else None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, method=self.method)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        """True if `pwhash` was made with different method/cost parameters."""
+        return pwhash.split("$", 1)[0] != self._prefix
+
+    def _run(self, fn: Callable[..., T], *args: Any, **kw: Any) -> T:
+        if self._slots is None:
+            return fn(*args, **kw)
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise HasherBusy("password hashing queue is full")
+        try:
+            future = self._executor().submit(fn, *args, **kw)
+        except BaseException:
+            slots.release()
+            raise
+        # Free the slot when the work finishes, even if we stop waiting for it
+        future.add_done_callback(lambda _f: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # Still running (and holding its slot); don't hold the request too
+            raise HasherBusy("password hashing timed out") from None
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="tipple-hash")
+        return self._pool
+
+
+def password_hasher() -> PasswordHasher:
+    hasher = current_app.extensions.get(_EXT_KEY)
+    if hasher is None:
+        cfg = current_app.config
+        hasher = current_app.extensions[_EXT_KEY] = PasswordHasher(
+            method=cfg["PASSWORD_HASH_METHOD"],
+            workers=cfg["PASSWORD_HASH_WORKERS"],
+            max_pending=cfg["PASSWORD_HASH_MAX_PENDING"],
+            timeout=cfg["PASSWORD_HASH_TIMEOUT"],
+        )
+    return hasher
+
+
+def hash_password(password: str) -> str:
+    if not has_app_context():  # pragma: no cover - scripts outside an app
+        return generate_password_hash(password)
+    started = time.perf_counter()
+    try:
+        return password_hasher().hash(password)
+    finally:
+        _observe("hash", started)
+
+
+def verify_password(pwhash: str, password: str) -> bool:
+    if not has_app_context():  # pragma: no cover
+        return check_password_hash(pwhash, password)
+    started = time.perf_counter()
+    try:
+        return password_hasher().verify(pwhash, password)
+    finally:
+        _observe("verify", started)
+
+
+def _observe(op: str, started: float) -> None:
+    from ..metrics import observe_password_hash
+    observe_password_hash(op, time.perf_counter() - started)
@@ -0,0 +1,132 @@
+# tipple/auth/session_user.py
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from flask import current_app, has_app_context
+from flask_login import UserMixin
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from ..models import db, User, FollowerMixin
+
+_EXT_KEY = "tipple.session_users"
+
+
+@dataclass(frozen=True, eq=False)
+class SessionUser(FollowerMixin, UserMixin):
+    """
+    What Flask-Login hands out as `current_user` on requests after login.
+
+    Only the columns page views need (no password_hash, no bio), and not
+    attached to the DB session. Views that edit the account or show the full
+    profile load the User row by id.
+    """
+    id: int
+    email: str
+    username: str
+    version: int
+
+
+class SessionUserCache:
+    """
+    In-process LRU of SessionUser keyed by user id, with a TTL as the bound
+    on staleness across workers. Each id has a version stamp that `invalidate`
+    bumps; a load that raced with an invalidation isn't cached.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[int, tuple[SessionUser, float]] = OrderedDict()
+        self._versions: dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[SessionUser]:
+        now = time.monotonic()
+        with self._lock:
+            hit = self._entries.get(user_id)
+            if hit is not None and hit[1] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return hit[0]
+            self.misses += 1
+            version = self._versions.get(user_id, 0)
+
+        row = db.session.execute(
+            select(User.id, User.email, User.username).where(User.id == user_id)
+        ).one_or_none()
+        if row is None:
+            return None
+        principal = SessionUser(id=row.id, email=row.email, username=row.username, version=version)
+
+        with self._lock:
+            if self._versions.get(user_id, 0) == version:
+                self._entries[user_id] = (principal, now + self.ttl)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return principal
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def session_users() -> SessionUserCache:
+    cache = current_app.extensions.get(_EXT_KEY)
+    if cache is None:
+        cache = current_app.extensions[_EXT_KEY] = SessionUserCache(
+            maxsize=current_app.config["SESSION_USER_CACHE_SIZE"],
+            ttl=current_app.config["SESSION_USER_CACHE_TTL"],
+        )
+    return cache
+
+
+def _invalidate(user_ids: Any) -> None:
+    if has_app_context():
+        cache = session_users()
+        for uid in user_ids:
+            cache.invalidate(uid)
+
+
+# Any change to a user row (profile, password, email) drops its cached
+# principal: once at flush, and again after commit so a reload that raced
+# with the transaction can't leave the old values cached.
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target: User) -> None:
+    _invalidate([target.id])
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("tipple.users_changed", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    _invalidate(session.info.pop("tipple.users_changed", ()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session) -> None:
+    session.info.pop("tipple.users_changed", None)
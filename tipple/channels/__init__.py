@@ -1,13 +1,18 @@
 from __future__ import annotations
 from flask import (
-    Blueprint, render_template, request, redirect, url_for, flash, abort, jsonify
+    Blueprint, render_template, request, redirect, url_for, flash, abort, jsonify,
+    current_app, make_response,
     )
 from flask_login import current_user, login_required
 from sqlalchemy.exc import IntegrityError
 
-from ..models import db, Channel, Post
+from ..models import db, Channel, Post, user_channel_follows, parse_tags
+from ..http_cache import channel_validators, csrf_epoch, cacheable, not_modified, add_validators
+from ..pagination import paginate_posts, InvalidCursor
+from ..live import BrokerFull, last_event_id, stream_posts
 from ..posts.forms import PostForm
 from .forms import ChannelCreateForm
+from .choices import parent_choices
 
 bp = Blueprint("channels", __name__, url_prefix="/channels")
 
@@ -16,11 +21,13 @@ bp = Blueprint("channels", __name__, url_prefix="/channels")
 @login_required
 def list_followed_channels():
     """Show all channels the current user follows."""
-    # Safely get the list (in case the m2m isn't present in some builds)
-    followed = list(getattr(current_user, "following", []))
-    # Deduplicate and sort by name for a nice display
-    unique_by_id = {ch.id: ch for ch in followed}.values()
-    channels = sorted(unique_by_id, key=lambda c: c.name.lower())
+    # Query by user id (current_user is a detached principal, not the ORM row)
+    channels = (
+        Channel.query.join(user_channel_follows, user_channel_follows.c.channel_id == Channel.id)
+        .filter(user_channel_follows.c.user_id == current_user.id)
+        .order_by(Channel.name_key)
+        .all()
+    )
     return render_template("channels/index.html", channels=channels)
 
 
@@ -33,9 +40,8 @@ def new_channel():
     """
     form = ChannelCreateForm()
 
-    # Populate parent choices each time (so the list is fresh)
-    channels = Channel.query.order_by(Channel.name.asc()).all()
-    form.parent_id.choices = [(0, "— None —")] + [(c.id, f"#{c.name}") for c in channels]
+    # (id, name) projection, cached until a channel is created/renamed/deleted
+    form.parent_id.choices = [(0, "— None —")] + parent_choices()
 
     if request.method == "POST":
         if not current_user.is_authenticated:
@@ -45,11 +51,6 @@ def new_channel():
         if form.validate_on_submit():
             name = (form.name.data or "").strip()
 
-            # Soft duplicate guard (keep a UNIQUE at DB layer if you want hard guarantee)
-            if Channel.query.filter_by(name=name).first():
-                form.name.errors.append("A channel with that name already exists.")
-                return render_template("channels/new.html", form=form), 409
-
             ch = Channel(name=name)
 
             pid = form.parent_id.data or 0
@@ -60,19 +61,20 @@ def new_channel():
                     return render_template("channels/new.html", form=form), 400
                 ch.parent = parent
 
+            # Single INSERT; the unique index on name_key is the duplicate check
             db.session.add(ch)
             try:
                 db.session.commit()
             except IntegrityError:
                 db.session.rollback()
-                form.name.errors.append("Could not create channel (possibly duplicate).")
+                form.name.errors.append("A channel with that name already exists.")
                 return render_template("channels/new.html", form=form), 409
 
             flash(f"Created channel #{ch.name}.", "success")
             return redirect(url_for("channels.get_channel", channel_id=ch.id))
 
         # Form didn’t validate (length, etc.)
-        return render_template("channels/new.html")
+        return render_template("channels/new.html", form=form), 400
 
     # GET
     return render_template("channels/new.html", form=form)
@@ -81,19 +83,16 @@ def new_channel():
 @bp.route("/<int:channel_id>", methods=["GET", "POST"])
 def get_channel(channel_id: int):
     """
-    GET: render the channel page with its posts and a post form.
+    GET: render one page of the channel's posts (newest first) and a post form.
+         Older pages are reached via the opaque ?cursor= token.
     POST: create a post in this channel for the logged-in user.
     """
     channel = db.session.get(Channel, channel_id)
     if not channel:
         abort(404)
 
-    is_following = (
-        current_user.is_authenticated
-        and hasattr(current_user, "following")
-        and (channel in current_user.following)
-    )
-    
+    is_following = current_user.is_authenticated and current_user.is_following(channel.id)
+
     form = PostForm()
 
     if request.method == "POST":
@@ -103,10 +102,11 @@ def get_channel(channel_id: int):
 
         if form.validate_on_submit():
             body = (form.body.data or "").strip()
-            tags = (form.tags.data or "").strip() or None
+            # Stored normalized; the post_tags index is written by the model hooks
+            tags = ", ".join(parse_tags(form.tags.data)) or None
 
             p = Post(body=body, tags=tags)
-            p.author = current_user
+            p.user_id = current_user.id
             p.channel = channel
             db.session.add(p)
             db.session.commit()
@@ -114,54 +114,121 @@ def get_channel(channel_id: int):
             flash("Posted!", "success")
             return redirect(url_for("channels.get_channel", channel_id=channel.id))
 
-        # Validation errors → re-render with 400
-        posts = (
-            Post.query.filter_by(channel_id=channel.id)
-            .order_by(Post.created_at.desc(), Post.id.desc())
-            .all()
-        )
-        return render_template(
-            "channels/show.html", 
-            channel=channel, 
-            posts=posts, 
-            post_form=form, 
-            is_following=is_following
-            ), 400
+        # Validation errors → re-render with 400 (first page only)
+        return _render_channel(channel, form, is_following, cursor=None), 400
 
-    # GET
-    posts = (
-        Post.query.filter_by(channel_id=channel.id)
-        .order_by(Post.created_at.desc(), Post.id.desc())
-        .all()
+    # GET: answer revalidations from the channel row alone (304 before any
+    # timeline query). The page also depends on who is looking.
+    validators = None
+    if cacheable():
+        viewer = (current_user.get_id(), current_user.username) if current_user.is_authenticated else None
+        validators = channel_validators(channel, viewer, is_following, csrf_epoch())
+        if (resp := not_modified(*validators, private=True)) is not None:
+            return resp
+
+    resp = make_response(_render_channel(channel, form, is_following, cursor=request.args.get("cursor")))
+    if validators and resp.status_code == 200:
+        add_validators(resp, *validators, private=True)
+    return resp
+
+
+@bp.get("/<int:channel_id>/all")
+def get_channel_tree(channel_id: int):
+    """Like get_channel, but the timeline includes every sub-channel's posts."""
+    channel = db.session.get(Channel, channel_id)
+    if not channel:
+        abort(404)
+
+    is_following = current_user.is_authenticated and current_user.is_following(channel.id)
+    return _render_channel(
+        channel, PostForm(), is_following, cursor=request.args.get("cursor"), subtree=True
     )
 
+
+def _render_channel(
+    channel: Channel,
+    form: PostForm,
+    is_following: bool,
+    cursor: str | None,
+    subtree: bool = False,
+):
+    """Render one keyset page of the channel (or channel subtree) timeline."""
+    if subtree:
+        query = channel.subtree_posts()
+        endpoint = "channels.get_channel_tree"
+    else:
+        query = Post.timeline(channel_id=channel.id)
+        endpoint = "channels.get_channel"
+
+    try:
+        page = paginate_posts(
+            query,
+            cursor=cursor,
+            per_page=current_app.config["POSTS_PER_PAGE"],
+        )
+    except InvalidCursor:
+        abort(400)
+
+    next_page_url = None
+    if page.next_cursor:
+        next_page_url = url_for(endpoint, channel_id=channel.id, cursor=page.next_cursor)
+
+    # First page of a single channel: new posts arrive over SSE from here on
+    live_url = None
+    if cursor is None and not subtree and current_app.config["LIVE_ENABLED"]:
+        newest = max((p.id for p in page.items), default=0)
+        live_url = url_for("channels.live_channel", channel_id=channel.id, after=newest)
+
     return render_template(
-        "channels/show.html", 
-        channel=channel, 
-        posts=posts, 
-        post_form=form, 
-        is_following=is_following
+        "channels/show.html",
+        channel=channel,
+        posts=page.items,
+        post_form=form,
+        is_following=is_following,
+        next_page_url=next_page_url,
+        subtree=subtree,
+        live_url=live_url,
         )
 
 
+@bp.get("/<int:channel_id>/live")
+def live_channel(channel_id: int):
+    """Server-Sent Events: each new post in the channel as a rendered list item."""
+    if not current_app.config["LIVE_ENABLED"] or db.session.get(Channel, channel_id) is None:
+        abort(404)
+    return _live([channel_id], show_channel=False)
+
+
+@bp.get("/following/live")
+@login_required
+def live_following():
+    """Server-Sent Events for the home feed: new posts in every followed channel."""
+    if not current_app.config["LIVE_ENABLED"]:
+        abort(404)
+    from ..feed import followed_channel_ids
+    # Follows made after connecting show up on the next reconnect
+    return _live(followed_channel_ids(current_user.id), show_channel=True)
+
+
+def _live(channel_ids: list[int], show_channel: bool):
+    try:
+        return stream_posts(channel_ids, show_channel, after=last_event_id(request))
+    except BrokerFull:
+        return "Too many live connections, try again shortly.", 503, {"Retry-After": "30"}
+
+
 @bp.post("/<int:channel_id>/follow")
 @login_required
 def follow_channel(channel_id: int):
     ch = db.session.get(Channel, channel_id)
     if not ch:
         abort(404)
-    # idempotent: do nothing if already following
-    if hasattr(current_user, "following") and ch in current_user.following:
-        flash(f"Already following #{ch.name}.", "info")
-        return redirect(url_for("channels.get_channel", channel_id=ch.id))
 
-    try:
-        current_user.following.append(ch)
+    # idempotent: INSERT ... ON CONFLICT DO NOTHING, so races are harmless too
+    if current_user.follow(ch.id):
         db.session.commit()
         flash(f"Now following #{ch.name}.", "success")
-    except IntegrityError:
-        db.session.rollback()
-        # race-safe: treat as already following
+    else:
         flash(f"Already following #{ch.name}.", "info")
     return redirect(url_for("channels.get_channel", channel_id=ch.id))
 
@@ -172,13 +239,9 @@ def unfollow_channel(channel_id: int):
     ch = db.session.get(Channel, channel_id)
     if not ch:
         abort(404)
-    if not hasattr(current_user, "following"):
-        flash("Following is not available.", "warning")
-        return redirect(url_for("channels.get_channel", channel_id=channel_id))
 
     # Remove if present; idempotent if not
-    if ch in current_user.following:
-        current_user.following.remove(ch)
+    if current_user.unfollow(ch.id):
         db.session.commit()
         flash(f"Unfollowed #{ch.name}.", "info")
     else:
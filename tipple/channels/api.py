@@ -1,10 +1,14 @@
 # tipple/channels/api.py
 from __future__ import annotations
-from flask import Blueprint, request, jsonify, url_for, abort
+import sys
+
+from flask import Blueprint, request, jsonify, url_for, abort, current_app
 from flask_login import current_user, login_required
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 
-from ..models import db, Channel
+from ..models import db, Channel, normalize_channel_name
+from ..http_cache import channel_validators, not_modified, add_validators
 
 bp = Blueprint("channels_api", __name__, url_prefix="/channels/api")
 
@@ -36,20 +40,17 @@ def create_channel_api():
         if not parent:
             return jsonify(error="parent channel not found"), 404
 
-    # Soft duplicate guard (keep a DB UNIQUE if you want a hard guarantee)
-    if Channel.query.filter_by(name=name).first():
-        return jsonify(error="channel name already exists"), 409
-
     ch = Channel(name=name)
     if parent:
         ch.parent = parent
 
+    # Single INSERT; the unique index on name_key is the duplicate check
     db.session.add(ch)
     try:
         db.session.commit()
     except IntegrityError:
         db.session.rollback()
-        return jsonify(error="unable to create channel"), 409
+        return jsonify(error="channel name already exists"), 409
 
     payload = {
         "id": ch.id,
@@ -64,6 +65,47 @@ def create_channel_api():
     )
 
 
+@bp.get("/search")
+def search_channels_api():
+    """
+    Typeahead for channel names.
+    Query string:
+      - q: name prefix (required)
+      - limit: max results (optional, capped by CHANNEL_SEARCH_LIMIT)
+    """
+    prefix = normalize_channel_name(request.args.get("q"))
+    if not prefix:
+        return jsonify(results=[])
+
+    cap = current_app.config["CHANNEL_SEARCH_LIMIT"]
+    limit = max(1, min(request.args.get("limit", cap, type=int) or cap, cap))
+
+    # Case-insensitive prefix as a half-open range on the unique name_key
+    # index, so it's an index range scan rather than LIKE
+    query = select(Channel.id, Channel.name).where(Channel.name_key >= prefix)
+    upper = _prefix_upper_bound(prefix)
+    if upper is not None:
+        query = query.where(Channel.name_key < upper)
+    rows = db.session.execute(query.order_by(Channel.name_key).limit(limit)).all()
+    return jsonify(results=[{"id": cid, "name": name} for cid, name in rows])
+
+
+def _prefix_upper_bound(prefix: str) -> str | None:
+    """
+    Smallest string above everything starting with `prefix`, or None when
+    there is none (all U+10FFFF). Skips the surrogates, which SQLite can't
+    store as text.
+    """
+    while prefix:
+        nxt = ord(prefix[-1]) + 1
+        if nxt <= sys.maxunicode:
+            if 0xD800 <= nxt <= 0xDFFF:
+                nxt = 0xE000
+            return prefix[:-1] + chr(nxt)
+        prefix = prefix[:-1]
+    return None
+
+
 @bp.get("/<int:channel_id>")
 def get_channel_api(channel_id: int):
     """Return channel details as JSON."""
@@ -71,18 +113,21 @@ def get_channel_api(channel_id: int):
     if not ch:
         abort(404)
 
-    # follower_count only if the m2m is set up
-    follower_count = len(ch.followers) if hasattr(ch, "followers") else None
+    # Same for every caller, so shared caches may revalidate it too
+    validators = channel_validators(ch)
+    if (resp := not_modified(*validators)) is not None:
+        return resp
 
+    # Counts come from the denormalized columns, not len(ch.followers)
     payload = {
         "id": ch.id,
         "name": ch.name,
         "parent_id": ch.parent_id,
         "created_at": ch.created_at.isoformat(),
+        "follower_count": ch.follower_count,
+        "post_count": ch.post_count,
     }
-    if follower_count is not None:
-        payload["follower_count"] = follower_count
-    return jsonify(payload)
+    return add_validators(jsonify(payload), *validators)
 
 
 @bp.post("/<int:channel_id>")
@@ -93,16 +138,10 @@ def follow_channel_api(channel_id: int):
     if not ch:
         abort(404)
 
-    # If already following, do nothing (idempotent success)
-    if ch in current_user.following:
-        return jsonify(message="already following", id=ch.id), 200
-
-    current_user.following.append(ch)
-    try:
-        db.session.commit()
-    except IntegrityError:
-        db.session.rollback()
-        # If a race caused the join row to exist, treat as already-following
+    # If already following, do nothing (idempotent success). The insert
+    # ignores conflicts, so a concurrent follow lands here as well.
+    if not current_user.follow(ch.id):
         return jsonify(message="already following", id=ch.id), 200
 
+    db.session.commit()
     return jsonify(message="now following", id=ch.id), 201
@@ -0,0 +1,89 @@
+# tipple/channels/choices.py
+from __future__ import annotations
+import threading
+import time
+from typing import Any
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, attributes
+
+from ..models import db, Channel
+
+_EXT_KEY = "tipple.channel_choices"
+
+
+class ChannelChoicesCache:
+    """
+    (id, "#name") pairs for the parent-channel picker, sorted by name.
+
+    Built from a two-column projection (no Channel objects are hydrated) and
+    kept until a channel is created, renamed or deleted in this process, or
+    until `ttl` seconds pass (which bounds staleness across workers).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._choices: list[tuple[int, str]] | None = None
+        self._loaded_at = 0.0
+        self._generation = 0
+
+    def get(self, ttl: float) -> list[tuple[int, str]]:
+        with self._lock:
+            if self._choices is not None and time.monotonic() - self._loaded_at < ttl:
+                return self._choices
+            generation = self._generation
+
+        rows = db.session.execute(
+            select(Channel.id, Channel.name).order_by(Channel.name.asc())
+        ).all()
+        choices = [(cid, f"#{name}") for cid, name in rows]
+
+        with self._lock:
+            # Don't cache a result that raced with an invalidation
+            if generation == self._generation:
+                self._choices = choices
+                self._loaded_at = time.monotonic()
+        return choices
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._choices = None
+            self._generation += 1
+
+
+def _cache() -> ChannelChoicesCache:
+    return current_app.extensions.setdefault(_EXT_KEY, ChannelChoicesCache())
+
+
+def parent_choices() -> list[tuple[int, str]]:
+    return _cache().get(current_app.config["CHANNEL_CHOICES_TTL"])
+
+
+def invalidate_parent_choices() -> None:
+    if has_app_context():
+        _cache().invalidate()
+
+
+@event.listens_for(Session, "after_flush")
+def _note_channel_changes(session: Session, flush_context: Any) -> None:
+    for obj in (*session.new, *session.deleted, *session.dirty):
+        if isinstance(obj, Channel) and (
+            obj in session.new
+            or obj in session.deleted
+            or attributes.get_history(obj, "name").has_changes()
+        ):
+            session.info["tipple.channel_choices_stale"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    # Invalidate only once the change is visible to other connections
+    if session.info.pop("tipple.channel_choices_stale", False):
+        invalidate_parent_choices()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session) -> None:
+    session.info.pop("tipple.channel_choices_stale", None)
@@ -5,6 +5,9 @@ from wtforms.validators import DataRequired, Length, Optional
 
 class ChannelCreateForm(FlaskForm):
     name = StringField("Channel name", validators=[DataRequired(), Length(max=255)])
-    # We'll populate choices in the view; 0 means “None”
-    parent_id = SelectField("Parent channel", coerce=int, validators=[Optional()], choices=[])
+    # We'll populate choices in the view; 0 means “None”. Choices come from a
+    # cache that may lag a few seconds, so the view checks the parent exists
+    # instead of WTForms matching against the list.
+    parent_id = SelectField("Parent channel", coerce=int, validators=[Optional()], choices=[],
+                            validate_choice=False)
     submit = SubmitField("Create channel")
@@ -0,0 +1,172 @@
+# tipple/cli.py
+from __future__ import annotations
+
+import click
+from flask.cli import AppGroup
+
+cli = AppGroup("tipple", help="tipple maintenance commands.")
+
+
+@cli.command("recount")
+def recount_command() -> None:
+    """Rebuild denormalized counters (channel followers/posts, user follows)."""
+    from .models import recount_channels
+    n = recount_channels()
+    click.echo(f"Recounted {n} channel(s).")
+
+
+@cli.command("backfill-tags")
+@click.option("--batch-size", default=1000, show_default=True, help="Posts per transaction.")
+def backfill_tags_command(batch_size: int) -> None:
+    """Index tags of existing posts into tags/post_tags."""
+    from .models import backfill_post_tags
+    scanned, linked = backfill_post_tags(batch_size=batch_size)
+    click.echo(f"Scanned {scanned} tagged post(s), added {linked} tag link(s).")
+
+
+@cli.command("rebuild-feeds")
+def rebuild_feeds_command() -> None:
+    """Rebuild home-feed inboxes (run after changing FEED_FANOUT_MAX_FOLLOWS)."""
+    from .feed import rebuild_inboxes
+    n = rebuild_inboxes()
+    click.echo(f"Rebuilt {n} inbox(es).")
+
+
+@cli.command("sqlite-maintenance")
+@click.option("--truncate", is_flag=True, help="Also shrink the WAL file (waits for readers).")
+def sqlite_maintenance_command(truncate: bool) -> None:
+    """Checkpoint SQLite WAL files and run PRAGMA optimize (e.g. from cron)."""
+    from flask import current_app
+    from .sqlite_profile import sqlite_maintenance
+    maintenance = sqlite_maintenance(current_app)
+    if maintenance is None:
+        raise click.ClickException("no SQLite database configured")
+    for busy, wal_pages, done in maintenance.run("TRUNCATE" if truncate else "PASSIVE"):
+        if wal_pages < 0:
+            click.echo("Not in WAL mode; ran PRAGMA optimize.")
+        else:
+            click.echo(f"Checkpointed {done}/{wal_pages} WAL page(s){' (busy)' if busy else ''}.")
+
+
+@cli.command("replicate")
+@click.option("--interval", type=float, default=1.0, show_default=True, help="Seconds between copies.")
+@click.option("--once", is_flag=True, help="Copy once and exit.")
+def replicate_command(interval: float, once: bool) -> None:
+    """Keep a local SQLite replica in sync with the primary (stand-in for replication)."""
+    from flask import current_app
+    from .routing import Replicator, replica_configured
+    if not replica_configured(current_app):
+        raise click.ClickException("no replica configured (set TIPPLE_REPLICA_DATABASE_URI)")
+    try:
+        replicator = Replicator.for_app(current_app)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if once:
+        replicator.replicate()
+        click.echo(f"Copied {replicator.primary_path} to {replicator.replica_path}.")
+        return
+    click.echo(f"Copying {replicator.primary_path} to {replicator.replica_path} every {interval}s (Ctrl-C to stop).")
+    try:
+        replicator.run(interval)
+    except KeyboardInterrupt:
+        pass
+
+
+@cli.command("profile-token")
+@click.option("--path", "path_prefix", default="/", show_default=True,
+              help="Only requests whose path starts with this may be profiled.")
+def profile_token_command(path_prefix: str) -> None:
+    """Print a token that profiles requests (valid for PROFILER_TOKEN_MAX_AGE)."""
+    from flask import current_app
+    from .profiler import HEADER, QUERY_ARG, make_profile_token
+    token = make_profile_token(current_app, path_prefix)
+    click.echo(token)
+    how = f"'{HEADER}: <token>'" + (f" or ?{QUERY_ARG}=<token>" if current_app.config["PROFILER_QUERY_ARG"] else "")
+    click.echo(f"Send it as {how}; "
+               f"output lands in {current_app.instance_path}/{current_app.config['PROFILER_DIR']}/.", err=True)
+    if not current_app.config["PROFILER_ENABLED"]:
+        click.echo("Profiling is off here; set TIPPLE_PROFILER_ENABLED=1 to turn it on.", err=True)
+
+
+@cli.command("seed")
+@click.option("--users", type=int, default=1000, show_default=True)
+@click.option("--channels", type=int, default=200, show_default=True)
+@click.option("--posts", type=int, default=50_000, show_default=True)
+@click.option("--follows-mean", type=float, default=10.0, show_default=True,
+              help="Average channels followed per user (Pareto-distributed).")
+@click.option("--max-depth", type=int, default=6, show_default=True, help="Deepest channel nesting.")
+@click.option("--zipf", "zipf_s", type=float, default=1.1, show_default=True,
+              help="Skew of channel/author popularity (0 = uniform).")
+@click.option("--days", type=int, default=90, show_default=True, help="Spread posts over this many days.")
+@click.option("--password", default="password", show_default=True, help="Password of every seeded user.")
+@click.option("--seed", "random_seed", type=int, default=1, show_default=True, help="Random seed.")
+def seed_command(**options) -> None:
+    """Bulk-generate synthetic users, channel trees, posts and follows for load testing."""
+    from .seed import seed
+    result = seed(**options)
+    click.echo(f"Seeded {result.users} user(s), {result.channels} channel(s) (depth {result.max_depth}), "
+               f"{result.follows} follow(s) and {result.posts} post(s), built {result.inboxes} inbox(es) "
+               f"in {result.seconds:.1f}s.")
+
+
+@cli.command("import-posts")
+@click.argument("source", type=click.File("rb"), default="-")
+@click.option("--format", "fmt", type=click.Choice(["ndjson", "json"]),
+              help="Input format (default: json for *.json, else ndjson).")
+@click.option("--user", "username", help="Author for records without an \"author\" field.")
+@click.option("--batch-size", type=int, help="Records per transaction (default: IMPORT_BATCH_SIZE).")
+@click.option("--checkpoint", type=click.Path(dir_okay=False),
+              help="Progress file; re-running with it resumes after the last committed batch.")
+@click.option("--strict", is_flag=True, help="Stop at the first invalid record.")
+def import_posts_command(source, fmt, username, batch_size, checkpoint, strict) -> None:
+    """Bulk-import posts from NDJSON or a JSON array (SOURCE, or stdin)."""
+    import io
+    import json
+    from pathlib import Path
+    from flask import current_app
+    from .ingest import PostImporter, iter_json_array, iter_ndjson
+    from .models import User
+
+    default_user_id = None
+    if username:
+        user = User.find_by_login(username)
+        if user is None:
+            raise click.ClickException(f"no such user: {username}")
+        default_user_id = user.id
+
+    skip = 0
+    state_path = Path(checkpoint) if checkpoint else None
+    if state_path and state_path.exists():
+        state = json.loads(state_path.read_text())
+        if state.get("source") != source.name:
+            raise click.ClickException(f"{checkpoint} belongs to {state.get('source')!r}, not {source.name!r}")
+        skip = state["read"]
+        click.echo(f"Resuming after record {skip}.")
+
+    def save(result) -> None:
+        click.echo(f"  {result.read:>10} read  {result.inserted:>10} inserted  "
+                   f"{result.rejected:>6} rejected  {result.posts_per_second:>10,.0f} posts/s")
+        if state_path:
+            state_path.write_text(json.dumps({"source": source.name, "read": result.read}))
+
+    fmt = fmt or ("json" if source.name.endswith(".json") else "ndjson")
+    if fmt == "json":
+        records = iter_json_array(io.TextIOWrapper(source, encoding="utf-8"))
+    else:
+        records = iter_ndjson(source)
+    importer = PostImporter(
+        default_user_id=default_user_id,
+        allow_author=True,
+        batch_size=batch_size or current_app.config["IMPORT_BATCH_SIZE"],
+        strict=strict,
+        on_commit=save,
+    )
+    result = importer.run(records, skip=skip)
+
+    for err in result.errors:
+        click.echo(f"record {err['record']}: {err['error']}", err=True)
+    click.echo(f"Imported {result.inserted} post(s), rejected {result.rejected}, "
+               f"in {result.seconds:.1f}s ({result.posts_per_second:,.0f} posts/s).")
+    if not result.complete:
+        hint = "re-run to resume" if checkpoint else "use --checkpoint to make it resumable"
+        raise click.ClickException(f"stopped after record {result.read}; {hint}")
@@ -9,15 +9,148 @@ class BaseConfig:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_DATABASE_URI = os.environ.get("TIPPLE_DATABASE_URI")
 
+    # Read replica (see tipple.routing). GET/HEAD requests read from the
+    # READ_REPLICA_BIND engine; writes, and a user's reads for
+    # READ_YOUR_WRITES_SECONDS after they write, use the primary.
+    SQLALCHEMY_BINDS = (
+        {"replica": os.environ["TIPPLE_REPLICA_DATABASE_URI"]}
+        if os.environ.get("TIPPLE_REPLICA_DATABASE_URI") else {}
+    )
+    READ_REPLICA_BIND = "replica"
+    READ_YOUR_WRITES_SECONDS = 5
+
+    # Timelines are keyset-paginated; this is the number of posts per page
+    POSTS_PER_PAGE = int(os.environ.get("TIPPLE_POSTS_PER_PAGE", 20))
+
+    # Home feed: users following up to this many channels get their feed
+    # merged on read (one index probe per channel per page). Above it they
+    # get a materialized inbox, written as posts are created.
+    # After changing it, run `flask tipple rebuild-feeds`.
+    FEED_FANOUT_MAX_FOLLOWS = 200
+    # Newest followed posts kept in an inbox; older pages are merged on read
+    FEED_INBOX_SIZE = 1000
+
+    # Bulk post import (`flask tipple import-posts`, POST /posts/api/bulk):
+    # records per INSERT/transaction
+    IMPORT_BATCH_SIZE = 1000
+
+    # Rendered post fragments (see tipple.fragments): "lru", "null" or an
+    # import path to a backend class taking max_bytes
+    FRAGMENT_CACHE_BACKEND = "lru"
+    FRAGMENT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+    # GET /_internal/cache-stats (hit ratios for monitoring)
+    CACHE_STATS_ENABLED = False
+
+    # Live timelines over Server-Sent Events (see tipple.live). LIVE_BROKER:
+    # "local" (one worker), "sqlite" (workers on one host share
+    # LIVE_BROKER_PATH in the instance folder) or an import path to a broker
+    # class with for_app(app). Off unless TIPPLE_LIVE_ENABLED=1: each open
+    # stream holds a worker thread for up to LIVE_MAX_STREAM_SECONDS, so it
+    # needs a threaded or async server (e.g. gunicorn -k gthread or gevent);
+    # sync workers would be used up by a few open tabs
+    LIVE_ENABLED = os.environ.get("TIPPLE_LIVE_ENABLED") == "1"
+    LIVE_BROKER = os.environ.get("TIPPLE_LIVE_BROKER", "local")
+    LIVE_BROKER_PATH = "live_events.sqlite"
+    LIVE_POLL_INTERVAL = 0.25
+    # Each open stream holds a worker thread: cap them per worker (503 past it)
+    LIVE_MAX_SUBSCRIBERS = 100
+    # Events queued per stream before it falls back to re-reading the db
+    LIVE_QUEUE_SIZE = 100
+    # Most posts re-sent on reconnect/catch-up; past it the client reloads
+    LIVE_REPLAY_LIMIT = 100
+    LIVE_HEARTBEAT_SECONDS = 15.0
+    # Streams end after this long and the browser reconnects (Last-Event-ID)
+    LIVE_MAX_STREAM_SECONDS = 300.0
+    LIVE_RETRY_MS = 3000
+
+    # Parent-channel picker: seconds a cached (id, name) list may be served
+    # before reloading (local changes invalidate it immediately)
+    CHANNEL_CHOICES_TTL = 60
+    # Max results from the channel typeahead endpoint
+    CHANNEL_SEARCH_LIMIT = 20
+
+    # Cached login principals (see tipple.auth.session_user). The TTL bounds
+    # how long another worker's profile/password change can go unnoticed.
+    SESSION_USER_CACHE_SIZE = 10_000
+    SESSION_USER_CACHE_TTL = 300
+
+    # Password hashing (werkzeug method string, see tipple.auth.passwords).
+    # Changing the method re-hashes each user's password on their next login.
+    PASSWORD_HASH_METHOD = "scrypt:32768:8:1"
+    # Hashes running at once / allowed to queue before logins get a 503
+    PASSWORD_HASH_WORKERS = 2
+    PASSWORD_HASH_MAX_PENDING = 16
+    PASSWORD_HASH_TIMEOUT = 10.0
+
+    # Request instrumentation (see tipple.instrumentation): send per-request
+    # query count, DB time and render time as a Server-Timing header
+    SERVER_TIMING = False
+    # Statements slower than this (ms; None: off) are logged, a
+    # SLOW_QUERY_SAMPLE_RATE fraction of them, to SLOW_QUERY_LOG in the
+    # instance folder, one JSON object per line
+    SLOW_QUERY_MS: float | None = 100
+    SLOW_QUERY_SAMPLE_RATE = 1.0
+    SLOW_QUERY_LOG = "slow_queries.log"
+
+    # Prometheus text metrics at GET /metrics (see tipple.metrics). With
+    # METRICS_TOKEN set, scrapes need "Authorization: Bearer <token>".
+    METRICS_ENABLED = os.environ.get("TIPPLE_METRICS_ENABLED") == "1"
+    METRICS_TOKEN = os.environ.get("TIPPLE_METRICS_TOKEN")
+    # Shared by all workers of one server (e.g. gunicorn) so a scrape sees
+    # them all; empty it on startup. Unset: this process only.
+    METRICS_MULTIPROC_DIR = os.environ.get("TIPPLE_METRICS_DIR")
+    METRICS_FLUSH_SECONDS = 5.0
+
+    # On-demand request profiling (see tipple.profiler): requests carrying a
+    # token from `flask tipple profile-token` are stack-sampled every
+    # PROFILER_INTERVAL seconds; output goes to PROFILER_DIR in the instance
+    # folder. Off unless TIPPLE_PROFILER_ENABLED=1 (tokens are signed with
+    # SECRET_KEY)
+    PROFILER_ENABLED = os.environ.get("TIPPLE_PROFILER_ENABLED") == "1"
+    PROFILER_TOKEN_MAX_AGE = 3600
+    PROFILER_INTERVAL = 0.001
+    PROFILER_DIR = "profiles"
+    # Also accept the token as ?_profile= (it then lands in access logs)
+    PROFILER_QUERY_ARG = False
+    # Profiles written per worker: per token, and per minute for all tokens
+    PROFILER_MAX_PER_TOKEN = 20
+    PROFILER_MAX_PER_MINUTE = 10
+
+    # SQLite engine profile (see tipple.sqlite_profile): PRAGMAs run, in
+    # order, on every new connection. Empty keeps SQLite's defaults.
+    SQLITE_PRAGMAS: dict[str, int | str] = {}
+    # Seconds between WAL checkpoint + PRAGMA optimize runs per worker (0: never)
+    SQLITE_MAINTENANCE_INTERVAL = 0
+
 
 class DevelopmentConfig(BaseConfig):
     DEBUG = True
+    PROFILER_ENABLED = True
+    SERVER_TIMING = True
+    CACHE_STATS_ENABLED = True
 
 
 class TestingConfig(BaseConfig):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    # Cheap hashes keep the suite fast
+    PASSWORD_HASH_METHOD = "pbkdf2:sha256:1000"
 
 
 class ProductionConfig(BaseConfig):
     DEBUG = False
+
+    SQLITE_PRAGMAS = {
+        # Wait for a lock instead of failing with "database is locked"
+        # (first, so switching journal_mode below waits too)
+        "busy_timeout": 5000,
+        # Readers and the writer no longer block each other
+        "journal_mode": "WAL",
+        # With WAL, fsync at checkpoints only; a crash can lose the last
+        # commits but never corrupts the database
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,  # KiB, per connection
+        "temp_store": "MEMORY",
+    }
+    SQLITE_MAINTENANCE_INTERVAL = 300
@@ -0,0 +1,247 @@
+# tipple/feed.py
+from __future__ import annotations
+from datetime import datetime
+from typing import Any, Optional
+
+import sqlalchemy as sa
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload
+
+from .models import db, Channel, Post, User, feed_items, user_channel_follows, _insert_ignore
+from .pagination import Page, encode_cursor, keyset_query
+
+# Home feed: every post in the channels a user follows, newest first.
+#
+# Two strategies, picked per user by users.following_count:
+#   * up to FEED_FANOUT_MAX_FOLLOWS follows: fan-out on read. A short range
+#     scan on ix_posts_channel_created_id per followed channel, merged and cut
+#     to a page in the same SELECT; cost grows with the number of follows.
+#   * above that: a materialized inbox (feed_items) written when posts are
+#     created, so a page is one range scan however many channels are followed.
+# Only users above the threshold have inbox rows, so fan-out on write is
+# limited to the (few) heavy followers of a channel.
+#
+# An inbox keeps the newest FEED_INBOX_SIZE followed posts and is complete
+# from its oldest row up: every followed post newer than that row is in it.
+# Paging past the end of the inbox carries on with fan-out on read, so heavy
+# followers still see their whole history.
+
+
+def _fanout_max() -> int:
+    return current_app.config["FEED_FANOUT_MAX_FOLLOWS"]
+
+
+def uses_inbox(following_count: int) -> bool:
+    return following_count > _fanout_max()
+
+
+def home_feed(user_id: int, *, cursor: Optional[str] = None, per_page: int = 20) -> Page[Post]:
+    """One keyset page of the user's home feed (raises InvalidCursor)."""
+    following = db.session.scalar(sa.select(User.following_count).where(User.id == user_id)) or 0
+    if following == 0:
+        return Page(items=[], next_cursor=None)
+
+    if uses_inbox(following):
+        rows = _inbox_rows(user_id, cursor, per_page + 1)
+        if len(rows) <= per_page:
+            # Ran off the end of the inbox: older posts come from the follows
+            after = encode_cursor(rows[-1].created_at, rows[-1].id) if rows else cursor
+            rows += _fanout_rows(user_id, after, per_page + 1 - len(rows))
+    else:
+        rows = _fanout_rows(user_id, cursor, per_page + 1)
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    ids = [row.id for row in rows]
+    posts = (
+        Post.timeline()
+        .filter(Post.id.in_(ids))
+        .options(joinedload(Post.channel).load_only(Channel.name))
+        .all()
+    ) if ids else []
+    by_id = {p.id: p for p in posts}
+    return Page(items=[by_id[i] for i in ids if i in by_id], next_cursor=next_cursor)
+
+
+def followed_channel_ids(user_id: int) -> list[int]:
+    return list(db.session.scalars(
+        sa.select(user_channel_follows.c.channel_id).where(user_channel_follows.c.user_id == user_id)
+    ))
+
+
+def _fanout_rows(user_id: int, cursor: Optional[str], limit: int) -> list[Any]:
+    # SQLite walks follows by user, then each channel's slice of
+    # ix_posts_channel_created_id past the cursor, and keeps the newest
+    # `limit` in a sorter: every followed post past the cursor is read, so
+    # the cost grows with the followed channels' volume (hence the inbox
+    # above FEED_FANOUT_MAX_FOLLOWS).
+    posts = Post.__table__
+    follows = user_channel_follows
+    stmt = (
+        sa.select(posts.c.id, posts.c.created_at)
+        .join(follows, follows.c.channel_id == posts.c.channel_id)
+        .where(follows.c.user_id == user_id)
+    )
+    stmt = keyset_query(stmt, posts.c.created_at, posts.c.id, cursor).limit(limit)
+    return db.session.execute(stmt).all()
+
+
+def _inbox_rows(user_id: int, cursor: Optional[str], limit: int) -> list[Any]:
+    stmt = sa.select(feed_items.c.post_id.label("id"), feed_items.c.created_at).where(
+        feed_items.c.user_id == user_id
+    )
+    stmt = keyset_query(stmt, feed_items.c.created_at, feed_items.c.post_id, cursor).limit(limit)
+    return db.session.execute(stmt).all()
+
+
+# --- inbox maintenance (all set-based, inside the caller's transaction) ---
+
+def _inbox_insert(conn: sa.Connection, select: sa.Select) -> None:
+    cols = ["user_id", "post_id", "channel_id", "created_at"]
+    conn.execute(_insert_ignore(feed_items).from_select(cols, select))
+
+
+def _inbox_size() -> int:
+    return current_app.config["FEED_INBOX_SIZE"]
+
+
+def _inbox_oldest(user_id: Any) -> sa.Select:
+    """(created_at, post_id) of the oldest row in the inbox: where it stops being complete."""
+    return (
+        sa.select(feed_items.c.created_at, feed_items.c.post_id)
+        .where(feed_items.c.user_id == user_id)
+        .order_by(feed_items.c.created_at, feed_items.c.post_id)
+        .limit(1)
+    )
+
+
+def _trim_inboxes(conn: sa.Connection, user_ids: sa.Select | list[int]) -> None:
+    """Drop rows past the newest FEED_INBOX_SIZE from these users' inboxes."""
+    ranked = (
+        sa.select(
+            feed_items.c.user_id, feed_items.c.post_id,
+            sa.func.row_number().over(
+                partition_by=feed_items.c.user_id,
+                order_by=(feed_items.c.created_at.desc(), feed_items.c.post_id.desc()),
+            ).label("rn"),
+        )
+        .where(feed_items.c.user_id.in_(user_ids))
+        .subquery()
+    )
+    conn.execute(sa.delete(feed_items).where(
+        sa.tuple_(feed_items.c.user_id, feed_items.c.post_id).in_(
+            sa.select(ranked.c.user_id, ranked.c.post_id).where(ranked.c.rn > _inbox_size())
+        )
+    ))
+
+
+def _build_inbox(conn: sa.Connection, user_id: int) -> None:
+    """Fill a new inbox with the newest FEED_INBOX_SIZE followed posts."""
+    posts = Post.__table__
+    _inbox_insert(conn, (
+        sa.select(sa.literal(user_id), posts.c.id, posts.c.channel_id, posts.c.created_at)
+        .join(user_channel_follows, user_channel_follows.c.channel_id == posts.c.channel_id)
+        .where(user_channel_follows.c.user_id == user_id)
+        .order_by(posts.c.created_at.desc(), posts.c.id.desc())
+        .limit(_inbox_size())
+    ))
+
+
+def inbox_follow(conn: sa.Connection, user_id: int, channel_id: int, following: int) -> None:
+    """Called after a follow; `following` is the user's new follow count."""
+    if not uses_inbox(following):
+        return
+    if not uses_inbox(following - 1):
+        _build_inbox(conn, user_id)  # just crossed the threshold
+        return
+    # The new channel's posts from the inbox's oldest row up, so it stays
+    # complete from there; older ones are read through fan-out
+    posts = Post.__table__
+    oldest = _inbox_oldest(user_id).subquery()
+    _inbox_insert(conn, (
+        sa.select(sa.literal(user_id), posts.c.id, posts.c.channel_id, posts.c.created_at)
+        .join(oldest, sa.tuple_(posts.c.created_at, posts.c.id) >= sa.tuple_(oldest.c.created_at, oldest.c.post_id))
+        .where(posts.c.channel_id == channel_id)
+    ))
+    _trim_inboxes(conn, [user_id])
+
+
+def inbox_unfollow(conn: sa.Connection, user_id: int, channel_id: int, following: int) -> None:
+    """Called after an unfollow; drops the inbox entirely below the threshold."""
+    stmt = sa.delete(feed_items).where(feed_items.c.user_id == user_id)
+    if uses_inbox(following):
+        stmt = stmt.where(feed_items.c.channel_id == channel_id)
+    conn.execute(stmt)
+
+
+def _inbox_followers(channel_ids: Any) -> sa.Select:
+    users = User.__table__
+    return (
+        sa.select(user_channel_follows.c.user_id)
+        .join(users, users.c.id == user_channel_follows.c.user_id)
+        .where(user_channel_follows.c.channel_id.in_(channel_ids), users.c.following_count > _fanout_max())
+    )
+
+
+def fan_out(conn: sa.Connection, post_id: int, channel_id: int, created_at: datetime) -> None:
+    """Push a new post into the inbox of every inbox user following its channel."""
+    users = User.__table__
+    _inbox_insert(conn, (
+        sa.select(user_channel_follows.c.user_id, sa.literal(post_id), sa.literal(channel_id),
+                  sa.literal(created_at, sa.DateTime))
+        .join(users, users.c.id == user_channel_follows.c.user_id)
+        .where(user_channel_follows.c.channel_id == channel_id,
+               users.c.following_count > _fanout_max())
+    ))
+    _trim_inboxes(conn, _inbox_followers([channel_id]))
+
+
+def fan_out_many(conn: sa.Connection, post_ids: list[int]) -> None:
+    """fan_out for a batch of already-inserted posts, in one statement."""
+    if not post_ids:
+        return
+    posts, users = Post.__table__, User.__table__
+    # Imported posts can be backdated: only those at or above an inbox's
+    # oldest row go in, anything older is below where it's complete anyway
+    oldest = _inbox_oldest(user_channel_follows.c.user_id)
+    oldest_at = oldest.with_only_columns(feed_items.c.created_at).scalar_subquery()
+    oldest_id = oldest.with_only_columns(feed_items.c.post_id).scalar_subquery()
+    _inbox_insert(conn, (
+        sa.select(user_channel_follows.c.user_id, posts.c.id, posts.c.channel_id, posts.c.created_at)
+        .join(user_channel_follows, user_channel_follows.c.channel_id == posts.c.channel_id)
+        .join(users, users.c.id == user_channel_follows.c.user_id)
+        .where(posts.c.id.in_(post_ids), users.c.following_count > _fanout_max(),
+               sa.tuple_(posts.c.created_at, posts.c.id) >= sa.tuple_(oldest_at, oldest_id))
+    ))
+    channel_ids = sa.select(posts.c.channel_id).where(posts.c.id.in_(post_ids)).distinct()
+    _trim_inboxes(conn, _inbox_followers(channel_ids))
+
+
+def rebuild_inboxes() -> int:
+    """
+    Drop every inbox and rebuild those of users above the threshold (e.g.
+    after changing FEED_FANOUT_MAX_FOLLOWS). Returns the number built.
+    """
+    conn = db.session.connection()
+    conn.execute(sa.delete(feed_items))
+    user_ids = db.session.scalars(
+        sa.select(User.id).where(User.following_count > _fanout_max())
+    ).all()
+    for uid in user_ids:
+        _build_inbox(conn, uid)
+    db.session.commit()
+    return len(user_ids)
+
+
+@event.listens_for(Post, "after_insert")
+def _fan_out_new_post(mapper, connection, target: Post) -> None:
+    fan_out(connection, target.id, target.channel_id, target.created_at)
+
+
+@event.listens_for(Post, "after_delete")
+def _remove_from_inboxes(mapper, connection, target: Post) -> None:
+    connection.execute(sa.delete(feed_items).where(feed_items.c.post_id == target.id))
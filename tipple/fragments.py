@@ -0,0 +1,191 @@
+# tipple/fragments.py
+from __future__ import annotations
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Protocol
+
+from flask import current_app, has_app_context
+from markupsafe import Markup
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from werkzeug.utils import import_string
+
+from .models import Post
+
+_EXT_KEY = "tipple.fragment_cache"
+POST_ITEM_TEMPLATE = "channels/_post_item.html"
+
+# Rendered post fragments (channels/_post_item.html), keyed by
+# (post id, template version, variant). A post's HTML only depends on the post
+# itself (and its channel name in the feed variant), so once rendered it can be
+# reused for every viewer until the template changes.
+
+
+class FragmentBackend(Protocol):
+    """What a fragment cache backend has to provide (see LRUFragmentBackend)."""
+
+    def get_many(self, keys: list[Hashable]) -> dict[Hashable, str]: ...
+    def set(self, key: Hashable, post_id: int, html: str) -> None: ...
+    def discard_post(self, post_id: int) -> None: ...
+    def stats(self) -> dict[str, Any]: ...
+
+
+class LRUFragmentBackend:
+    """In-process LRU bounded by the total size of the cached HTML."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[int, str]] = OrderedDict()
+        self._by_post: dict[int, set[Hashable]] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, keys: list[Hashable]) -> dict[Hashable, str]:
+        found: dict[Hashable, str] = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = entry[1]
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def set(self, key: Hashable, post_id: int, html: str) -> None:
+        size = len(html)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (post_id, html)
+            self._by_post.setdefault(post_id, set()).add(key)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def discard_post(self, post_id: int) -> None:
+        with self._lock:
+            for key in list(self._by_post.get(post_id, ())):
+                self._pop(key)
+
+    def _pop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        post_id, html = entry
+        self._bytes -= len(html)
+        keys = self._by_post.get(post_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_post[post_id]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class NullFragmentBackend:
+    """Caches nothing (FRAGMENT_CACHE_BACKEND = "null")."""
+
+    def __init__(self, max_bytes: int = 0) -> None:
+        self.misses = 0
+
+    def get_many(self, keys: list[Hashable]) -> dict[Hashable, str]:
+        self.misses += len(keys)
+        return {}
+
+    def set(self, key: Hashable, post_id: int, html: str) -> None:
+        pass
+
+    def discard_post(self, post_id: int) -> None:
+        pass
+
+    def stats(self) -> dict[str, Any]:
+        return {"entries": 0, "bytes": 0, "max_bytes": 0, "hits": 0, "misses": self.misses, "hit_ratio": 0.0}
+
+
+_BACKENDS = {"lru": LRUFragmentBackend, "null": NullFragmentBackend}
+
+
+def fragment_cache() -> FragmentBackend:
+    cache = current_app.extensions.get(_EXT_KEY)
+    if cache is None:
+        spec = current_app.config["FRAGMENT_CACHE_BACKEND"]
+        factory = _BACKENDS.get(spec) or import_string(spec)
+        cache = current_app.extensions[_EXT_KEY] = factory(current_app.config["FRAGMENT_CACHE_MAX_BYTES"])
+    return cache
+
+
+def _template_version() -> str:
+    """Short hash of the fragment template's source; editing it retires old entries."""
+    ext = current_app.extensions
+    version = ext.get(_EXT_KEY + ".version")
+    if version is None or current_app.jinja_env.auto_reload:
+        env = current_app.jinja_env
+        source, _, _ = env.loader.get_source(env, POST_ITEM_TEMPLATE)  # pyright: ignore[reportOptionalMemberAccess]
+        version = ext[_EXT_KEY + ".version"] = hashlib.sha1(source.encode()).hexdigest()[:12]
+    return version
+
+
+def render_post_items(posts: Iterable[Post], show_channel: Any = False) -> Markup:
+    """
+    The <li> items for a list of posts: cached fragments joined together,
+    rendering (and caching) only the misses. Exposed to templates.
+    """
+    posts = list(posts)
+    show_channel = bool(show_channel)
+    version = _template_version()
+    keys: list[Hashable] = [
+        (p.id, version, p.channel.name if show_channel else None) for p in posts
+    ]
+    cache = fragment_cache()
+    found = cache.get_many(keys)
+
+    template = None
+    parts = []
+    for p, key in zip(posts, keys):
+        html = found.get(key)
+        if html is None:
+            template = template or current_app.jinja_env.get_template(POST_ITEM_TEMPLATE)
+            html = template.render(p=p, show_channel=show_channel)
+            cache.set(key, p.id, html)
+        parts.append(html)
+    return Markup("".join(parts))
+
+
+# Posts are effectively immutable, but an edit or delete still drops the
+# post's fragments once the change is committed.
+
+@event.listens_for(Post, "after_update")
+@event.listens_for(Post, "after_delete")
+def _post_changed(mapper, connection, target: Post) -> None:
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("tipple.posts_changed", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _discard_after_commit(session: Session) -> None:
+    post_ids = session.info.pop("tipple.posts_changed", ())
+    if post_ids and has_app_context():
+        cache = fragment_cache()
+        for pid in post_ids:
+            cache.discard_post(pid)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session) -> None:
+    session.info.pop("tipple.posts_changed", None)
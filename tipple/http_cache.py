@@ -0,0 +1,71 @@
+# tipple/http_cache.py
+from __future__ import annotations
+import hashlib
+import time
+from datetime import datetime, UTC
+from typing import Any, Optional
+
+from flask import current_app, request, session
+from werkzeug.http import is_resource_modified
+from werkzeug.wrappers import Response
+
+from .models import Channel
+
+# Conditional GET for channel views. Validators come from columns already on
+# the channel row (counters and updated_at, which every change to the row
+# bumps), so a poll that hasn't missed anything is answered with a 304 before
+# any timeline query or template render.
+
+
+def channel_validators(channel: Channel, *extra: Any) -> tuple[str, datetime]:
+    """(etag, last_modified) for the channel's state plus any per-view `extra`."""
+    updated_at = channel.updated_at
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=UTC)
+    raw = "|".join(str(v) for v in (
+        channel.id, channel.post_count, channel.follower_count, updated_at.isoformat(), *extra,
+    ))
+    return hashlib.blake2b(raw.encode(), digest_size=12).hexdigest(), updated_at
+
+
+def csrf_epoch() -> Optional[int]:
+    """
+    Changes every half WTF_CSRF_TIME_LIMIT. Pages with forms mix it into their
+    etag so a revalidated copy never carries a CSRF token about to expire.
+    """
+    limit = current_app.config.get("WTF_CSRF_TIME_LIMIT", 3600)
+    if not current_app.config.get("WTF_CSRF_ENABLED", True) or not limit:
+        return None
+    return int(time.time() // (limit / 2))
+
+
+def cacheable() -> bool:
+    """
+    Validators only make sense for plain reads that won't show flashed
+    messages. Check before rendering: rendering consumes the flashes.
+    """
+    return request.method in ("GET", "HEAD") and "_flashes" not in session
+
+
+def not_modified(etag: str, last_modified: datetime, *, private: bool = False) -> Optional[Response]:
+    """A 304 if the request's If-None-Match / If-Modified-Since still match."""
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return add_validators(current_app.response_class(status=304), etag, last_modified, private=private)
+
+
+def add_validators(response: Response, etag: str, last_modified: datetime, *, private: bool = False) -> Response:
+    """
+    Attach ETag/Last-Modified. Clients and proxies may keep the response but
+    must revalidate each use; per-user pages are weak, private and vary on the
+    session cookie.
+    """
+    response.set_etag(etag, weak=private)
+    response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    if private:
+        response.cache_control.private = True
+        response.vary.add("Cookie")
+    else:
+        response.cache_control.public = True
+    return response
@@ -0,0 +1,331 @@
+# tipple/ingest.py
+from __future__ import annotations
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from typing import Any, Callable, Iterable, Iterator, Optional, TextIO
+
+import sqlalchemy as sa
+
+from .models import db, Channel, Post, User, normalize_channel_name, parse_tags, _write_post_tags
+from .feed import fan_out_many
+from .live import LiveEvent, posts_added
+
+# Bulk post import, shared by `flask tipple import-posts` and
+# POST /posts/api/bulk. Records are dicts:
+#
+#   {"channel_id": 3 | "channel": "beer", "body": "...",
+#    "tags": "a, b" | ["a", "b"], "created_at": "2024-05-01T12:00:00Z",
+#    "author": "alice"}          # author: CLI only; the API posts as you
+#
+# Input is consumed as a stream and written in batches, one Core
+# executemany INSERT and one transaction per batch. After each commit every
+# record up to `ImportResult.read` is settled (inserted or rejected), so a
+# failed import resumes by skipping that many records.
+
+
+class RecordError(ValueError):
+    """A record that can't be imported."""
+
+
+@dataclass
+class ImportResult:
+    read: int = 0                 # records settled so far (the resume position)
+    inserted: int = 0
+    rejected: int = 0
+    errors: list[dict[str, Any]] = field(default_factory=list)
+    seconds: float = 0.0
+    complete: bool = False        # False: stopped early; resume from `read`
+
+    @property
+    def posts_per_second(self) -> float:
+        return self.inserted / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "read": self.read,
+            "inserted": self.inserted,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 3),
+            "posts_per_second": round(self.posts_per_second, 1),
+            "complete": self.complete,
+        }
+
+
+class _Unparseable:
+    """Stands in for a record the reader couldn't decode, so positions stay aligned."""
+
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+
+def iter_ndjson(lines: Iterable[str | bytes]) -> Iterator[Any]:
+    """One record per non-blank line (bytes lines are decoded as UTF-8)."""
+    for line in lines:
+        if isinstance(line, bytes):
+            try:
+                line = line.decode("utf-8")
+            except UnicodeDecodeError as e:
+                yield _Unparseable(f"invalid UTF-8: {e.reason}")
+                continue
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield _Unparseable(f"invalid JSON: {e}")
+
+
+# Longest single array element iter_json_array will buffer (a post record
+# is well under 1 KiB)
+MAX_JSON_ELEMENT_CHARS = 1 << 20
+
+
+def _cut_off(err: json.JSONDecodeError, buf: str) -> bool:
+    """Did decoding fail only because `buf` stops mid-element?"""
+    # Unclosed string, or a partial literal/number/\uXXXX escape right at the end
+    return err.msg.startswith("Unterminated string") or err.pos >= len(buf) - 6
+
+
+def iter_json_array(stream: TextIO, chunk_size: int = 65536) -> Iterator[Any]:
+    """Records of a top-level JSON array, decoded incrementally."""
+    def read() -> str:
+        try:
+            return stream.read(chunk_size)
+        except UnicodeDecodeError as e:
+            raise RecordError(f"invalid UTF-8: {e.reason}") from None
+
+    decoder = json.JSONDecoder()
+    buf, pos, started = "", 0, False
+    eof = False
+    while True:
+        # Skip whitespace and separators between elements
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            chunk = read()
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+        if pos >= len(buf):
+            if started:
+                raise RecordError("unterminated JSON array")
+            return
+        if not started:
+            if buf[pos] != "[":
+                raise RecordError("expected a JSON array")
+            started, pos = True, pos + 1
+            continue
+        if buf[pos] == "]":
+            return
+        try:
+            record, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError as e:
+            # Only read on for an element cut off by the chunk boundary; a
+            # broken one fails now rather than after buffering the rest
+            if eof or not _cut_off(e, buf):
+                raise RecordError(f"malformed JSON array: {e.msg}") from None
+            if len(buf) - pos > MAX_JSON_ELEMENT_CHARS:
+                raise RecordError("JSON array element too large") from None
+            chunk = read()
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+        # A number at the end of the buffer may be cut off ("12" of "123")
+        if end == len(buf) and not eof:
+            chunk = read()
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+        yield record
+        pos = end
+
+
+class PostImporter:
+    """
+    Validates records and writes them in batches. Channel and author lookups
+    are cached for the importer's lifetime.
+
+    default_user_id: author for records without "author" (and for every
+        record when allow_author is False).
+    strict: stop at the first bad record (dropping the rest of its batch)
+        instead of skipping it.
+    on_commit: called with the running ImportResult after each batch.
+    """
+
+    def __init__(
+        self,
+        *,
+        default_user_id: Optional[int] = None,
+        allow_author: bool = False,
+        batch_size: int = 1000,
+        strict: bool = False,
+        max_errors: int = 100,
+        on_commit: Optional[Callable[[ImportResult], None]] = None,
+    ) -> None:
+        self.default_user_id = default_user_id
+        self.allow_author = allow_author
+        self.batch_size = batch_size
+        self.strict = strict
+        self.max_errors = max_errors
+        self.on_commit = on_commit
+        self._channels: dict[Any, Optional[int]] = {}
+        self._authors: dict[str, Optional[int]] = {}
+
+    def run(self, records: Iterable[Any], skip: int = 0) -> ImportResult:
+        """Import `records`, ignoring the first `skip` (already imported)."""
+        result = ImportResult(read=skip)
+        started = time.perf_counter()
+        batch: list[dict[str, Any]] = []
+        pending_rejects: list[dict[str, Any]] = []
+        position = 0
+        try:
+            for position, record in enumerate(records, 1):
+                if position <= skip:
+                    continue
+                try:
+                    batch.append(self._row(record))
+                except RecordError as e:
+                    if self.strict:
+                        # Drop the uncommitted part of the batch too, so
+                        # `read` stays an exact resume point
+                        result.errors.append({"record": position, "error": str(e)})
+                        return result
+                    pending_rejects.append({"record": position, "error": str(e)})
+                if len(batch) >= self.batch_size:
+                    self._commit(batch, pending_rejects, position, result, started)
+                    batch, pending_rejects = [], []
+            result.complete = True
+        except RecordError as e:
+            # The reader gave up (e.g. truncated JSON array); keep what arrived
+            result.errors.append({"record": position + 1, "error": str(e)})
+        finally:
+            result.seconds = time.perf_counter() - started
+        if batch or pending_rejects:
+            self._commit(batch, pending_rejects, position, result, started)
+        return result
+
+    def _commit(self, batch, rejects, position, result: ImportResult, started: float) -> None:
+        if batch:
+            insert_posts(db.session.connection(), batch)
+        db.session.commit()
+        result.read = position
+        result.inserted += len(batch)
+        result.rejected += len(rejects)
+        room = self.max_errors - len(result.errors)
+        result.errors.extend(rejects[:max(room, 0)])
+        result.seconds = time.perf_counter() - started
+        if self.on_commit:
+            self.on_commit(result)
+
+    # --- validation ---
+
+    def _row(self, record: Any) -> dict[str, Any]:
+        if isinstance(record, _Unparseable):
+            raise RecordError(record.message)
+        if not isinstance(record, dict):
+            raise RecordError("record must be a JSON object")
+
+        body = record.get("body")
+        if not isinstance(body, str) or not body.strip():
+            raise RecordError("body is required")
+        body = body.strip()
+        if len(body) > 255:
+            raise RecordError("body must be <= 255 chars")
+
+        raw_tags = record.get("tags")
+        if isinstance(raw_tags, list) and all(isinstance(t, str) for t in raw_tags):
+            raw_tags = ",".join(raw_tags)
+        elif raw_tags is not None and not isinstance(raw_tags, str):
+            raise RecordError("tags must be a string or a list of strings")
+        tags = ", ".join(parse_tags(raw_tags)) or None
+        if tags and len(tags) > 255:
+            raise RecordError("tags must be <= 255 chars")
+
+        created_at = datetime.now(UTC)
+        if record.get("created_at") is not None:
+            try:
+                created_at = datetime.fromisoformat(str(record["created_at"]).replace("Z", "+00:00"))
+            except ValueError:
+                raise RecordError("created_at must be an ISO 8601 timestamp") from None
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=UTC)
+            created_at = created_at.astimezone(UTC)
+
+        return {
+            "user_id": self._author_id(record.get("author")),
+            "channel_id": self._channel_id(record),
+            "body": body,
+            "tags": tags,
+            "created_at": created_at,
+        }
+
+    def _channel_id(self, record: dict[str, Any]) -> int:
+        if record.get("channel_id") is not None:
+            key: Any = record["channel_id"]
+            if not isinstance(key, int) or isinstance(key, bool):
+                raise RecordError("channel_id must be an integer")
+            if key not in self._channels:
+                self._channels[key] = db.session.scalar(sa.select(Channel.id).where(Channel.id == key))
+        elif isinstance(record.get("channel"), str):
+            key = normalize_channel_name(record["channel"])
+            if key not in self._channels:
+                self._channels[key] = db.session.scalar(sa.select(Channel.id).where(Channel.name_key == key))
+        else:
+            raise RecordError("channel_id or channel is required")
+        cid = self._channels[key]
+        if cid is None:
+            raise RecordError(f"channel {key!r} not found")
+        return cid
+
+    def _author_id(self, author: Any) -> int:
+        if author is None or not self.allow_author:
+            if self.default_user_id is None:
+                raise RecordError("author is required")
+            return self.default_user_id
+        if not isinstance(author, str):
+            raise RecordError("author must be a username")
+        key = author.strip().lower()
+        if key not in self._authors:
+            self._authors[key] = db.session.scalar(sa.select(User.id).where(User.username_key == key))
+        uid = self._authors[key]
+        if uid is None:
+            raise RecordError(f"author {author!r} not found")
+        return uid
+
+
+def insert_posts(conn: sa.Connection, rows: list[dict[str, Any]]) -> list[int]:
+    """
+    Insert validated post rows in one batched INSERT and do, set-based, what the
+    per-post ORM hooks would have done: channel post counts, the tag index and
+    home-feed inboxes (the full-text index is kept by triggers) and live
+    stream events. `conn` is db.session's connection. Returns the new post ids.
+    """
+    posts = Post.__table__
+    # Multi-row INSERT ... RETURNING (SQLAlchemy's "insertmanyvalues"). Row
+    # order isn't needed since RETURNING carries everything used below, and
+    # asking for it would make SQLite fall back to one INSERT per row.
+    inserted = conn.execute(
+        sa.insert(posts).returning(posts.c.id, posts.c.channel_id, posts.c.created_at, posts.c.tags),
+        rows,
+    ).tuples().all()
+
+    channels = Channel.__table__
+    per_channel = Counter(cid for _, cid, _, _ in inserted)
+    conn.execute(
+        sa.update(channels)
+        .where(channels.c.id == sa.bindparam("cid"))
+        .values(post_count=channels.c.post_count + sa.bindparam("n")),
+        [{"cid": cid, "n": n} for cid, n in per_channel.items()],
+    )
+    _write_post_tags(conn, [row for row in inserted if row[3]])
+    ids = [pid for pid, *_ in inserted]
+    fan_out_many(conn, ids)
+    # Streams read the posts themselves: the newest per channel wakes them
+    newest = {cid: pid for pid, cid, _, _ in sorted(inserted)}
+    posts_added(db.session, [LiveEvent(pid, cid) for cid, pid in newest.items()])
+    return ids
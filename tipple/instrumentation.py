@@ -0,0 +1,177 @@
+# tipple/instrumentation.py
+from __future__ import annotations
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Any, Optional
+
+import sqlalchemy as sa
+from flask import Flask, g, has_request_context, request, template_rendered, before_render_template
+
+from .models import db
+
+# Per-request SQL instrumentation: every statement run while handling a
+# request is counted and timed (cursor events on each engine), as is template
+# rendering (Flask's render signals). The totals go out as a Server-Timing
+# header when SERVER_TIMING is on, and statements slower than SLOW_QUERY_MS
+# are sampled into a JSON-lines log in the instance folder, with a
+# fingerprint to group them and SQLite's query plan for SELECTs.
+
+
+@dataclass
+class RequestStats:
+    started: float
+    queries: int = 0
+    db_seconds: float = 0.0
+    render_seconds: float = 0.0
+    # Set to a list to record every statement (see tipple.profiler)
+    sql_trace: Optional[list[dict[str, Any]]] = None
+    _render_depth: int = 0
+    _render_started: float = 0.0
+
+    def server_timing(self) -> str:
+        total = time.perf_counter() - self.started
+        return ", ".join([
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.queries} queries"',
+            f"render;dur={self.render_seconds * 1000:.2f}",
+            f"total;dur={total * 1000:.2f}",
+        ])
+
+
+def request_stats() -> Optional[RequestStats]:
+    """This request's counters (None outside a request)."""
+    return g.get("_sql_stats") if has_request_context() else None
+
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*")
+
+
+def fingerprint(statement: str) -> tuple[str, str]:
+    """
+    (normalized statement, short hash). Literals become ?, placeholder lists
+    (IN lists, multi-row VALUES) collapse to (...), whitespace is squeezed,
+    so the same query shape always gets the same fingerprint.
+    """
+    normalized = _LITERALS.sub("?", statement)
+    normalized = _PLACEHOLDER_LISTS.sub("(...)", normalized)
+    normalized = " ".join(normalized.split())
+    return normalized, hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+class SlowQueryLog:
+    """Appends one JSON object per slow statement to `path`."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, entry: dict[str, Any]) -> None:
+        line = json.dumps(entry, default=str) + "\n"
+        with self._lock, self.path.open("a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def _slow_query_log(app: Flask) -> Optional[SlowQueryLog]:
+    name = app.config["SLOW_QUERY_LOG"]
+    if not name:
+        return None
+    path = Path(app.instance_path) / name
+    log = app.extensions.get("tipple.slow_query_log")
+    if log is None or log.path != path:
+        log = app.extensions["tipple.slow_query_log"] = SlowQueryLog(path)
+    return log
+
+
+def _query_plan(conn: sa.Connection, statement: str, parameters: Any) -> Optional[list[str]]:
+    if conn.dialect.name != "sqlite" or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    # Straight on the DB-API connection, so this doesn't come back through the events
+    cursor = conn.connection.dbapi_connection.cursor()  # pyright: ignore[reportOptionalMemberAccess]
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[3] for row in cursor.fetchall()]
+    except Exception:
+        return None
+    finally:
+        cursor.close()
+
+
+def init_instrumentation(app: Flask) -> None:
+    with app.app_context():
+        engines = list(db.engines.values())
+
+    # The start time lives on the statement's execution context, so a
+    # statement that raises (no after_cursor_execute) leaves nothing behind
+    def _before_cursor(conn, cursor, statement, parameters, context, executemany) -> None:
+        if context is not None and request_stats() is not None:
+            context._tipple_started = time.perf_counter()
+
+    def _after_cursor(conn, cursor, statement, parameters, context, executemany) -> None:
+        stats = request_stats()
+        started = getattr(context, "_tipple_started", None)
+        if stats is None or started is None:
+            return
+        elapsed = time.perf_counter() - started
+        stats.queries += 1
+        stats.db_seconds += elapsed
+        if stats.sql_trace is not None:
+            stats.sql_trace.append({"ms": round(elapsed * 1000, 3), "statement": statement,
+                                    "executemany": executemany})
+
+        threshold = app.config["SLOW_QUERY_MS"]
+        if threshold is None or elapsed * 1000 < threshold:
+            return
+        if random.random() >= app.config["SLOW_QUERY_SAMPLE_RATE"]:
+            return
+        log = _slow_query_log(app)
+        if log is None:
+            return
+        normalized, fp = fingerprint(statement)
+        log.write({
+            "at": datetime.now(UTC).isoformat(),
+            "ms": round(elapsed * 1000, 3),
+            "fingerprint": fp,
+            "statement": normalized,
+            "endpoint": request.endpoint,
+            "path": request.path,
+            "plan": None if executemany else _query_plan(conn, statement, parameters),
+        })
+
+    for engine in engines:
+        sa.event.listen(engine, "before_cursor_execute", _before_cursor)
+        sa.event.listen(engine, "after_cursor_execute", _after_cursor)
+
+    @app.before_request
+    def _start_stats() -> None:
+        g._sql_stats = RequestStats(started=time.perf_counter())
+
+    @app.after_request
+    def _server_timing(response):
+        stats = request_stats()
+        if stats is not None and app.config["SERVER_TIMING"]:
+            response.headers["Server-Timing"] = stats.server_timing()
+        return response
+
+    def _render_started(sender, template, context, **extra) -> None:
+        stats = request_stats()
+        if stats is not None:
+            if stats._render_depth == 0:
+                stats._render_started = time.perf_counter()
+            stats._render_depth += 1
+
+    def _render_finished(sender, template, context, **extra) -> None:
+        stats = request_stats()
+        if stats is not None and stats._render_depth:
+            stats._render_depth -= 1
+            if stats._render_depth == 0:
+                stats.render_seconds += time.perf_counter() - stats._render_started
+
+    before_render_template.connect(_render_started, app, weak=False)
+    template_rendered.connect(_render_finished, app, weak=False)
@@ -0,0 +1,326 @@
+# tipple/live.py
+from __future__ import annotations
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+import sqlalchemy as sa
+from flask import Flask, Response, current_app, has_app_context, stream_with_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from werkzeug.utils import import_string
+
+from .models import db, Post
+
+_EXT_KEY = "tipple.live"
+
+# Live timelines over Server-Sent Events. Committed posts are published to a
+# broker from an after_commit hook; each open stream holds a subscription
+# (a bounded queue) for its channels and writes new posts as cached
+# fragments (tipple.fragments). Events only wake a stream up: it then reads
+# every post after the last one it sent from the posts table, so posts that
+# never raised an event (written through Core) still get through. Event ids
+# are post ids, so a reconnecting EventSource's Last-Event-ID is replayed
+# the same way, and a subscriber that falls behind (queue full) just drops
+# its queue instead of blocking publishers. More missed posts than
+# LIVE_REPLAY_LIMIT: the client gets a "reset" event and should reload.
+#
+# LIVE_BROKER "local" fans out inside one process. "sqlite" appends events
+# to a small SQLite file that every worker polls: a stand-in for Redis
+# pub/sub or LISTEN/NOTIFY when running several workers on one host.
+
+
+@dataclass(frozen=True)
+class LiveEvent:
+    post_id: int
+    channel_id: int
+
+
+class BrokerFull(Exception):
+    """LIVE_MAX_SUBSCRIBERS streams are already open in this worker."""
+
+
+class Subscription:
+    """Events for a set of channels (None: all), queued until the stream takes them."""
+
+    def __init__(self, channel_ids: Optional[frozenset[int]], max_queued: int) -> None:
+        self.channel_ids = channel_ids
+        self.max_queued = max_queued
+        self.overflowed = False
+        self._queue: deque[LiveEvent] = deque()
+        self._cond = threading.Condition()
+
+    def wants(self, ev: LiveEvent) -> bool:
+        return self.channel_ids is None or ev.channel_id in self.channel_ids
+
+    def put(self, ev: LiveEvent) -> bool:
+        """Queue `ev`; False if the queue was full and got dropped instead."""
+        with self._cond:
+            self._cond.notify()
+            if len(self._queue) < self.max_queued:
+                self._queue.append(ev)
+                return True
+            # Too slow: drop the backlog, the stream re-reads it from the db
+            self._queue.clear()
+            self.overflowed = True
+            return False
+
+    def get(self, timeout: float) -> tuple[list[LiveEvent], bool]:
+        """Queued events (waiting up to `timeout`), and whether some were dropped."""
+        with self._cond:
+            if not self._queue and not self.overflowed:
+                self._cond.wait(timeout)
+            events, overflowed = list(self._queue), self.overflowed
+            self._queue.clear()
+            self.overflowed = False
+        return events, overflowed
+
+
+class LocalBroker:
+    """Fans events out to subscriptions in this process."""
+
+    def __init__(self, max_subscribers: int = 100, max_queued: int = 100) -> None:
+        self.max_subscribers = max_subscribers
+        self.max_queued = max_queued
+        self._lock = threading.Lock()
+        self._subs: set[Subscription] = set()
+        self.published = 0
+        self.overflows = 0
+
+    @classmethod
+    def for_app(cls, app: Flask) -> "LocalBroker":
+        return cls(app.config["LIVE_MAX_SUBSCRIBERS"], app.config["LIVE_QUEUE_SIZE"])
+
+    def subscribe(self, channel_ids: Optional[Iterable[int]]) -> Subscription:
+        sub = Subscription(frozenset(channel_ids) if channel_ids is not None else None, self.max_queued)
+        with self._lock:
+            if len(self._subs) >= self.max_subscribers:
+                raise BrokerFull()
+            self._subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subs.discard(sub)
+
+    def publish(self, events: list[LiveEvent]) -> None:
+        self._deliver(events)
+
+    def _deliver(self, events: list[LiveEvent]) -> None:
+        with self._lock:
+            subs = list(self._subs)
+            self.published += len(events)
+        for sub in subs:
+            for ev in events:
+                if sub.wants(ev) and not sub.put(ev):
+                    self.overflows += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"subscribers": len(self._subs), "published": self.published, "overflows": self.overflows}
+
+
+class SQLiteBroker(LocalBroker):
+    """
+    Cross-process broker: publish appends to live_events in a SQLite file,
+    and one thread per process polls it for new rows and delivers them
+    locally (its own events included, so every worker sees the same order).
+    Rows older than `retention` seconds are pruned by publishers.
+    """
+
+    def __init__(self, path: Path, poll_interval: float = 0.25, retention: float = 300.0,
+                 max_subscribers: int = 100, max_queued: int = 100) -> None:
+        super().__init__(max_subscribers, max_queued)
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._local = threading.local()
+        self._poller: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_prune = 0.0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS live_events (seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " post_id INTEGER NOT NULL, channel_id INTEGER NOT NULL, at REAL NOT NULL)"
+            )
+
+    @classmethod
+    def for_app(cls, app: Flask) -> "SQLiteBroker":
+        path = Path(app.instance_path) / app.config["LIVE_BROKER_PATH"]
+        return cls(path, app.config["LIVE_POLL_INTERVAL"], app.config["LIVE_MAX_STREAM_SECONDS"],
+                   app.config["LIVE_MAX_SUBSCRIBERS"], app.config["LIVE_QUEUE_SIZE"])
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def publish(self, events: list[LiveEvent]) -> None:
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("INSERT INTO live_events (post_id, channel_id, at) VALUES (?, ?, ?)",
+                             [(ev.post_id, ev.channel_id, now) for ev in events])
+            if now - self._last_prune > self.retention / 10:
+                self._last_prune = now
+                conn.execute("DELETE FROM live_events WHERE at < ?", (now - self.retention,))
+
+    def subscribe(self, channel_ids: Optional[Iterable[int]]) -> Subscription:
+        sub = super().subscribe(channel_ids)
+        with self._lock:
+            if self._poller is None:
+                last = self._connect().execute("SELECT coalesce(max(seq), 0) FROM live_events").fetchone()[0]
+                self._poller = threading.Thread(target=self._poll, args=(last,), name="tipple-live", daemon=True)
+                self._poller.start()
+        return sub
+
+    def _poll(self, last: int) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                rows = self._connect().execute(
+                    "SELECT seq, post_id, channel_id FROM live_events WHERE seq > ? ORDER BY seq", (last,)
+                ).fetchall()
+            except sqlite3.OperationalError:
+                continue                             # locked: next round
+            if rows:
+                last = rows[-1][0]
+                self._deliver([LiveEvent(post_id, channel_id) for _, post_id, channel_id in rows])
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._poller is not None:
+            self._poller.join()
+
+
+_BACKENDS = {"local": LocalBroker, "sqlite": SQLiteBroker}
+_init_lock = threading.Lock()
+
+
+def live_broker(app: Optional[Flask] = None) -> LocalBroker:
+    app = app or current_app._get_current_object()  # pyright: ignore[reportAttributeAccessIssue]
+    broker = app.extensions.get(_EXT_KEY)
+    if broker is None:
+        with _init_lock:
+            broker = app.extensions.get(_EXT_KEY)
+            if broker is None:
+                spec = app.config["LIVE_BROKER"]
+                factory = _BACKENDS.get(spec) or import_string(spec)
+                broker = app.extensions[_EXT_KEY] = factory.for_app(app)
+    return broker
+
+
+def _sse(event: str, data: str = "", id: Optional[int] = None) -> str:
+    lines = [f"id: {id}"] if id is not None else []
+    lines.append(f"event: {event}")
+    lines += [f"data: {line}" for line in data.splitlines() or [""]]
+    return "\n".join(lines) + "\n\n"
+
+
+def _missed(channel_ids: Optional[frozenset[int]], after: int, limit: int) -> list[Post]:
+    query = Post.timeline().filter(Post.id > after)
+    if channel_ids is not None:
+        query = query.filter(Post.channel_id.in_(channel_ids))
+    return query.order_by(Post.id).limit(limit + 1).all()
+
+
+def stream_posts(channel_ids: Optional[Iterable[int]], show_channel: bool, after: Optional[int]) -> Response:
+    """
+    The text/event-stream response for new posts in `channel_ids`, starting
+    after post id `after` (Last-Event-ID) or from now. Raises BrokerFull.
+    """
+    from .fragments import render_post_items
+    from .routing import use_primary
+
+    config = current_app.config
+    broker = live_broker()
+    sub = broker.subscribe(channel_ids)
+    channels = sub.channel_ids
+    limit = config["LIVE_REPLAY_LIMIT"]
+    heartbeat = config["LIVE_HEARTBEAT_SECONDS"]
+    deadline = time.monotonic() + config["LIVE_MAX_STREAM_SECONDS"]
+
+    def render(posts: list[Post]) -> Iterator[str]:
+        for p in posts:
+            yield _sse("post", render_post_items([p], show_channel), id=p.id)
+
+    # Subscribed before reading where to start, so nothing falls in between
+    start = after
+    if start is None:
+        try:
+            with use_primary():
+                start = db.session.scalar(sa.select(sa.func.max(Post.id))) or 0
+        except BaseException:
+            broker.unsubscribe(sub)
+            raise
+
+    def generate() -> Iterator[str]:
+        yield f"retry: {config['LIVE_RETRY_MS']}\n\n"
+        last = start
+        behind = after is not None
+        while time.monotonic() < deadline:
+            if behind:
+                with use_primary():
+                    posts = _missed(channels, last, limit)
+                    if len(posts) > limit:
+                        yield _sse("reset")
+                        return
+                    last = posts[-1].id if posts else last
+                    yield from render(posts)
+                db.session.close()
+
+            events, overflowed = sub.get(timeout=min(heartbeat, max(0.0, deadline - time.monotonic())))
+            behind = overflowed or any(ev.post_id > last for ev in events)
+            if not behind:
+                yield ": keepalive\n\n"
+
+    response = Response(stream_with_context(generate()), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"     # nginx: don't buffer the stream
+    response.call_on_close(lambda: broker.unsubscribe(sub))
+    return response
+
+
+def last_event_id(request) -> Optional[int]:
+    """Last-Event-ID (sent by a reconnecting EventSource) or ?after=."""
+    raw = request.headers.get("Last-Event-ID") or request.args.get("after")
+    try:
+        return int(raw) if raw is not None else None
+    except ValueError:
+        return None
+
+
+# Publish committed posts. Collected per session at flush time (or by
+# posts_added, for Core inserts) and sent once the transaction commits; a
+# rollback forgets them.
+
+def posts_added(session: Session, events: Iterable[LiveEvent]) -> None:
+    """Publish `events` when `session` commits."""
+    session.info.setdefault("tipple.posts_added", []).extend(events)
+
+
+@event.listens_for(Post, "after_insert")
+def _post_added(mapper, connection, target: Post) -> None:
+    session = Session.object_session(target)
+    if session is not None:
+        posts_added(session, [LiveEvent(target.id, target.channel_id)])
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session) -> None:
+    events = session.info.pop("tipple.posts_added", None)
+    if events and has_app_context() and current_app.config["LIVE_ENABLED"]:
+        live_broker().publish(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session) -> None:
+    session.info.pop("tipple.posts_added", None)
@@ -0,0 +1,246 @@
+# tipple/metrics.py
+from __future__ import annotations
+import bisect
+import hmac
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+from flask import Flask, Response, abort, current_app, has_app_context, request
+
+from .instrumentation import request_stats
+
+_EXT_KEY = "tipple.metrics"
+
+# In-process metrics served at /metrics in Prometheus' text format
+# (METRICS_ENABLED). Each worker keeps its own counters and histograms; with
+# METRICS_MULTIPROC_DIR set, workers also dump them to <dir>/<pid>.json every
+# METRICS_FLUSH_SECONDS, and a scrape (whichever worker gets it) adds up every
+# file in the directory. Empty the directory when the server (re)starts.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Registry:
+    """
+    Counters and histograms keyed by (name, labels). Updates take one short
+    lock; bucket lookup happens outside it. `collectors` are called at
+    snapshot time for values kept elsewhere (cache hit counts).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._meta: dict[str, tuple[str, str, tuple[float, ...]]] = {}
+        self._counters: dict[tuple[str, Labels], float] = {}
+        self._histograms: dict[tuple[str, Labels], list] = {}
+        self.collectors: list[Callable[[], Iterable[tuple[str, Labels, float]]]] = []
+
+    def counter(self, name: str, help: str) -> None:
+        self._meta[name] = ("counter", help, ())
+
+    def histogram(self, name: str, help: str, buckets: tuple[float, ...]) -> None:
+        self._meta[name] = ("histogram", help, tuple(buckets))
+
+    def inc(self, name: str, labels: Labels = (), value: float = 1.0) -> None:
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        buckets = self._meta[name][2]
+        i = bisect.bisect_left(buckets, value)      # le= is inclusive
+        key = (name, labels)
+        with self._lock:
+            h = self._histograms.get(key)
+            if h is None:
+                h = self._histograms[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            h[0][i] += 1
+            h[1] += value
+            h[2] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """Plain data (JSON-safe) for merging and rendering."""
+        with self._lock:
+            counters = [[name, list(map(list, labels)), v] for (name, labels), v in self._counters.items()]
+            histograms = [
+                [name, list(map(list, labels)), list(h[0]), h[1], h[2]]
+                for (name, labels), h in self._histograms.items()
+            ]
+        for collect in self.collectors:
+            counters += [[name, list(map(list, labels)), v] for name, labels, v in collect()]
+        return {"counters": counters, "histograms": histograms}
+
+    def render(self, snapshots: list[dict[str, Any]]) -> str:
+        """Prometheus text exposition of the sum of `snapshots`."""
+        counters: dict[tuple[str, Labels], float] = {}
+        histograms: dict[tuple[str, Labels], list] = {}
+        for snap in snapshots:
+            for name, labels, v in snap["counters"]:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0.0) + v
+            for name, labels, buckets, total, count in snap["histograms"]:
+                key = (name, tuple(map(tuple, labels)))
+                h = histograms.setdefault(key, [[0] * len(buckets), 0.0, 0])
+                if len(h[0]) != len(buckets):
+                    continue                         # buckets changed between releases
+                h[0] = [a + b for a, b in zip(h[0], buckets)]
+                h[1] += total
+                h[2] += count
+
+        lines: list[str] = []
+        for name, (kind, help, bounds) in sorted(self._meta.items()):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for (n, labels), v in sorted(counters.items()):
+                    if n == name:
+                        lines.append(f"{name}{_labels(labels)} {_number(v)}")
+                continue
+            for (n, labels), (buckets, total, count) in sorted(histograms.items()):
+                if n != name:
+                    continue
+                running = 0
+                for le, c in zip((*bounds, math.inf), buckets):
+                    running += c
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', _number(le)),))} {running}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+
+        # Derived: hit ratio per cache, from the summed hit/miss counters
+        lookups: dict[str, list[float]] = {}
+        for (n, labels), v in counters.items():
+            if n in ("tipple_cache_hits_total", "tipple_cache_misses_total"):
+                entry = lookups.setdefault(dict(labels)["cache"], [0.0, 0.0])
+                entry[n == "tipple_cache_misses_total"] += v
+        if lookups:
+            lines.append("# HELP tipple_cache_hit_ratio Hits / lookups since start, all workers.")
+            lines.append("# TYPE tipple_cache_hit_ratio gauge")
+            for cache, (hits, misses) in sorted(lookups.items()):
+                ratio = hits / (hits + misses) if hits + misses else 0.0
+                lines.append(f"tipple_cache_hit_ratio{_labels((('cache', cache),))} {_number(ratio)}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escape = lambda v: v.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+    return "{" + ",".join(f'{k}="{escape(str(v))}"' for k, v in labels) + "}"
+
+
+def _number(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    return repr(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+class SharedDirectory:
+    """Per-process snapshot files in a directory shared by all workers."""
+
+    def __init__(self, path: Path, ident: Optional[str] = None) -> None:
+        self.path = path
+        self.ident = ident or str(os.getpid())
+        self._last_flush = 0.0
+
+    def flush(self, registry: Registry) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp = self.path / f".{self.ident}.json.tmp"
+        tmp.write_text(json.dumps(registry.snapshot()))
+        os.replace(tmp, self.path / f"{self.ident}.json")
+        self._last_flush = time.monotonic()
+
+    def maybe_flush(self, registry: Registry, interval: float) -> None:
+        if time.monotonic() - self._last_flush >= interval:
+            self.flush(registry)
+
+    def snapshots(self) -> list[dict[str, Any]]:
+        snaps = []
+        for f in sorted(self.path.glob("*.json")):
+            try:
+                snaps.append(json.loads(f.read_text()))
+            except (OSError, ValueError):
+                continue                             # half-written or gone: next scrape
+        return snaps
+
+
+def metrics_registry(app: Flask) -> Registry:
+    return app.extensions[_EXT_KEY]
+
+
+def observe_password_hash(op: str, seconds: float) -> None:
+    """Called by tipple.auth.passwords around each hash/verify."""
+    if has_app_context() and current_app.config["METRICS_ENABLED"] and _EXT_KEY in current_app.extensions:
+        current_app.extensions[_EXT_KEY].observe("tipple_password_hash_seconds", (("op", op),), seconds)
+
+
+def _cache_counters(app: Flask) -> Iterable[tuple[str, Labels, float]]:
+    from .auth.session_user import _EXT_KEY as SESSION_USERS
+    from .fragments import _EXT_KEY as FRAGMENTS
+    for name, key in (("fragments", FRAGMENTS), ("session_users", SESSION_USERS)):
+        cache = app.extensions.get(key)
+        if cache is not None:
+            stats = cache.stats()
+            yield "tipple_cache_hits_total", (("cache", name),), stats["hits"]
+            yield "tipple_cache_misses_total", (("cache", name),), stats["misses"]
+
+
+def init_metrics(app: Flask) -> None:
+    registry = app.extensions[_EXT_KEY] = Registry()
+    registry.counter("tipple_http_requests_total", "Requests by endpoint, method and status.")
+    registry.histogram("tipple_http_request_duration_seconds", "Request latency by endpoint.", LATENCY_BUCKETS)
+    registry.histogram("tipple_db_queries_per_request", "SQL statements per request by endpoint.", QUERY_BUCKETS)
+    registry.counter("tipple_db_seconds_total", "Time spent in SQL by endpoint.")
+    registry.histogram("tipple_password_hash_seconds", "Password hash/verify time, queueing included.", HASH_BUCKETS)
+    registry.counter("tipple_cache_hits_total", "Cache hits by cache.")
+    registry.counter("tipple_cache_misses_total", "Cache misses by cache.")
+    registry.collectors.append(lambda: _cache_counters(app))
+
+    shared: dict[str, SharedDirectory] = {}
+
+    def _shared_dir() -> Optional[SharedDirectory]:
+        path = app.config["METRICS_MULTIPROC_DIR"]
+        if not path:
+            return None
+        if path not in shared:
+            shared[path] = SharedDirectory(Path(path))
+        return shared[path]
+
+    @app.after_request
+    def _record_request(response):
+        stats = request_stats()
+        if not app.config["METRICS_ENABLED"] or stats is None or request.endpoint == "metrics":
+            return response
+        endpoint = request.endpoint or "<unmatched>"
+        blueprint = request.blueprint or ""
+        where = (("blueprint", blueprint), ("endpoint", endpoint))
+        registry.inc("tipple_http_requests_total",
+                     where + (("method", request.method), ("status", str(response.status_code))))
+        registry.observe("tipple_http_request_duration_seconds", where, time.perf_counter() - stats.started)
+        registry.observe("tipple_db_queries_per_request", where, stats.queries)
+        registry.inc("tipple_db_seconds_total", where, stats.db_seconds)
+        if (directory := _shared_dir()) is not None:
+            directory.maybe_flush(registry, app.config["METRICS_FLUSH_SECONDS"])
+        return response
+
+    @app.get("/metrics")
+    def metrics():
+        if not app.config["METRICS_ENABLED"]:
+            abort(404)
+        token = app.config["METRICS_TOKEN"]
+        given = request.headers.get("Authorization", "").encode()   # bytes: non-ASCII can't raise
+        if token and not hmac.compare_digest(given, f"Bearer {token}".encode()):
+            abort(401)
+        if (directory := _shared_dir()) is not None:
+            directory.flush(registry)
+            snapshots = directory.snapshots()
+        else:
+            snapshots = [registry.snapshot()]
+        return Response(registry.render(snapshots), mimetype="text/plain; version=0.0.4")
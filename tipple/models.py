@@ -1,42 +1,108 @@
 # tipple/models.py
 from __future__ import annotations
+import contextlib
 from datetime import datetime, UTC
 from typing import Optional, List, Any, TYPE_CHECKING
 import uuid
 
 import sqlalchemy as sa
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import String, Integer, DateTime, ForeignKey, JSON
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Text
 from sqlalchemy import event
-from sqlalchemy.ext.mutable import MutableList
 from sqlalchemy.orm import (
     DeclarativeBase, MappedAsDataclass, Mapped, mapped_column, relationship,
-    Session, attributes
+    Session, attributes, joinedload, object_session, validates
 )
 from sqlalchemy.exc import IntegrityError
 
 from flask.signals import appcontext_pushed
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+
+from .routing import RoutingSession
 
 
 class Base(MappedAsDataclass, DeclarativeBase):
     pass
 
 
-db = SQLAlchemy(model_class=Base)
+# RoutingSession sends reads to a replica when one is configured (tipple.routing)
+db = SQLAlchemy(model_class=Base, session_options={"class_": RoutingSession})
+
+
+def _utcnow() -> datetime:
+    # Called per INSERT (a bare datetime.now(UTC) default is frozen at import)
+    return datetime.now(UTC)
 
 
-class User(UserMixin, db.Model):
+class FollowerMixin:
+    """
+    Follow primitives shared by User and the cached session principal
+    (tipple.auth.session_user.SessionUser). They go straight at
+    user_channel_follows and never materialise User.following, so their
+    cost doesn't grow with the number of follows. Needs only `self.id`.
+    """
+    if TYPE_CHECKING:
+        id: int
+
+    def is_following(self, channel_id: int) -> bool:
+        stmt = sa.select(sa.exists().where(
+            user_channel_follows.c.user_id == self.id,
+            user_channel_follows.c.channel_id == channel_id,
+        ))
+        return bool(db.session.scalar(stmt))
+
+    def follow(self, channel_id: int) -> bool:
+        """Idempotent follow. Returns True if a new follow row was inserted."""
+        stmt = _insert_ignore(user_channel_follows).values(user_id=self.id, channel_id=channel_id)
+        inserted = db.session.execute(stmt).rowcount == 1  # pyright: ignore[reportAttributeAccessIssue]
+        if inserted:
+            from .feed import inbox_follow
+            conn = db.session.connection()
+            _bump_channel(conn, channel_id, follower_count=1)
+            following = _bump_user_following(conn, self.id, 1)
+            inbox_follow(conn, self.id, channel_id, following)
+        self._follows_changed()
+        return inserted
+
+    def unfollow(self, channel_id: int) -> bool:
+        """Idempotent unfollow. Returns True if a follow row was deleted."""
+        stmt = sa.delete(user_channel_follows).where(
+            user_channel_follows.c.user_id == self.id,
+            user_channel_follows.c.channel_id == channel_id,
+        )
+        deleted = db.session.execute(stmt).rowcount == 1  # pyright: ignore[reportAttributeAccessIssue]
+        if deleted:
+            from .feed import inbox_unfollow
+            conn = db.session.connection()
+            _bump_channel(conn, channel_id, follower_count=-1)
+            following = _bump_user_following(conn, self.id, -1)
+            inbox_unfollow(conn, self.id, channel_id, following)
+        self._follows_changed()
+        return deleted
+
+    def _follows_changed(self) -> None:
+        pass
+
+
+class User(FollowerMixin, UserMixin, db.Model):
     __tablename__ = "users"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, init=False)
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
     username: Mapped[str] = mapped_column(String(80), unique=True, index=True, nullable=False)
+    # username.lower(), kept in step by the validator below. Unique, so
+    # usernames are case-insensitively distinct and logins are one index probe.
+    username_key: Mapped[str] = mapped_column(String(80), unique=True, index=True,
+                                              nullable=False, init=False, repr=False)
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False, repr=False, init=False)
     bio: Mapped[Optional[str]] = mapped_column(String(256), default=None)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now(UTC),
+    created_at: Mapped[datetime] = mapped_column(DateTime, insert_default=_utcnow,
                                                 nullable=False, init=False)
+    # Denormalized len(following), kept in step by follow/unfollow. The home
+    # feed uses it to pick between fan-out-on-read and the inbox.
+    following_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0", init=False, repr=False,
+    )
 
     # IMPORTANT: list-based relationship + matching back_populates on Post.author
     posts: Mapped[List["Post"]] = relationship(
@@ -65,11 +131,55 @@ class User(UserMixin, db.Model):
             **kw: Any,
         ) -> None: ...
 
+    @validates("username")
+    def _sync_username_key(self, key: str, value: str) -> str:
+        self.username_key = (value or "").lower()
+        return value
+
+    @classmethod
+    def find_by_login(cls, identifier: str) -> Optional[User]:
+        """
+        Resolve an email-or-username in one query. Emails are stored lower-cased
+        and always contain "@", so a bare name only probes username_key.
+        """
+        ident = (identifier or "").strip().lower()
+        if not ident:
+            return None
+        stmt = sa.select(cls)
+        if "@" in ident:
+            # A username may contain "@", even someone else's email: the
+            # email owner wins, as it did before usernames could log in
+            stmt = stmt.where(sa.or_(cls.email == ident, cls.username_key == ident)).order_by(
+                sa.case((cls.email == ident, 0), else_=1)
+            )
+        else:
+            stmt = stmt.where(cls.username_key == ident)
+        return db.session.scalars(stmt.limit(1)).first()
+
+    # Hashing runs on the bounded pool in tipple.auth.passwords, with the
+    # method/cost from PASSWORD_HASH_METHOD.
     def set_password(self, password: str) -> None:
-        self.password_hash = generate_password_hash(password)
+        from .auth.passwords import hash_password
+        self.password_hash = hash_password(password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        from .auth.passwords import verify_password
+        return verify_password(self.password_hash, password)
+
+    def rehash_password_if_needed(self, password: str) -> bool:
+        """
+        Call after a successful check_password: re-hash with the current
+        parameters if the stored hash used older ones. Caller commits.
+        """
+        from .auth.passwords import password_hasher
+        if password_hasher().needs_rehash(self.password_hash):
+            self.set_password(password)
+            return True
+        return False
+
+    def _follows_changed(self) -> None:
+        # Keep a loaded .following collection from going stale
+        db.session.expire(self, ["following", "following_count"])
 
 
 class Post(db.Model):
@@ -80,7 +190,6 @@ class Post(db.Model):
     # IMPORTANT: correct FK target must match __tablename__ ("users.id")
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"), 
-        index=True, 
         nullable=False, 
         init=False,
     )
@@ -88,7 +197,6 @@ class Post(db.Model):
     # NEW: required channel FK (init=False so constructor doesn’t demand it)
     channel_id: Mapped[int] = mapped_column(
         ForeignKey("channels.id", ondelete="CASCADE"),
-        index=True,
         nullable=False,
         init=False,
     )
@@ -97,7 +205,7 @@ class Post(db.Model):
     
     body: Mapped[str] = mapped_column(String(255), nullable=False)
     tags: Mapped[Optional[str]] = mapped_column(String(255), default=None)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now(UTC),
+    created_at: Mapped[datetime] = mapped_column(DateTime, insert_default=_utcnow,
                                                 nullable=False, init=False)
 
     author: Mapped["User"] = relationship(back_populates="posts", init=False)
@@ -105,6 +213,22 @@ class Post(db.Model):
     def __repr__(self) -> str:  # pragma: no cover
         return f"<Post {self.id} user_id={self.user_id} channel_id={self.channel_id}>"
 
+    @classmethod
+    def timeline(cls, **filters: Any):
+        """
+        Base query for anything that renders a list of posts. The author is
+        joined into the same SELECT (username only) so templates touching
+        p.author.username don't fire one lazy load per author.
+        """
+        return cls.query.filter_by(**filters).options(
+            joinedload(cls.author).load_only(User.username)
+        )
+
+    @property
+    def tag_names(self) -> list[str]:
+        """Normalized tags, in the order they were written."""
+        return parse_tags(self.tags)
+
     if TYPE_CHECKING:
         def __init__(
             self,
@@ -117,6 +241,86 @@ class Post(db.Model):
             **kw: Any,
         ) -> None: ...
 
+
+# Timeline indexes. These replace the single-column ix_posts_channel_id /
+# ix_posts_user_id (both are prefixes of these), so a channel page or a
+# user's post list is one index range scan with no temp B-tree for ORDER BY.
+sa.Index(
+    "ix_posts_channel_created_id",
+    Post.channel_id, Post.created_at.desc(), Post.id.desc(),
+)
+sa.Index("ix_posts_user_id_id", Post.user_id, Post.id.desc())
+
+
+# Full-text index over post bodies: an FTS5 table that reads its text from
+# posts (content='posts'), kept in step by triggers so Core bulk inserts are
+# covered too. SQLite only; other dialects get no search index.
+# NB: batch_alter_table on posts recreates the table and drops these
+# triggers; a migration doing that must recreate them afterwards.
+POSTS_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5("
+    "body, content='posts', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN "
+    "INSERT INTO posts_fts(rowid, body) VALUES (new.id, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, body) VALUES ('delete', old.id, old.body); END",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE OF body ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+    "INSERT INTO posts_fts(rowid, body) VALUES (new.id, new.body); END",
+)
+for _ddl in POSTS_FTS_DDL:
+    event.listen(Post.__table__, "after_create", sa.DDL(_ddl).execute_if(dialect="sqlite"))
+event.listen(Post.__table__, "after_drop",
+             sa.DDL("DROP TABLE IF EXISTS posts_fts").execute_if(dialect="sqlite"))
+
+# Not part of db.metadata (create_all/autogenerate leave it alone); used to
+# build search queries.
+posts_fts = sa.table(
+    "posts_fts",
+    sa.column("rowid", sa.Integer),
+    sa.column("body", sa.Text),
+    sa.column("rank", sa.Float),
+)
+
+
+TAG_MAX_LENGTH = 64
+
+
+class Tag(db.Model):
+    __tablename__ = "tags"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, init=False)
+    # Already normalized by parse_tags (lower-case, no "#")
+    name: Mapped[str] = mapped_column(String(TAG_MAX_LENGTH), unique=True, index=True, nullable=False)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<Tag {self.id} {self.name!r}>"
+
+
+# Inverted index from tag to post. channel_id/created_at are copies of the
+# post's, so a tag timeline (optionally per channel) is a range scan on one
+# of the indexes below and only the chosen page of posts is read.
+post_tags = sa.Table(
+    "post_tags",
+    db.metadata,
+    sa.Column("post_id", sa.Integer, sa.ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True),
+    sa.Column("tag_id", sa.Integer, sa.ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    sa.Column("channel_id", sa.Integer, nullable=False),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+)
+sa.Index(
+    "ix_post_tags_tag_created_post",
+    post_tags.c.tag_id, post_tags.c.created_at.desc(), post_tags.c.post_id.desc(),
+)
+sa.Index(
+    "ix_post_tags_tag_channel_created_post",
+    post_tags.c.tag_id, post_tags.c.channel_id, post_tags.c.created_at.desc(), post_tags.c.post_id.desc(),
+)
+
+class ChannelMoveError(ValueError):
+    """A channel can't be moved under itself or one of its descendants."""
+
+
 # tipple/models.py (add alongside your other models)
 class Channel(db.Model):
     __tablename__ = "channels"
@@ -130,6 +334,12 @@ class Channel(db.Model):
     # Required channel name (max 255 chars)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
 
+    # normalize_channel_name(name), kept in step by the validator below. The
+    # unique index makes "Dev" and "dev " the same channel and doubles as the
+    # index for case-insensitive prefix search.
+    name_key: Mapped[str] = mapped_column(String(255), unique=True, index=True,
+                                          nullable=False, init=False, repr=False)
+
     # Self-referential parent (nullable)
     parent_id: Mapped[Optional[int | None]] = mapped_column(
         ForeignKey("channels.id", ondelete="SET NULL"),
@@ -155,7 +365,7 @@ class Channel(db.Model):
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime,
-        default=datetime.now(UTC),
+        insert_default=_utcnow,
         nullable=False,
         init=False,
     )
@@ -173,13 +383,35 @@ class Channel(db.Model):
         init=False,
     )
 
-    # NEW: Path of ancestor channel IDs (root -> parent), excludes self.
-    # Uses JSON type which SQLite stores as TEXT. 
-    path: Mapped[List[int]] = mapped_column(
-        "path",
-        MutableList.as_mutable(JSON),
-        insert_default=list,
+    # Denormalized counters, kept in step by User.follow/unfollow and the
+    # Post insert/delete hooks below. `flask tipple recount` rebuilds them.
+    follower_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0", init=False,
+    )
+    post_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0", init=False,
+    )
+    # Bumped by every UPDATE of the row, counter bumps included, so it moves
+    # whenever the channel page could change. Backs the HTTP validators
+    # (ETag / Last-Modified) on the channel page and API.
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        insert_default=_utcnow,
+        onupdate=_utcnow,
+        nullable=False,
+        init=False,
+    )
+
+    # Ancestor ids (root -> parent, excludes self) encoded as a sortable string,
+    # e.g. "0000000001/0000000005/". Everything under a channel shares its
+    # prefix, so subtree lookups are a range scan on ix_channels_lineage and
+    # moving a subtree is one UPDATE that swaps the prefix.
+    lineage: Mapped[str] = mapped_column(
+        Text,
+        index=True,
         nullable=False,
+        default="",
+        server_default="",
         init=False,
     )
 
@@ -201,67 +433,320 @@ class Channel(db.Model):
     def __repr__(self) -> str:  # pragma: no cover
         return f"<Channel {self.id} name={self.name!r} parent_id={self.parent_id!r}>"
 
+    @validates("name")
+    def _sync_name_key(self, key: str, value: str) -> str:
+        self.name_key = normalize_channel_name(value)
+        return value
+
+    @validates("parent")
+    def _check_move(self, key: str, value: Optional[Channel]) -> Optional[Channel]:
+        """Refuse a cycle when the parent is set, before anything is flushed."""
+        session = object_session(self) or (object_session(value) if value is not None else None)
+        with session.no_autoflush if session is not None else contextlib.nullcontext():
+            p = value
+            while p is not None:
+                if p is self:
+                    raise ChannelMoveError(f"channel {self.id} cannot be moved under itself")
+                if p.id is not None:
+                    # Saved: its lineage says whether it's below us
+                    if self.id is not None and p.subtree_prefix.startswith(self.subtree_prefix):
+                        raise ChannelMoveError(f"channel {self.id} cannot be moved under its own descendant")
+                    break
+                p = p.parent                # pending: follow it up in memory
+        return value
+
+    @property
+    def path(self) -> list[int]:
+        """Ancestor channel ids, root -> parent (excludes self)."""
+        return _lineage_ids(self.lineage)
+
+    # --- hierarchy queries (each a single indexed SELECT) ---
+
+    @property
+    def subtree_prefix(self) -> str:
+        """Lineage shared by every descendant of this channel."""
+        return self.lineage + _lineage_segment(self.id)
+
+    @staticmethod
+    def under(prefix: str):
+        """SQL filter: channels whose lineage starts with `prefix`."""
+        # "/" sorts directly before "0", so the prefix range is [prefix, prefix[:-1] + "0")
+        return sa.and_(Channel.lineage >= prefix, Channel.lineage < prefix[:-1] + "0")
+
+    def descendants(self) -> list[Channel]:
+        """All channels below this one, parents before children."""
+        return (
+            Channel.query.filter(Channel.under(self.subtree_prefix))
+            .order_by(Channel.lineage, Channel.id)
+            .all()
+        )
+
+    def ancestors(self) -> list[Channel]:
+        """Root -> parent, excluding self."""
+        ids = _lineage_ids(self.lineage)
+        if not ids:
+            return []
+        by_id = {c.id: c for c in Channel.query.filter(Channel.id.in_(ids))}
+        return [by_id[i] for i in ids if i in by_id]
+
+    def subtree_ids(self):
+        """SELECT of this channel's id plus all descendant ids."""
+        return sa.select(Channel.id).where(
+            sa.or_(Channel.id == self.id, Channel.under(self.subtree_prefix))
+        )
+
+    def subtree_posts(self):
+        """Post.timeline() query over this channel and everything below it."""
+        return Post.timeline().filter(Post.channel_id.in_(self.subtree_ids()))
+
+
+def normalize_channel_name(name: str | None) -> str:
+    """Uniqueness key for channel names: trimmed and case-folded."""
+    return (name or "").strip().lower()
+
+
+def parse_tags(raw: str | None) -> list[str]:
+    """
+    "Flask, #tips,flask" -> ["flask", "tips"]: split on commas, trim,
+    case-fold, drop a leading "#", skip blanks and repeats.
+    """
+    seen: dict[str, None] = {}
+    for part in (raw or "").split(","):
+        name = part.strip().lstrip("#").strip().lower()[:TAG_MAX_LENGTH]
+        if name:
+            seen.setdefault(name, None)
+    return list(seen)
+
+
+LINEAGE_WIDTH = 10
+
 
-def _compute_path_ids(ch: "Channel") -> list[int]:
+def _lineage_segment(channel_id: int) -> str:
+    return f"{channel_id:0{LINEAGE_WIDTH}d}/"
+
+
+def _lineage_ids(lineage: str) -> list[int]:
+    return [int(seg) for seg in lineage.split("/") if seg]
+
+
+@event.listens_for(Channel, "before_insert")
+def _set_new_channel_lineage(mapper, connection, target: Channel) -> None:
     """
-    Build ancestor id list from root -> parent (excludes self).
-    Guards against accidental cycles and limits depth.
+    New channels inherit lineage from their parent. Runs per row during the
+    flush, after the parent's own INSERT, so a parent created in the same
+    flush already has its id.
     """
-    ids: list[int] = []
-    seen: set[int] = set()
-    current = ch.parent
-    for _ in range(50):            # reasonable safety cap
-        if current is None:
-            break
-        if current.id is None:
-            # parent not flushed yet; fall back to current DB value via parent_id
-            # (will correct on the same flush once IDs exist)
-            break
-        if current.id in seen:
-            break                  # cycle guard
-        ids.append(current.id)
-        seen.add(current.id)
-        current = current.parent
-    return list(reversed(ids))
-
-
-@event.listens_for(Session, "before_flush")
-def _update_channel_paths(session: Session, flush_context, instances):
+    parent = target.parent
+    if parent is not None and parent.id is not None:
+        target.lineage = parent.subtree_prefix
+    elif target.parent_id is not None:
+        target.lineage = _subtree_prefix_of(connection, target.parent_id)
+    else:
+        target.lineage = ""
+
+
+@event.listens_for(Channel, "after_update")
+def _move_channel_subtree(mapper, connection, target: Channel) -> None:
     """
-    For new channels, or channels whose parent changed, recompute .path.
-    Also update descendants if a node was reparented.
+    When parent_id changes, rewrite the moved channel's lineage and swap the
+    prefix on every descendant in one set-based UPDATE. Nothing below the
+    moved node is loaded into the session.
     """
-    # Gather affected channels
-    targets: list[Channel] = []
-    for obj in session.new.union(session.dirty):
-        if isinstance(obj, Channel):
-            if obj in session.new:
-                targets.append(obj)
-            else:
-                hist = attributes.get_history(obj, "parent_id", passive=True)
-                if hist.has_changes():
-                    targets.append(obj)
-
-    if not targets:
+    hist = attributes.get_history(target, "parent_id")
+    if not hist.has_changes():
         return
 
-    # Recompute for each target and all its descendants
-    for ch in targets:
-        ch.path = _compute_path_ids(ch)
-
-        # Propagate to descendants (their ancestor chain changed too)
-        stack = list(getattr(ch, "children", []) or [])
-        # Limit breadth/depth to avoid surprises on pathological graphs
-        visited: set[int] = set()
-        while stack:
-            child = stack.pop()
-            if child.id and child.id in visited:
-                continue
-            child.path = _compute_path_ids(child)
-            visited.add(child.id or id(child))
-            stack.extend(child.children or [])
-
-        
+    table = Channel.__table__
+    old_lineage = connection.execute(
+        sa.select(table.c.lineage).where(table.c.id == target.id)
+    ).scalar_one()
+    old_prefix = old_lineage + _lineage_segment(target.id)
+    new_lineage = "" if target.parent_id is None else _subtree_prefix_of(connection, target.parent_id)
+    if new_lineage.startswith(old_prefix):
+        # Only reachable by setting parent_id directly; Channel.parent is checked on assignment
+        raise ChannelMoveError(f"channel {target.id} cannot be moved under its own descendant")
+    new_prefix = new_lineage + _lineage_segment(target.id)
+
+    connection.execute(
+        sa.update(table).where(table.c.id == target.id).values(lineage=new_lineage)
+    )
+    connection.execute(
+        sa.update(table)
+        .where(table.c.lineage >= old_prefix, table.c.lineage < old_prefix[:-1] + "0")
+        .values(lineage=sa.literal(new_prefix) + sa.func.substr(table.c.lineage, len(old_prefix) + 1))
+    )
+    session = object_session(target)
+    if session is not None:
+        session.info["tipple.channels_moved"] = True
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _expire_moved_lineage(session: Session, flush_context) -> None:
+    """Lineages were rewritten behind the ORM's back; refresh on next access."""
+    if session.info.pop("tipple.channels_moved", False):
+        for obj in list(session.identity_map.values()):
+            if isinstance(obj, Channel):
+                session.expire(obj, ["lineage"])
+
+
+def _subtree_prefix_of(connection: sa.Connection, channel_id: int) -> str:
+    table = Channel.__table__
+    lineage = connection.execute(
+        sa.select(table.c.lineage).where(table.c.id == channel_id)
+    ).scalar_one()
+    return lineage + _lineage_segment(channel_id)
+
+
+def _bump_user_following(conn: sa.Connection, user_id: int, delta: int) -> int:
+    """Adjust users.following_count; returns the new value."""
+    table = User.__table__
+    return conn.execute(
+        sa.update(table)
+        .where(table.c.id == user_id)
+        .values(following_count=table.c.following_count + delta)
+        .returning(table.c.following_count)
+    ).scalar_one()
+
+
+def _bump_channel(conn: sa.Connection, channel_id: int, **deltas: int) -> None:
+    """Apply +/- deltas to Channel counter columns in the current transaction."""
+    table = Channel.__table__
+    conn.execute(
+        sa.update(table)
+        .where(table.c.id == channel_id)
+        .values({name: table.c[name] + delta for name, delta in deltas.items()})
+    )
+
+
+@event.listens_for(Post, "after_insert")
+def _count_post_insert(mapper, connection, target: Post) -> None:
+    _bump_channel(connection, target.channel_id, post_count=1)
+
+
+@event.listens_for(Post, "after_delete")
+def _count_post_delete(mapper, connection, target: Post) -> None:
+    # Rows removed by ON DELETE CASCADE never reach the ORM; recount covers those.
+    _bump_channel(connection, target.channel_id, post_count=-1)
+
+
+# --- tags ---
+
+def _write_post_tags(conn: sa.Connection, posts: list[tuple[int, int, datetime, Optional[str]]]) -> int:
+    """
+    Index (post_id, channel_id, created_at, tags) rows into tags/post_tags:
+    one INSERT for new tag names, one SELECT for their ids and one INSERT
+    for the links, however many posts are passed. Existing links are left
+    alone, so re-running is harmless. Returns the number of links written.
+    """
+    parsed = [(pid, cid, created, parse_tags(raw)) for pid, cid, created, raw in posts]
+    names = sorted({name for *_, tags in parsed for name in tags})
+    if not names:
+        return 0
+
+    tags_table = Tag.__table__
+    conn.execute(_insert_ignore(tags_table), [{"name": n} for n in names])
+    tag_ids = dict(conn.execute(
+        sa.select(tags_table.c.name, tags_table.c.id).where(tags_table.c.name.in_(names))
+    ).tuples().all())
+
+    links = [
+        {"post_id": pid, "tag_id": tag_ids[name], "channel_id": cid, "created_at": created}
+        for pid, cid, created, tags in parsed
+        for name in tags
+    ]
+    return conn.execute(_insert_ignore(post_tags), links).rowcount  # pyright: ignore[reportAttributeAccessIssue]
+
+
+@event.listens_for(Post, "after_insert")
+def _index_post_tags(mapper, connection, target: Post) -> None:
+    if target.tags:
+        _write_post_tags(connection, [(target.id, target.channel_id, target.created_at, target.tags)])
+
+
+@event.listens_for(Post, "after_update")
+def _reindex_post_tags(mapper, connection, target: Post) -> None:
+    if attributes.get_history(target, "tags").has_changes():
+        connection.execute(sa.delete(post_tags).where(post_tags.c.post_id == target.id))
+        _index_post_tags(mapper, connection, target)
+    elif attributes.get_history(target, "channel_id").has_changes():
+        connection.execute(
+            sa.update(post_tags).where(post_tags.c.post_id == target.id).values(channel_id=target.channel_id)
+        )
+
+
+@event.listens_for(Post, "after_delete")
+def _unindex_post_tags(mapper, connection, target: Post) -> None:
+    connection.execute(sa.delete(post_tags).where(post_tags.c.post_id == target.id))
+
+
+def backfill_post_tags(batch_size: int = 1000) -> tuple[int, int]:
+    """
+    Index tags for posts written before post_tags existed. Walks posts in
+    id order, one batch per transaction. Returns (posts scanned, links added).
+    """
+    posts = Post.__table__
+    last_id, scanned, linked = 0, 0, 0
+    while True:
+        rows = db.session.execute(
+            sa.select(posts.c.id, posts.c.channel_id, posts.c.created_at, posts.c.tags)
+            .where(posts.c.id > last_id, posts.c.tags.is_not(None))
+            .order_by(posts.c.id)
+            .limit(batch_size)
+        ).tuples().all()
+        if not rows:
+            return scanned, linked
+        linked += _write_post_tags(db.session.connection(), rows)
+        db.session.commit()
+        scanned += len(rows)
+        last_id = rows[-1][0]
+
+
+def recount_channels() -> int:
+    """
+    Recompute every channel's counters (and users.following_count) from
+    posts / user_channel_follows with set-based UPDATEs. Returns the number
+    of channels touched.
+    """
+    ch = Channel.__table__
+    posts = Post.__table__
+    users = User.__table__
+    db.session.execute(
+        sa.update(users).values(
+            following_count=sa.select(sa.func.count())
+            .where(user_channel_follows.c.user_id == users.c.id)
+            .scalar_subquery()
+        )
+    )
+    db.session.execute(
+        sa.update(ch).values(
+            follower_count=sa.select(sa.func.count())
+            .where(user_channel_follows.c.channel_id == ch.c.id)
+            .scalar_subquery()
+        )
+    )
+    res = db.session.execute(
+        sa.update(ch).values(
+            post_count=sa.select(sa.func.count())
+            .where(posts.c.channel_id == ch.c.id)
+            .scalar_subquery()
+        )
+    )
+    db.session.commit()
+    return res.rowcount  # pyright: ignore[reportAttributeAccessIssue]
+
+
+def _insert_ignore(table: sa.Table):
+    """INSERT that silently skips rows violating a unique/PK constraint."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert(table).on_conflict_do_nothing()
+    if dialect == "postgresql":  # pragma: no cover
+        from sqlalchemy.dialects.postgresql import insert
+        return insert(table).on_conflict_do_nothing()
+    return sa.insert(table).prefix_with("IGNORE", dialect="mysql")  # pragma: no cover
+
+
 user_channel_follows = sa.Table(
     "user_channel_follows",
     db.metadata,
@@ -272,3 +757,21 @@ user_channel_follows = sa.Table(
     sa.Index("ix_ucf_channel_id", "channel_id"),
     sa.Index("ix_ucf_user_id", "user_id"),
 )
+
+
+# Materialized home-feed inbox for users who follow many channels (see
+# tipple.feed). channel_id/created_at are copies of the post's, so reading a
+# page is a range scan on ix_feed_items_user_created_post.
+feed_items = sa.Table(
+    "feed_items",
+    db.metadata,
+    sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    sa.Column("post_id", sa.Integer, sa.ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True),
+    sa.Column("channel_id", sa.Integer, nullable=False),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+    sa.Index("ix_feed_items_post_id", "post_id"),
+)
+sa.Index(
+    "ix_feed_items_user_created_post",
+    feed_items.c.user_id, feed_items.c.created_at.desc(), feed_items.c.post_id.desc(),
+)
@@ -0,0 +1,98 @@
+# tipple/pagination.py
+from __future__ import annotations
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import datetime, UTC
+from typing import Any, Generic, List, Optional, TypeVar
+
+import sqlalchemy as sa
+
+T = TypeVar("T")
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client-supplied cursor can't be decoded."""
+
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Opaque, URL-safe token for the seek position (created_at, id).
+    Clients should treat it as a black box.
+    """
+    if created_at.tzinfo is not None:
+        # SQLite hands back naive UTC values; keep comparisons like-for-like
+        created_at = created_at.astimezone(UTC).replace(tzinfo=None)
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> tuple[datetime, int]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        ts, _, row_id = raw.partition("|")
+        return datetime.fromisoformat(ts), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursor(token) from e
+
+
+def encode_rank_cursor(rank: float, row_id: int) -> str:
+    """Like encode_cursor, for result lists ordered by a score (e.g. bm25)."""
+    raw = f"{rank!r}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_rank_cursor(token: str) -> tuple[float, int]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        rank, _, row_id = raw.partition("|")
+        return float(rank), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursor(token) from e
+
+
+def keyset_query(query: Any, created_col: Any, id_col: Any, cursor: Optional[str] = None) -> Any:
+    """
+    Order `query` newest-first on (created_col, id_col) and, if a cursor is
+    given, seek past it. The row-value comparison lets SQLite turn this into
+    an index range scan instead of an OFFSET walk.
+    """
+    if cursor:
+        ts, row_id = decode_cursor(cursor)
+        query = query.filter(sa.tuple_(created_col, id_col) < sa.tuple_(ts, row_id))
+    return query.order_by(created_col.desc(), id_col.desc())
+
+
+def paginate_keyset(
+    query: Any,
+    created_col: Any,
+    id_col: Any,
+    *,
+    cursor: Optional[str] = None,
+    per_page: int = 20,
+) -> Page[Any]:
+    """
+    Fetch one page (plus a single look-ahead row to know whether there's
+    another page). Cost depends on per_page, not on how deep the cursor is.
+    """
+    rows = keyset_query(query, created_col, id_col, cursor).limit(per_page + 1).all()
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return Page(items=rows, next_cursor=next_cursor)
+
+
+def paginate_posts(query: Any, *, cursor: Optional[str] = None, per_page: int = 20) -> Page[Any]:
+    """Keyset page over a Post query, newest first."""
+    from .models import Post
+    return paginate_keyset(query, Post.created_at, Post.id, cursor=cursor, per_page=per_page)
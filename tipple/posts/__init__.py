@@ -1,5 +1,37 @@
-from flask import Blueprint, request, jsonify
+import io
+
+from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required, current_user
 from ..models import db, Post
+from ..ingest import PostImporter, iter_json_array, iter_ndjson
 
 bp = Blueprint("posts", __name__, url_prefix="/posts")
+
+
+@bp.post("/api/bulk")
+@login_required
+def bulk_import_api():
+    """
+    Import many posts as the current user.
+    Body (read as a stream, never buffered whole):
+      - Content-Type application/x-ndjson: one JSON record per line
+      - otherwise: a JSON array of records
+    Query string:
+      - skip: records to skip, i.e. `read` from an earlier incomplete import
+      - strict=1: stop at the first invalid record instead of skipping it
+    Responds 200 when the whole input was consumed, 422 if it stopped early.
+    """
+    # Bytes: the readers decode, so invalid UTF-8 is a bad record, not a 500
+    body = io.BufferedReader(request.stream)  # pyright: ignore[reportArgumentType]
+    if "ndjson" in (request.mimetype or ""):
+        records = iter_ndjson(body)
+    else:
+        records = iter_json_array(io.TextIOWrapper(body, encoding="utf-8"))
+
+    importer = PostImporter(
+        default_user_id=current_user.id,
+        batch_size=current_app.config["IMPORT_BATCH_SIZE"],
+        strict=request.args.get("strict", "") in ("1", "true", "yes"),
+    )
+    result = importer.run(records, skip=max(request.args.get("skip", 0, type=int), 0))
+    return jsonify(result.as_dict()), 200 if result.complete else 422
@@ -0,0 +1,181 @@
+# tipple/profiler.py
+from __future__ import annotations
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, UTC
+from pathlib import Path
+from types import FrameType
+from typing import Any, Optional
+
+from flask import Flask, g, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from .instrumentation import request_stats
+
+# On-demand profiling of single live requests. A request carrying a valid
+# profile token (X-Tipple-Profile header; ?_profile= only with
+# PROFILER_QUERY_ARG, since URLs end up in access logs and Referers) is
+# sampled by a stdlib stack sampler; its collapsed stacks (flamegraph.pl /
+# speedscope input) and SQL trace are written to PROFILER_DIR in the
+# instance folder. Tokens are signed with SECRET_KEY and expire, so only
+# people who can run `flask tipple profile-token` can profile, and each
+# worker writes at most PROFILER_MAX_PER_TOKEN profiles per token and
+# PROFILER_MAX_PER_MINUTE overall. Requests without one pay a dict lookup.
+
+HEADER = "X-Tipple-Profile"
+QUERY_ARG = "_profile"
+_SALT = "tipple.profiler"
+_EXT_KEY = "tipple.profiler"
+
+
+def _serializer(app: Flask) -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(app.config["SECRET_KEY"], salt=_SALT)
+
+
+def make_profile_token(app: Flask, path_prefix: str = "/") -> str:
+    """A token allowing profiling of requests under `path_prefix`."""
+    return _serializer(app).dumps({"path": path_prefix})
+
+
+def _token_allows(app: Flask, token: str, path: str) -> bool:
+    try:
+        data = _serializer(app).loads(token, max_age=app.config["PROFILER_TOKEN_MAX_AGE"])
+    except BadSignature:
+        return False
+    return isinstance(data, dict) and path.startswith(str(data.get("path", "/")))
+
+
+class ProfileBudget:
+    """Per-worker caps on profiles written, per token and per minute."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._uses: dict[str, tuple[int, float]] = {}      # token digest -> (count, first use)
+        self._recent: deque[float] = deque()
+
+    def take(self, token: str, per_token: int, per_minute: int, token_max_age: float) -> bool:
+        """Count a profile against `token`; False if a cap is reached."""
+        now = time.monotonic()
+        key = hashlib.sha256(token.encode()).hexdigest()
+        with self._lock:
+            while self._recent and now - self._recent[0] >= 60:
+                self._recent.popleft()
+            # Expired tokens can't come back, so their counts can go
+            self._uses = {k: v for k, v in self._uses.items() if now - v[1] < token_max_age}
+            count, first = self._uses.get(key, (0, now))
+            if count >= per_token or len(self._recent) >= per_minute:
+                return False
+            self._uses[key] = (count + 1, first)
+            self._recent.append(now)
+            return True
+
+
+class StackSampler:
+    """Samples one thread's Python stack every `interval` seconds from a helper thread."""
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="tipple-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[_collapse(frame)] += 1
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format: "root;child;leaf count" per line."""
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+
+def _collapse(frame: Optional[FrameType]) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", "?")
+        # Function-level frames, so a function's samples merge into one box
+        names.append(f"{module}:{code.co_qualname}".replace(";", ":").replace(" ", "_"))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def init_profiler(app: Flask) -> None:
+    config = app.config
+    budget = app.extensions[_EXT_KEY] = ProfileBudget()
+
+    @app.before_request
+    def _maybe_profile() -> None:
+        if not config["PROFILER_ENABLED"]:
+            return
+        token = request.headers.get(HEADER)
+        if not token and config["PROFILER_QUERY_ARG"]:
+            token = request.args.get(QUERY_ARG)
+        if not token or not _token_allows(app, token, request.path):
+            return
+        if not budget.take(token, config["PROFILER_MAX_PER_TOKEN"], config["PROFILER_MAX_PER_MINUTE"],
+                           config["PROFILER_TOKEN_MAX_AGE"]):
+            return
+        stats = request_stats()
+        if stats is not None:
+            stats.sql_trace = []
+        sampler = StackSampler(threading.get_ident(), app.config["PROFILER_INTERVAL"])
+        g._profiler = (sampler, time.perf_counter())
+        sampler.start()
+
+    @app.after_request
+    def _write_profile(response):
+        profile = g.pop("_profiler", None)
+        if profile is None:
+            return response
+        sampler, started = profile
+        sampler.stop()
+        name = _save(app, sampler, time.perf_counter() - started, response.status_code)
+        response.headers["X-Tipple-Profile-Id"] = name
+        return response
+
+    @app.teardown_request
+    def _stop_sampler(_exc) -> None:
+        # after_request didn't run (unhandled error): don't leave it sampling
+        profile = g.pop("_profiler", None)
+        if profile is not None:
+            profile[0].stop()
+
+
+def _save(app: Flask, sampler: StackSampler, seconds: float, status: int) -> str:
+    out = Path(app.instance_path) / app.config["PROFILER_DIR"]
+    out.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S.%f")
+    endpoint = re.sub(r"[^\w.-]", "_", request.endpoint or "unmatched")
+    name = f"{stamp}-{endpoint}"
+
+    (out / f"{name}.collapsed").write_text(sampler.collapsed(), encoding="utf-8")
+    stats = request_stats()
+    trace: dict[str, Any] = {
+        "method": request.method,
+        "path": request.full_path.rstrip("?"),
+        "endpoint": request.endpoint,
+        "status": status,
+        "ms": round(seconds * 1000, 3),
+        "samples": sum(sampler.stacks.values()),
+        "interval_ms": sampler.interval * 1000,
+        "queries": stats.sql_trace if stats is not None else None,
+    }
+    # The token itself doesn't belong in the file
+    trace["path"] = re.sub(rf"([?&]){QUERY_ARG}=[^&]*&?", r"\1", trace["path"]).rstrip("?&")
+    (out / f"{name}.sql.json").write_text(json.dumps(trace, indent=2), encoding="utf-8")
+    return name
@@ -0,0 +1,151 @@
+# tipple/routing.py
+from __future__ import annotations
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+import sqlalchemy as sa
+from flask import Flask, current_app, has_request_context, request, session as http_session
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession
+from sqlalchemy.orm import Session
+
+log = logging.getLogger(__name__)
+
+# Read/write routing. With a replica configured (READ_REPLICA_BIND naming a
+# SQLALCHEMY_BINDS entry), SELECTs go to the replica when the session is in
+# read mode: during GET/HEAD requests and inside read_only() blocks.
+# Everything else uses the primary: flushes, INSERT/UPDATE/DELETE, raw
+# connections, SELECT ... FOR UPDATE, and every read after the session has
+# written. A user who committed a write also reads from the primary for
+# READ_YOUR_WRITES_SECONDS (a timestamp in their session cookie), so they
+# see their own post/follow even if the replica lags.
+
+_READ_MODE = "tipple.read_replica"
+_WROTE = "tipple.wrote"
+_RW_UNTIL = "_rw_until"
+
+
+class RoutingSession(FlaskSQLAlchemySession):
+    """Flask-SQLAlchemy session that sends reads to the replica when allowed."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if not _plain_select(clause):
+                # A flush, a DML statement or a raw connection() (the counter
+                # and inbox helpers write through one): assume a write
+                self.info[_WROTE] = True
+            elif self.info.get(_READ_MODE) and not self.info.get(_WROTE):
+                engine = self._db.engines.get(current_app.config["READ_REPLICA_BIND"])
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _plain_select(clause: Any) -> bool:
+    return isinstance(clause, sa.Select) and clause._for_update_arg is None
+
+
+def replica_configured(app: Flask) -> bool:
+    key = app.config.get("READ_REPLICA_BIND")
+    return bool(key) and key in (app.config.get("SQLALCHEMY_BINDS") or {})
+
+
+@contextmanager
+def read_only() -> Iterator[None]:
+    """Route this block's SELECTs to the replica (writes still go to the primary)."""
+    from .models import db
+    info = db.session.info
+    previous = info.get(_READ_MODE)
+    info[_READ_MODE] = True
+    try:
+        yield
+    finally:
+        info[_READ_MODE] = previous
+
+
+@contextmanager
+def use_primary() -> Iterator[None]:
+    """Read from the primary inside this block, e.g. in a GET that must be current."""
+    from .models import db
+    info = db.session.info
+    previous = info.get(_READ_MODE)
+    info[_READ_MODE] = False
+    try:
+        yield
+    finally:
+        info[_READ_MODE] = previous
+
+
+def init_routing(app: Flask) -> None:
+    """Per-request read mode; a no-op without a replica bind."""
+    if not replica_configured(app):
+        return
+    from .models import db
+
+    @app.before_request
+    def _choose_engine() -> None:
+        reading = request.method in ("GET", "HEAD") and time.time() >= http_session.get(_RW_UNTIL, 0)
+        db.session.info[_READ_MODE] = reading
+
+    @app.teardown_request
+    def _reset_engine(_exc) -> None:
+        db.session.info.pop(_READ_MODE, None)
+
+
+@sa.event.listens_for(Session, "after_commit")
+def _start_read_your_writes(session: Session) -> None:
+    if session.info.pop(_WROTE, False) and has_request_context() and replica_configured(current_app):
+        http_session[_RW_UNTIL] = time.time() + current_app.config["READ_YOUR_WRITES_SECONDS"]
+
+
+@sa.event.listens_for(Session, "after_rollback")
+def _forget_write(session: Session) -> None:
+    session.info.pop(_WROTE, None)
+
+
+class Replicator:
+    """
+    Stand-in for real replication when trying routing locally with two
+    SQLite files: copies the primary into the replica with SQLite's online
+    backup API, once or every `interval` seconds (`flask tipple replicate`).
+    """
+
+    def __init__(self, primary_path: str, replica_path: str) -> None:
+        self.primary_path = primary_path
+        self.replica_path = replica_path
+        self._stop = threading.Event()
+
+    @classmethod
+    def for_app(cls, app: Flask) -> "Replicator":
+        primary = sa.make_url(app.config["SQLALCHEMY_DATABASE_URI"])
+        replica = sa.make_url(app.config["SQLALCHEMY_BINDS"][app.config["READ_REPLICA_BIND"]])
+        if primary.get_backend_name() != "sqlite" or replica.get_backend_name() != "sqlite" \
+                or not primary.database or not replica.database or ":memory:" in (primary.database, replica.database):
+            raise ValueError("the stand-in replicator needs two SQLite database files")
+        return cls(primary.database, replica.database)
+
+    def replicate(self) -> None:
+        src = sqlite3.connect(self.primary_path)
+        dst = sqlite3.connect(self.replica_path, timeout=30)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+
+    def run(self, interval: float, iterations: Optional[int] = None) -> None:
+        """Replicate every `interval` seconds until stop() (or `iterations` runs)."""
+        n = 0
+        while not self._stop.is_set() and (iterations is None or n < iterations):
+            try:
+                self.replicate()
+            except sqlite3.Error:
+                log.warning("replication pass failed", exc_info=True)
+            n += 1
+            self._stop.wait(interval)
+
+    def stop(self) -> None:
+        self._stop.set()
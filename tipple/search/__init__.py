@@ -0,0 +1,137 @@
+# tipple/search/__init__.py
+from __future__ import annotations
+import re
+from typing import Optional
+
+import sqlalchemy as sa
+from flask import Blueprint, render_template, request, jsonify, url_for, abort, current_app
+
+from ..models import db, Channel, Post, posts_fts
+from ..pagination import Page, InvalidCursor, encode_rank_cursor, decode_rank_cursor
+
+bp = Blueprint("search", __name__, url_prefix="/search")
+
+
+def fts_query(raw: str | None) -> Optional[str]:
+    """
+    Turn what the user typed into a safe FTS5 MATCH expression: every word
+    must appear, and a word ending in "*" matches as a prefix. Operators and
+    quotes are not passed through, so bad input can't be a syntax error.
+    """
+    terms: list[str] = []
+    for word in (raw or "").split():
+        tokens = re.findall(r"\w+", word)
+        terms += [f'"{t}"' for t in tokens]
+        if tokens and word.endswith("*"):
+            terms[-1] += "*"
+    return " ".join(terms) or None
+
+
+def search_posts(
+    match: str,
+    *,
+    channel: Optional[Channel] = None,
+    subtree: bool = False,
+    cursor: Optional[str] = None,
+    per_page: int = 20,
+) -> Page[tuple[Post, float]]:
+    """
+    One page of (post, bm25 rank) pairs, best match first. Pages seek on
+    (rank, id); new posts can shift ranks between pages, which is fine for
+    search results.
+    """
+    rank, rowid = posts_fts.c.rank, posts_fts.c.rowid
+    stmt = (
+        sa.select(rowid, rank)
+        .where(sa.literal_column("posts_fts").op("MATCH")(match))
+        .order_by(rank, rowid)
+        .limit(per_page + 1)
+    )
+    if channel is not None:
+        scope = Post.channel_id.in_(channel.subtree_ids()) if subtree else Post.channel_id == channel.id
+        stmt = stmt.join(Post, Post.id == rowid).where(scope)
+    if cursor:
+        after_rank, after_id = decode_rank_cursor(cursor)
+        stmt = stmt.where(sa.tuple_(rank, rowid) > sa.tuple_(after_rank, after_id))
+
+    rows = db.session.execute(stmt).tuples().all()
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_rank_cursor(rows[-1][1], rows[-1][0])
+
+    ids = [pid for pid, _ in rows]
+    by_id = {p.id: p for p in Post.timeline().filter(Post.id.in_(ids))} if ids else {}
+    return Page(items=[(by_id[pid], r) for pid, r in rows if pid in by_id], next_cursor=next_cursor)
+
+
+def _search_args():
+    """(match expr, channel, subtree, cursor) from the query string."""
+    channel = None
+    channel_id = request.args.get("channel", type=int)
+    if channel_id is not None:
+        channel = db.session.get(Channel, channel_id)
+        if channel is None:
+            abort(404)
+    subtree = request.args.get("subtree", "") in ("1", "true", "yes")
+    return fts_query(request.args.get("q")), channel, subtree, request.args.get("cursor")
+
+
+@bp.get("/")
+def search_page():
+    """Search post bodies. ?q=, optional ?channel=<id>&subtree=1, ?cursor= for more."""
+    match, channel, subtree, cursor = _search_args()
+    page: Page[tuple[Post, float]] = Page(items=[], next_cursor=None)
+    if match:
+        try:
+            page = search_posts(
+                match, channel=channel, subtree=subtree, cursor=cursor,
+                per_page=current_app.config["POSTS_PER_PAGE"],
+            )
+        except InvalidCursor:
+            abort(400)
+
+    next_page_url = None
+    if page.next_cursor:
+        next_page_url = url_for(
+            "search.search_page", q=request.args.get("q"), channel=channel.id if channel else None,
+            subtree=1 if subtree else None, cursor=page.next_cursor,
+        )
+    return render_template(
+        "search/results.html",
+        q=request.args.get("q", ""),
+        searched=bool(match),
+        channel=channel,
+        subtree=subtree,
+        posts=[p for p, _ in page.items],
+        next_page_url=next_page_url,
+    )
+
+
+@bp.get("/api")
+def search_api():
+    """JSON version of search_page."""
+    match, channel, subtree, cursor = _search_args()
+    if not match:
+        return jsonify(error="q is required"), 400
+    try:
+        page = search_posts(
+            match, channel=channel, subtree=subtree, cursor=cursor,
+            per_page=current_app.config["POSTS_PER_PAGE"],
+        )
+    except InvalidCursor:
+        return jsonify(error="invalid cursor"), 400
+
+    results = [
+        {
+            "id": p.id,
+            "body": p.body,
+            "tags": p.tag_names,
+            "channel_id": p.channel_id,
+            "author": p.author.username,
+            "created_at": p.created_at.isoformat(),
+            "rank": rank,
+        }
+        for p, rank in page.items
+    ]
+    return jsonify(results=results, next_cursor=page.next_cursor)
@@ -0,0 +1,180 @@
+# tipple/seed.py
+from __future__ import annotations
+import bisect
+import itertools
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, UTC
+from typing import Any
+
+import sqlalchemy as sa
+
+from .auth.passwords import hash_password
+from .feed import rebuild_inboxes
+from .ingest import insert_posts
+from .models import (
+    db, Channel, User, user_channel_follows, _lineage_segment, normalize_channel_name, _insert_ignore,
+)
+
+# Synthetic data for load testing (`flask tipple seed`, benchmarks/suite.py).
+# Channel popularity and user activity are Zipf-distributed, follow counts
+# Pareto-distributed, and channel trees grow by preferential attachment, so
+# a few channels/users dominate like they do on a real site. The same
+# options and --seed always produce the same rows. Everything goes in
+# through Core batches (posts through the bulk importer's insert_posts), so
+# counters, tags and the FTS index come out as the app keeps them; inboxes
+# are built at the end, as `flask tipple rebuild-feeds` does, since the
+# follows went in before any post could fan out to them.
+
+TAG_WORDS = (
+    "ipa", "stout", "lager", "porter", "sour", "pilsner", "saison", "cider", "mead", "wine",
+    "whisky", "gin", "rum", "tea", "coffee", "recipe", "review", "event", "question", "news",
+)
+WORDS = (
+    "tasted", "brewed", "poured", "a", "the", "really", "crisp", "hoppy", "dark", "sweet",
+    "bitter", "fresh", "batch", "glass", "tonight", "weekend", "recommend", "try", "this", "again",
+)
+
+
+@dataclass
+class SeedResult:
+    users: int = 0
+    channels: int = 0
+    follows: int = 0
+    posts: int = 0
+    inboxes: int = 0
+    max_depth: int = 0
+    seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class _Zipf:
+    """Draws 0..n-1 with P(k) ~ 1 / (k + 1) ** s."""
+
+    def __init__(self, n: int, s: float, rnd: random.Random) -> None:
+        self.rnd = rnd
+        self.cum = list(itertools.accumulate(1.0 / (k + 1) ** s for k in range(n)))
+
+    def draw(self) -> int:
+        return bisect.bisect_left(self.cum, self.rnd.random() * self.cum[-1])
+
+
+def seed(
+    *,
+    users: int = 1000,
+    channels: int = 200,
+    posts: int = 50_000,
+    follows_mean: float = 10.0,
+    max_depth: int = 6,
+    zipf_s: float = 1.1,
+    days: int = 90,
+    password: str = "password",
+    batch_size: int = 1000,
+    random_seed: int = 1,
+) -> SeedResult:
+    """Generate and insert a data set; returns what was added."""
+    rnd = random.Random(random_seed)
+    started = time.perf_counter()
+    result = SeedResult()
+    now = datetime.now(UTC)
+    first_user = (db.session.scalar(sa.select(sa.func.max(User.id))) or 0) + 1
+    first_channel = (db.session.scalar(sa.select(sa.func.max(Channel.id))) or 0) + 1
+    user_ids = list(range(first_user, first_user + users))
+    channel_ids = list(range(first_channel, first_channel + channels))
+
+    # Channels: a forest grown by preferential attachment; channels that
+    # already have children are likelier to get more, down to max_depth
+    channel_rows, depth = [], {}
+    lineage: dict[int, str] = {}
+    attach: list[int] = []
+    for cid in channel_ids:
+        parent = None
+        if attach and rnd.random() > 0.15:
+            parent = rnd.choice(attach)
+        lineage[cid] = lineage[parent] + _lineage_segment(parent) if parent else ""
+        depth[cid] = depth[parent] + 1 if parent else 0
+        if depth[cid] < max_depth:
+            attach.append(cid)
+        if parent:
+            attach.append(parent)
+        name = f"channel{cid}"
+        channel_rows.append({
+            "id": cid, "name": name, "name_key": normalize_channel_name(name), "parent_id": parent,
+            "lineage": lineage[cid], "created_at": now - timedelta(days=days + 1), "updated_at": now,
+        })
+    result.max_depth = max(depth.values(), default=0)
+
+    # Follows: Pareto-sized follow sets over Zipf-popular channels
+    popularity = channel_ids[:]
+    rnd.shuffle(popularity)
+    pick_channel = _Zipf(channels, zipf_s, rnd)
+    follow_rows, following, followers = [], Counter(), Counter()
+    if channels:
+        for uid in user_ids:
+            want = min(channels, int(rnd.paretovariate(1.5) * follows_mean / 3))
+            chosen: set[int] = set()
+            for _ in range(want * 4):               # popular ones repeat; stop eventually
+                if len(chosen) >= want:
+                    break
+                chosen.add(popularity[pick_channel.draw()])
+            for cid in chosen:
+                follow_rows.append({"user_id": uid, "channel_id": cid})
+                followers[cid] += 1
+            following[uid] = len(chosen)
+
+    pw_hash = hash_password(password)
+    user_rows = [
+        {"id": uid, "email": f"user{uid}@example.com", "username": f"user{uid}", "username_key": f"user{uid}",
+         "password_hash": pw_hash, "created_at": now - timedelta(days=days + 1),
+         "following_count": following[uid]}
+        for uid in user_ids
+    ]
+    for row in channel_rows:
+        row["follower_count"] = followers[row["id"]]
+
+    for table, rows in ((User.__table__, user_rows), (Channel.__table__, channel_rows)):
+        for i in range(0, len(rows), batch_size):
+            db.session.execute(sa.insert(table), rows[i:i + batch_size])
+    for i in range(0, len(follow_rows), batch_size):
+        db.session.execute(_insert_ignore(user_channel_follows), follow_rows[i:i + batch_size])
+    db.session.commit()
+    result.users, result.channels, result.follows = users, channels, len(follow_rows)
+
+    # Posts, oldest first so ids follow time: Zipf over channels and authors
+    if channels and users and posts:
+        authors = user_ids[:]
+        rnd.shuffle(authors)
+        pick_author = _Zipf(users, zipf_s, rnd)
+        pick_tag = _Zipf(len(TAG_WORDS), zipf_s, rnd)
+        span = days * 86400
+        offsets = sorted(rnd.random() * span for _ in range(posts))
+        start = now - timedelta(days=days)
+        batch: list[dict[str, Any]] = []
+        for offset in offsets:
+            tags = None
+            if rnd.random() < 0.3:
+                tags = ", ".join(dict.fromkeys(TAG_WORDS[pick_tag.draw()] for _ in range(rnd.randint(1, 3))))
+            batch.append({
+                "user_id": authors[pick_author.draw()],
+                "channel_id": popularity[pick_channel.draw()],
+                "body": " ".join(rnd.choices(WORDS, k=rnd.randint(3, 20))),
+                "tags": tags,
+                "created_at": start + timedelta(seconds=offset),
+            })
+            if len(batch) >= batch_size:
+                insert_posts(db.session.connection(), batch)
+                db.session.commit()
+                result.posts += len(batch)
+                batch = []
+        if batch:
+            insert_posts(db.session.connection(), batch)
+            db.session.commit()
+            result.posts += len(batch)
+
+    result.inboxes = rebuild_inboxes()
+    result.seconds = time.perf_counter() - started
+    return result
@@ -0,0 +1,116 @@
+# tipple/sqlite_profile.py
+from __future__ import annotations
+import logging
+import re
+import threading
+import time
+from typing import Any
+
+import sqlalchemy as sa
+from flask import Flask
+
+from .models import db
+
+log = logging.getLogger(__name__)
+
+_EXT_KEY = "tipple.sqlite_maintenance"
+_PRAGMA_NAME = re.compile(r"^[a-z_]+$")
+_PRAGMA_WORD = re.compile(r"^[A-Za-z_]+$")
+
+# SQLite engine profile: SQLITE_PRAGMAS is applied to every new DB-API
+# connection of every SQLite engine (see ProductionConfig), and long-lived
+# workers periodically checkpoint the WAL and refresh planner statistics.
+# The config is read when a connection opens, not when the app is created.
+
+
+def pragma_statements(pragmas: dict[str, Any]) -> list[str]:
+    """PRAGMA statements for a {name: value} mapping, in order. Values are ints or bare words."""
+    stmts = []
+    for name, value in pragmas.items():
+        if not _PRAGMA_NAME.match(name):
+            raise ValueError(f"bad SQLite pragma name: {name!r}")
+        if isinstance(value, bool) or not (isinstance(value, int) or _PRAGMA_WORD.match(str(value))):
+            raise ValueError(f"bad value for SQLite pragma {name}: {value!r}")
+        stmts.append(f"PRAGMA {name} = {value}")
+    return stmts
+
+
+def init_sqlite_profile(app: Flask) -> None:
+    """Hook the profile onto the app's SQLite engines (others are left alone)."""
+    with app.app_context():
+        engines = [e for e in db.engines.values() if e.dialect.name == "sqlite"]
+    if not engines:
+        return
+
+    def _on_connect(dbapi_conn, _record) -> None:
+        stmts = pragma_statements(app.config["SQLITE_PRAGMAS"])
+        if not stmts:
+            return
+        cursor = dbapi_conn.cursor()
+        try:
+            for stmt in stmts:
+                cursor.execute(stmt)
+        finally:
+            cursor.close()
+
+    for engine in engines:
+        sa.event.listen(engine, "connect", _on_connect)
+
+    maintenance = app.extensions[_EXT_KEY] = SQLiteMaintenance(engines)
+
+    @app.teardown_request
+    def _periodic_maintenance(_exc) -> None:
+        interval = app.config["SQLITE_MAINTENANCE_INTERVAL"]
+        if interval:
+            maintenance.maybe_run(interval)
+
+
+class SQLiteMaintenance:
+    """
+    `PRAGMA wal_checkpoint` + `PRAGMA optimize` on each engine. Requests call
+    maybe_run() as they finish; at most one thread per process runs it per
+    interval, and nobody waits for it.
+    """
+
+    def __init__(self, engines: list[sa.Engine]) -> None:
+        self.engines = engines
+        self._lock = threading.Lock()
+        self._last = time.monotonic()
+
+    def maybe_run(self, interval: float) -> bool:
+        if time.monotonic() - self._last < interval or not self._lock.acquire(blocking=False):
+            return False
+        try:
+            if time.monotonic() - self._last < interval:
+                return False
+            self._last = time.monotonic()
+            self.run()
+            return True
+        except sa.exc.DBAPIError:
+            # Busy or locked: try again next interval
+            log.warning("SQLite maintenance failed", exc_info=True)
+            return False
+        finally:
+            self._lock.release()
+
+    def run(self, checkpoint: str = "PASSIVE") -> list[tuple[int, int, int]]:
+        """
+        Checkpoint each engine's WAL (PASSIVE never blocks; TRUNCATE also
+        resets the file but waits for readers) and let SQLite re-analyze
+        tables whose stats look stale. Returns (busy, wal pages, checkpointed)
+        per engine.
+        """
+        if checkpoint not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+            raise ValueError(f"bad checkpoint mode: {checkpoint!r}")
+        results = []
+        for engine in self.engines:
+            with engine.connect() as conn:
+                row = conn.exec_driver_sql(f"PRAGMA wal_checkpoint({checkpoint})").one()
+                conn.exec_driver_sql("PRAGMA optimize")
+                conn.commit()
+            results.append(tuple(row))
+        return results
+
+
+def sqlite_maintenance(app: Flask) -> SQLiteMaintenance | None:
+    return app.extensions.get(_EXT_KEY)
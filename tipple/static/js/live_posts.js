@@ -0,0 +1,27 @@
+(() => {
+  // tipple/static/ts/live_posts.ts
+  function initLivePosts(card) {
+    const url = card.dataset.liveUrl;
+    if (!url || !("EventSource" in window)) return;
+    const source = new EventSource(url);
+    source.addEventListener("post", (e) => {
+      let list = card.querySelector("ul.list-group");
+      if (!list) {
+        const body = card.querySelector(".card-body");
+        body.innerHTML = '<ul class="list-group list-group-flush"></ul>';
+        list = body.firstElementChild;
+      }
+      list?.insertAdjacentHTML("afterbegin", e.data);
+    });
+    source.addEventListener("reset", () => {
+      source.close();
+      const note = document.createElement("div");
+      note.className = "card-header text-center small";
+      note.innerHTML = '<a href="">New posts available, reload</a>';
+      card.prepend(note);
+    });
+  }
+  window.addEventListener("DOMContentLoaded", () => {
+    document.querySelectorAll("[data-live-url]").forEach(initLivePosts);
+  });
+})();
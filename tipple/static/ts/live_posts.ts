@@ -0,0 +1,34 @@
+// assets/ts/live_posts.ts
+
+// Prepends posts streamed from a timeline's data-live-url (see tipple.live).
+// EventSource reconnects by itself and resumes with Last-Event-ID.
+function initLivePosts(card: HTMLElement): void {
+  const url = card.dataset.liveUrl;
+  if (!url || !("EventSource" in window)) return;
+
+  const source = new EventSource(url);
+  source.addEventListener("post", (e: MessageEvent) => {
+    let list = card.querySelector("ul.list-group");
+    if (!list) {
+      // Empty timeline: swap the placeholder for a list
+      const body = card.querySelector(".card-body") as HTMLElement;
+      body.innerHTML = '<ul class="list-group list-group-flush"></ul>';
+      list = body.firstElementChild;
+    }
+    list?.insertAdjacentHTML("afterbegin", e.data);
+  });
+  // Missed too much to catch up: offer a reload instead
+  source.addEventListener("reset", () => {
+    source.close();
+    const note = document.createElement("div");
+    note.className = "card-header text-center small";
+    note.innerHTML = '<a href="">New posts available, reload</a>';
+    card.prepend(note);
+  });
+}
+
+window.addEventListener("DOMContentLoaded", () => {
+  document.querySelectorAll<HTMLElement>("[data-live-url]").forEach(initLivePosts);
+});
+
+export {}; // keep this a module
@@ -0,0 +1,64 @@
+# tipple/tags/__init__.py
+from __future__ import annotations
+from flask import Blueprint, render_template, request, url_for, abort, current_app
+
+from ..models import db, Channel, Post, Tag, post_tags, parse_tags
+from ..pagination import paginate_keyset, InvalidCursor
+
+bp = Blueprint("tags", __name__, url_prefix="/tags")
+
+
+@bp.get("/<path:tag>")
+def tag_timeline(tag: str):
+    """
+    Posts carrying `tag`, newest first, optionally limited to one channel
+    with ?channel=<id>. Older pages via the opaque ?cursor= token.
+    """
+    names = parse_tags(tag)
+    if len(names) != 1:
+        abort(404)
+    tag_row = Tag.query.filter_by(name=names[0]).first()
+    if tag_row is None:
+        abort(404)
+
+    channel = None
+    channel_id = request.args.get("channel", type=int)
+    if channel_id is not None:
+        channel = db.session.get(Channel, channel_id)
+        if channel is None:
+            abort(404)
+
+    # Pick the page from post_tags alone (an index-only range scan), then
+    # load just those posts by primary key.
+    query = db.session.query(
+        post_tags.c.post_id.label("id"), post_tags.c.created_at
+    ).filter(post_tags.c.tag_id == tag_row.id)
+    if channel is not None:
+        query = query.filter(post_tags.c.channel_id == channel.id)
+
+    try:
+        page = paginate_keyset(
+            query, post_tags.c.created_at, post_tags.c.post_id,
+            cursor=request.args.get("cursor"),
+            per_page=current_app.config["POSTS_PER_PAGE"],
+        )
+    except InvalidCursor:
+        abort(400)
+
+    ids = [row.id for row in page.items]
+    by_id = {p.id: p for p in Post.timeline().filter(Post.id.in_(ids))} if ids else {}
+    posts = [by_id[i] for i in ids if i in by_id]
+
+    next_page_url = None
+    if page.next_cursor:
+        next_page_url = url_for(
+            "tags.tag_timeline", tag=tag_row.name, channel=channel_id, cursor=page.next_cursor
+        )
+
+    return render_template(
+        "tags/show.html",
+        tag=tag_row,
+        channel=channel,
+        posts=posts,
+        next_page_url=next_page_url,
+    )